@@ -0,0 +1,269 @@
+"""
+miniFASTA: A simple toolbox for fasta files.
+
+This is the benchmark runner. It measures the throughput of the hot paths on
+synthetic data, stores the results as JSON and compares them against a baseline.
+
+Usage:
+    python benchmarks/run.py --size-mb 10 --output results.json
+    python benchmarks/run.py --baseline results.json
+
+@author: Jules Kreuer / not_a_feature
+License: GPL-3.0
+"""
+
+from synthetic import dataset, standard_datasets, sequences, write_dataset, compressions
+
+import miniFasta as mf
+
+import argparse
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from importlib.metadata import PackageNotFoundError, version
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class result:
+    """
+    Best run of a benchmark.
+    """
+
+    seconds: float
+    bytes: int
+    records: int
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.bytes / 1e6 / self.seconds if self.seconds else 0.0
+
+    @property
+    def records_per_s(self) -> float:
+        return self.records / self.seconds if self.seconds else 0.0
+
+    def to_json(self) -> Dict[str, float]:
+        d: Dict[str, float] = asdict(self)
+        d["mb_per_s"] = round(self.mb_per_s, 3)
+        d["records_per_s"] = round(self.records_per_s, 1)
+        return d
+
+
+# A benchmark returns a callable doing the measured work and the (bytes, records) it processes
+benchmark = Callable[[], Tuple[Callable[[], object], int, int]]
+
+
+def _consume(iterable: object) -> None:
+    for _ in iterable:  # type: ignore
+        pass
+
+
+def _plain_size(ds: dataset, data_dir: str) -> int:
+    """
+    Size of the uncompressed FASTA file, throughput is measured on uncompressed bytes.
+    """
+    return os.path.getsize(write_dataset(ds, data_dir))
+
+
+def benchmarks(data_dir: str, size_mb: float) -> Dict[str, benchmark]:
+    """
+    Collects all benchmarks. Datasets are only generated when a benchmark is set up.
+    """
+    out: Dict[str, benchmark] = {}
+
+    for ds in standard_datasets(size_mb):
+        for comp in compressions:
+
+            def read(ds: dataset = ds, comp: str = comp) -> Tuple[Callable[[], object], int, int]:
+                file_path = write_dataset(ds, data_dir, comp)
+                return lambda: _consume(mf.read(file_path)), _plain_size(ds, data_dir), ds.records
+
+            out[f"read/{comp}/{ds.name}"] = read
+
+        def read_mmap(ds: dataset = ds) -> Tuple[Callable[[], object], int, int]:
+            file_path = write_dataset(ds, data_dir)
+            return (
+                lambda: _consume(mf.read(file_path, use_mmap=True)),
+                _plain_size(ds, data_dir),
+                ds.records,
+            )
+
+        def read_headers(ds: dataset = ds) -> Tuple[Callable[[], object], int, int]:
+            file_path = write_dataset(ds, data_dir)
+            return (
+                lambda: _consume(mf.read(file_path, headers_only=True)),
+                _plain_size(ds, data_dir),
+                ds.records,
+            )
+
+        # All records have the same length, the filter rejects every record
+        def read_filter(ds: dataset = ds) -> Tuple[Callable[[], object], int, int]:
+            file_path = write_dataset(ds, data_dir)
+            return (
+                lambda: _consume(mf.read(file_path, min_length=ds.length + 1)),
+                _plain_size(ds, data_dir),
+                ds.records,
+            )
+
+        # The same selection after reading, the baseline of read_filter
+        def read_post_filter(ds: dataset = ds) -> Tuple[Callable[[], object], int, int]:
+            file_path = write_dataset(ds, data_dir)
+            return (
+                lambda: _consume(fo for fo in mf.read(file_path) if len(fo) > ds.length),
+                _plain_size(ds, data_dir),
+                ds.records,
+            )
+
+        out[f"read_mmap/fasta/{ds.name}"] = read_mmap
+        out[f"read_headers/fasta/{ds.name}"] = read_headers
+        out[f"read_filter/fasta/{ds.name}"] = read_filter
+        out[f"read_post_filter/fasta/{ds.name}"] = read_post_filter
+
+        for comp in ("fasta", "gz"):
+
+            def write(ds: dataset = ds, comp: str = comp) -> Tuple[Callable[[], object], int, int]:
+                fos = [mf.fasta_object(h, s) for h, s in sequences(ds)]
+                suffix = ".fasta" if comp == "fasta" else ".fasta.gz"
+                file_path = os.path.join(data_dir, f"write_{ds.name}{suffix}")
+                return lambda: mf.write(fos, file_path), _plain_size(ds, data_dir), ds.records
+
+            out[f"write/{comp}/{ds.name}"] = write
+
+        def valid(ds: dataset = ds) -> Tuple[Callable[[], object], int, int]:
+            stype = "PROT" if ds.alphabet != "ACGT" else "DNA"
+            fos = [mf.fasta_object(h, s, stype) for h, s in sequences(ds)]
+            return lambda: [fo.valid() for fo in fos], ds.bases, ds.records
+
+        out[f"valid/{ds.name}"] = valid
+
+        if ds.alphabet != "ACGT":
+            continue
+
+        def translate(ds: dataset = ds) -> Tuple[Callable[[], object], int, int]:
+            seqs = [s for _, s in sequences(ds)]
+            return lambda: [mf.translate_seq(s) for s in seqs], ds.bases, ds.records
+
+        def revcomp(ds: dataset = ds) -> Tuple[Callable[[], object], int, int]:
+            seqs = [s for _, s in sequences(ds)]
+            return lambda: [mf.reverse_comp(s) for s in seqs], ds.bases, ds.records
+
+        out[f"translate_seq/{ds.name}"] = translate
+        out[f"reverse_comp/{ds.name}"] = revcomp
+
+    return out
+
+
+def measure(setup: benchmark, repeat: int) -> result:
+    """
+    Runs a benchmark repeat times and returns the fastest run.
+    """
+    work, n_bytes, n_records = setup()
+    best = float("inf")
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        work()
+        best = min(best, time.perf_counter() - start)
+    return result(best, n_bytes, n_records)
+
+
+def metadata(size_mb: float, repeat: int) -> Dict[str, object]:
+    try:
+        import numpy
+
+        numpy_version: Optional[str] = numpy.__version__
+    except ImportError:
+        numpy_version = None
+
+    try:
+        mf_version = version("miniFasta")
+    except PackageNotFoundError:
+        # Run from a checkout that is not installed
+        mf_version = "unknown"
+
+    return {
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "miniFasta": mf_version,
+        "numpy": numpy_version,
+        "size_mb": size_mb,
+        "repeat": repeat,
+    }
+
+
+def compare(
+    results: Dict[str, result], baseline: Dict[str, Dict[str, float]], threshold: float
+) -> List[str]:
+    """
+    Prints the change of throughput against a baseline and returns the regressed benchmarks.
+    """
+    regressions = []
+    print(f"\n{'benchmark':<40} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, res in results.items():
+        if name not in baseline or not baseline[name].get("mb_per_s"):
+            continue
+        old = baseline[name]["mb_per_s"]
+        change = res.mb_per_s / old - 1
+        flag = ""
+        if change < -threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<40} {old:>10.1f} {res.mb_per_s:>10.1f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="miniFASTA benchmarks on synthetic data.")
+    parser.add_argument("--size-mb", type=float, default=10, help="Bases per dataset in MB.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark, best counts.")
+    parser.add_argument("--filter", default="", help="Run benchmarks containing this string.")
+    parser.add_argument(
+        "--data-dir",
+        default=os.path.join(tempfile.gettempdir(), "miniFasta-benchmarks"),
+        help="Directory of the generated datasets, reused across runs.",
+    )
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    parser.add_argument("--baseline", help="Compare against the JSON results of an earlier run.")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="Slowdown reported as regression."
+    )
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    results: Dict[str, result] = {}
+
+    print(f"{'benchmark':<40} {'MB/s':>10} {'records/s':>12}")
+    for name, setup in benchmarks(args.data_dir, args.size_mb).items():
+        if args.filter not in name:
+            continue
+        res = measure(setup, args.repeat)
+        results[name] = res
+        print(f"{name:<40} {res.mb_per_s:>10.1f} {res.records_per_s:>12.0f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "meta": metadata(args.size_mb, args.repeat),
+                    "results": {name: res.to_json() for name, res in results.items()},
+                },
+                f,
+                indent=2,
+            )
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
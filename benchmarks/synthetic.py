@@ -0,0 +1,144 @@
+"""
+miniFASTA: A simple toolbox for fasta files.
+
+This is the synthetic data part of the benchmarks.
+All datasets are generated deterministically from a seed, so runs on different
+machines and versions measure the same input.
+
+@author: Jules Kreuer / not_a_feature
+License: GPL-3.0
+"""
+
+from dataclasses import dataclass
+import gzip
+import io
+import os
+import random
+import tarfile
+from typing import Iterator, List, Tuple
+from zipfile import ZipFile, ZIP_DEFLATED
+
+dna_alphabet = "ACGT"
+protein_alphabet = "ACDEFGHIKLMNPQRSTVWY"
+
+# Supported compressions, named by their file suffix
+compressions = ("fasta", "gz", "zip", "tar.gz")
+
+
+@dataclass
+class dataset:
+    """
+    Shape of a synthetic FASTA file.
+
+    Attributes
+    ----------
+        name: str
+            Name of the dataset, used in the file and benchmark names.
+        records: int
+            Number of records.
+        length: int
+            Sequence length of each record.
+        line_width: int
+            Number of characters per sequence line, 0 for single line sequences.
+        alphabet: str
+            Characters the sequences are drawn from.
+        seed: int
+            Seed of the random generator.
+    """
+
+    name: str
+    records: int
+    length: int
+    line_width: int = 70
+    alphabet: str = dna_alphabet
+    seed: int = 42
+
+    @property
+    def bases(self) -> int:
+        return self.records * self.length
+
+
+def standard_datasets(size_mb: float) -> List[dataset]:
+    """
+    Datasets of roughly size_mb megabytes each, covering the typical shapes of FASTA files.
+    """
+    bases = max(int(size_mb * 1_000_000), 1000)
+    return [
+        dataset("short_reads", bases // 150, 150, line_width=0),
+        dataset("genes", bases // 1500, 1500, line_width=60),
+        dataset("chromosomes", 4, bases // 4, line_width=80),
+        dataset("proteins", bases // 400, 400, alphabet=protein_alphabet),
+    ]
+
+
+def sequences(ds: dataset) -> Iterator[Tuple[str, str]]:
+    """
+    Generates the (head, sequence) pairs of a dataset.
+    """
+    rng = random.Random(ds.seed)
+    for i in range(ds.records):
+        yield f">{ds.name}_{i} synthetic", "".join(rng.choices(ds.alphabet, k=ds.length))
+
+
+def fasta_bytes(ds: dataset) -> bytes:
+    """
+    Formats a dataset as FASTA.
+    """
+    out = io.StringIO()
+    for head, seq in sequences(ds):
+        out.write(head)
+        out.write("\n")
+        width = ds.line_width or len(seq) or 1
+        for i in range(0, len(seq), width):
+            out.write(seq[i : i + width])
+            out.write("\n")
+    return out.getvalue().encode("ascii")
+
+
+def write_dataset(ds: dataset, directory: str, compression: str = "fasta") -> str:
+    """
+    Writes a dataset into directory, reusing the file of an earlier run.
+
+    Parameters
+    ----------
+        ds: dataset
+            Dataset to write.
+        directory: str
+            Target directory.
+        compression: str, default: "fasta"
+            One of "fasta" (uncompressed), "gz", "zip" or "tar.gz".
+
+    Returns
+    -------
+        str
+            Path of the written file.
+    """
+    if compression not in compressions:
+        raise ValueError(f"compression must be one of {', '.join(compressions)}.")
+
+    inner = f"{ds.name}_{ds.records}x{ds.length}_w{ds.line_width}_s{ds.seed}.fasta"
+    file_path = os.path.join(directory, inner)
+    if compression != "fasta":
+        file_path += f".{compression}"
+    if os.path.isfile(file_path):
+        return file_path
+
+    data = fasta_bytes(ds)
+    tmp_path = file_path + ".tmp"
+    if compression == "fasta":
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+    elif compression == "gz":
+        # Fixed mtime for reproducible files
+        with gzip.GzipFile(tmp_path, "wb", mtime=0) as f:
+            f.write(data)
+    elif compression == "zip":
+        with ZipFile(tmp_path, "w", ZIP_DEFLATED) as z:
+            z.writestr(inner, data)
+    else:
+        with tarfile.open(tmp_path, "w:gz") as t:
+            info = tarfile.TarInfo(inner)
+            info.size = len(data)
+            t.addfile(info, io.BytesIO(data))
+    os.replace(tmp_path, file_path)
+    return file_path
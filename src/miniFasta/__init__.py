@@ -1,12 +1,71 @@
-from ._miniFasta import print_fasta, translate_seq, reverse_comp
+from ._miniFasta import (
+    print_fasta,
+    translate_seq,
+    translate_frames,
+    translate_batch,
+    reverse_comp,
+    reverse_comp_batch,
+)
+from ._translation import genetic_code
+from ._view import seq_view
 from ._reader import read
-from ._writer import write, fasta_object
+from ._parallel import read_parallel, map_records
+from ._async import aread, aread_many
+from ._batches import read_batches, record_batch
+from ._cache import read_cached, clear_cache
+from ._writer import write, fasta_writer, fasta_object
+from ._bgzf import bgzf_reader, build_gzi, read_gzi, write_gzi
+from ._index import faidx, faidx_entry, build_index, read_index, write_index, fetch
+from ._stats import stats, fasta_stats
+from ._kmers import count_kmers, kmer_counts
+from ._dedup import dedup
+from ._motifs import find_motifs, motif_hit
+from ._sort import sort
+from ._split import split
+from ._profile import profiler, io_stats, add_observer, remove_observer
 
 __all__ = [
     "fasta_object",
+    "seq_view",
     "read",
+    "read_parallel",
+    "map_records",
+    "aread",
+    "aread_many",
+    "read_batches",
+    "record_batch",
+    "read_cached",
+    "clear_cache",
     "write",
+    "fasta_writer",
     "print_fasta",
     "translate_seq",
+    "translate_frames",
+    "translate_batch",
+    "genetic_code",
     "reverse_comp",
+    "reverse_comp_batch",
+    "faidx",
+    "faidx_entry",
+    "build_index",
+    "read_index",
+    "write_index",
+    "fetch",
+    "bgzf_reader",
+    "build_gzi",
+    "read_gzi",
+    "write_gzi",
+    "stats",
+    "fasta_stats",
+    "count_kmers",
+    "kmer_counts",
+    "dedup",
+    "find_motifs",
+    "motif_hit",
+    "sort",
+    "split",
+    "profiler",
+    "io_stats",
+    "add_observer",
+    "remove_observer",
 ]
@@ -0,0 +1,154 @@
+"""
+miniFASTA: A simple toolbox for fasta files.
+
+This is the asyncio part. Blocking reading and decompression run in an executor,
+records are handed to the event loop in batches.
+
+@author: Jules Kreuer / not_a_feature
+License: GPL-3.0
+"""
+
+from ._reader import read
+
+import asyncio
+from concurrent.futures import Executor
+from itertools import islice
+from typing import Any, AsyncGenerator, AsyncIterator, Iterable, Iterator, List, Optional, Tuple
+
+# Number of records read in the executor at once
+default_read_ahead = 1024
+
+
+def _next_batch(iterator: Iterator[Any], n: int) -> List[Any]:
+    return list(islice(iterator, n))
+
+
+async def _aread_batches(
+    file_path: str, read_ahead: int, executor: Optional[Executor], read_kwargs: Any
+) -> AsyncGenerator[List[Any], None]:
+    """
+    Yields batches of read_ahead records. The next batch is read while the current one is used.
+    """
+    loop = asyncio.get_running_loop()
+    iterator = read(file_path, **read_kwargs)
+    read_ahead = max(read_ahead, 1)
+    pending: "Optional[asyncio.Future[List[Any]]]" = None
+
+    try:
+        pending = loop.run_in_executor(executor, _next_batch, iterator, read_ahead)
+        while True:
+            batch = await pending
+            pending = None
+            if not batch:
+                break
+            if len(batch) == read_ahead:
+                pending = loop.run_in_executor(executor, _next_batch, iterator, read_ahead)
+            yield batch
+            if pending is None:
+                break
+    finally:
+        # The reader must not be closed while a batch is read
+        if pending is not None:
+            await asyncio.wait([pending])
+        await loop.run_in_executor(executor, iterator.close)  # type: ignore
+
+
+async def aread(
+    file_path: str,
+    read_ahead: int = default_read_ahead,
+    executor: Optional[Executor] = None,
+    **read_kwargs: Any,
+) -> AsyncIterator[Any]:
+    """
+    Asynchronous version of read(), use it with async for.
+    Reading and decompression run in an executor, so the event loop is never blocked.
+
+    Parameters
+    ----------
+        file_path: str
+            Path to the FASTA file.
+        read_ahead: int, default: 1024
+            Number of records read in the executor at once. The next batch is read
+            while the current one is consumed.
+        executor: concurrent.futures.Executor, optional
+            Executor running the reader. Defaults to the default executor of the event loop.
+        **read_kwargs:
+            Arguments passed to read() (e.g. upper, seq, validate).
+
+    Returns
+    -------
+        AsyncIterator
+            Asynchronous iterator of fasta_object instances (or the outputs of read()).
+    """
+    batches = _aread_batches(file_path, read_ahead, executor, read_kwargs)
+    try:
+        async for batch in batches:
+            for record in batch:
+                yield record
+    finally:
+        await batches.aclose()
+
+
+async def aread_many(
+    file_paths: Iterable[str],
+    max_open: int = 8,
+    read_ahead: int = default_read_ahead,
+    executor: Optional[Executor] = None,
+    **read_kwargs: Any,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Reads many FASTA files concurrently, see aread().
+    Records of different files are interleaved, records of a file keep their order.
+
+    Parameters
+    ----------
+        file_paths: Iterable[str]
+            Paths to the FASTA files.
+        max_open: int, default: 8
+            Maximal number of files read at once.
+        read_ahead: int, default: 1024
+            Number of records read in the executor at once, per file.
+        executor: concurrent.futures.Executor, optional
+            Executor running the readers. Defaults to the default executor of the event loop.
+        **read_kwargs:
+            Arguments passed to read().
+
+    Returns
+    -------
+        AsyncIterator[Tuple[str, Any]]
+            Asynchronous iterator of (file path, fasta_object) tuples.
+    """
+    max_open = max(max_open, 1)
+    semaphore = asyncio.Semaphore(max_open)
+    queue: "asyncio.Queue[Tuple[str, Any, Optional[Exception]]]" = asyncio.Queue(max_open)
+    done = object()
+
+    async def produce(file_path: str) -> None:
+        try:
+            async with semaphore:
+                batches = _aread_batches(file_path, read_ahead, executor, read_kwargs)
+                try:
+                    async for batch in batches:
+                        await queue.put((file_path, batch, None))
+                finally:
+                    await batches.aclose()
+            await queue.put((file_path, done, None))
+        except Exception as e:
+            await queue.put((file_path, done, e))
+
+    tasks = [asyncio.ensure_future(produce(p)) for p in file_paths]
+    remaining = len(tasks)
+    try:
+        while remaining:
+            file_path, batch, error = await queue.get()
+            if error is not None:
+                raise error
+            if batch is done:
+                remaining -= 1
+                continue
+            for record in batch:
+                yield file_path, record
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,411 @@
+"""
+miniFASTA: A simple toolbox for fasta files.
+
+This is the columnar batch part. Records are stored in the layout of Arrow string
+columns: concatenated bytes and an offsets array.
+
+@author: Jules Kreuer / not_a_feature
+License: GPL-3.0
+"""
+
+from ._miniFasta import fasta_object
+from ._view import seq_view
+from ._reader import _record_spans, _clean_body
+from ._parallel import _sources, _open_source, default_chunk_size
+
+from array import array
+from itertools import accumulate
+from operator import sub
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+
+    _has_numpy = True
+except ImportError:  # pragma: no cover
+    _has_numpy = False
+
+# Default number of records per batch
+default_batch_size = 65536
+
+# ASCII uppercase conversion, faster than bytes.upper()
+_upper_table = bytes.maketrans(b"abcdefghijklmnopqrstuvwxyz", b"ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+
+# Above this mean line length, lines are joined as slices instead of gathered with a mask
+_slice_join_line_length = 256
+
+
+def _offsets(parts: List[bytes]) -> "array[int]":
+    """
+    Start offsets of the parts in their concatenation, followed by the total length.
+    """
+    return array("q", accumulate(map(len, parts), initial=0))
+
+
+class record_batch:
+    __slots__ = ("data", "offsets", "head_data", "head_offsets")
+
+    def __init__(
+        self,
+        data: bytes,
+        offsets: "array[int]",
+        head_data: bytes,
+        head_offsets: "array[int]",
+    ):
+        """
+        Columnar batch of records. Sequence i is data[offsets[i]:offsets[i + 1]],
+        head i is head_data[head_offsets[i]:head_offsets[i + 1]] (as Arrow large_string).
+
+        Parameters
+        ----------
+            data: bytes
+                Concatenated sequences.
+            offsets: array("q")
+                n + 1 offsets of the sequences in data.
+            head_data: bytes
+                Concatenated heads, including ">".
+            head_offsets: array("q")
+                n + 1 offsets of the heads in head_data.
+        """
+        self.data = data
+        self.offsets = offsets
+        self.head_data = head_data
+        self.head_offsets = head_offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def lengths(self) -> "array[int]":
+        """
+        Sequence lengths.
+        """
+        return array("q", map(sub, self.offsets[1:], self.offsets[:-1]))
+
+    @property
+    def heads(self) -> List[str]:
+        """
+        Decoded heads.
+        """
+        o = self.head_offsets
+        d = self.head_data
+        return [d[o[i] : o[i + 1]].decode("utf-8") for i in range(len(self))]
+
+    def sequence(self, i: int) -> str:
+        """
+        Decodes a single sequence.
+        """
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("record_batch index out of range")
+        return self.data[self.offsets[i] : self.offsets[i + 1]].decode("utf-8")
+
+    def view(self, i: int) -> seq_view:
+        """
+        Zero-copy view of a single sequence.
+        """
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("record_batch index out of range")
+        return seq_view(memoryview(self.data)[self.offsets[i] : self.offsets[i + 1]])
+
+    def __getitem__(self, i: int) -> fasta_object:
+        """
+        Builds the fasta_object of a single record.
+        """
+        seq = self.sequence(i)
+        if i < 0:
+            i += len(self)
+        head = self.head_data[self.head_offsets[i] : self.head_offsets[i + 1]].decode("utf-8")
+        return fasta_object(head, seq)
+
+    def __iter__(self) -> Iterator[fasta_object]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """
+        Views of the columns as NumPy arrays, without copying.
+
+        Returns
+        -------
+            Dict[str, np.ndarray]
+                data (uint8), offsets (int64), lengths (int64),
+                head_data (uint8) and head_offsets (int64).
+        """
+        if not _has_numpy:
+            raise ImportError("to_numpy() requires NumPy.")
+        offsets = np.frombuffer(self.offsets, dtype=np.int64)
+        return {
+            "data": np.frombuffer(self.data, dtype=np.uint8),
+            "offsets": offsets,
+            "lengths": np.diff(offsets),
+            "head_data": np.frombuffer(self.head_data, dtype=np.uint8),
+            "head_offsets": np.frombuffer(self.head_offsets, dtype=np.int64),
+        }
+
+    def to_arrow(self) -> Any:
+        """
+        Converts the batch into a pyarrow.RecordBatch with the large_string
+        columns "head" and "sequence", without copying the buffers.
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("to_arrow() requires pyarrow.") from None
+
+        n = len(self)
+        heads = pa.LargeStringArray.from_buffers(
+            n, pa.py_buffer(self.head_offsets), pa.py_buffer(self.head_data)
+        )
+        seqs = pa.LargeStringArray.from_buffers(
+            n, pa.py_buffer(self.offsets), pa.py_buffer(self.data)
+        )
+        return pa.RecordBatch.from_arrays([heads, seqs], names=["head", "sequence"])
+
+    def __repr__(self) -> str:
+        return f"record_batch({len(self)} records, {len(self.data)} bases)"
+
+
+def _build(heads: List[bytes], bodies: List[bytes], upper: bool) -> record_batch:
+    data = b"".join(bodies)
+    if upper:
+        data = data.translate(_upper_table)
+    return record_batch(data, _offsets(bodies), b"".join(heads), _offsets(heads))
+
+
+def _region(buf: Any, start: int, end: int) -> Tuple[int, int]:
+    """
+    Bounds of all records starting in [start, end), see _record_spans().
+    """
+    first = next(_record_spans(buf, start, end), None)
+    if first is None:
+        return 0, 0
+    size = len(buf)
+    if end < 0 or end > size:
+        end = size
+    last = buf.find(b"\n>", max(end - 1, first[0]))
+    return first[0], last + 1 if last != -1 else size
+
+
+def _numpy_columns(region: memoryview) -> Optional[Tuple[Any, Any, Any, Any]]:
+    """
+    Splits a region of whole records into sequence and head columns with vectorized
+    operations, without a Python loop over the records or lines.
+    Returns None for inner whitespace or carriage returns inside of lines,
+    which are handled by _python_columns().
+
+    Returns
+    -------
+        Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]
+            data, offsets, head_data, head_offsets
+    """
+    a = np.frombuffer(region, dtype=np.uint8)
+    n = len(a)
+    newlines = np.flatnonzero(a == 10)
+    starts = np.concatenate(([0], newlines + 1))
+    if starts[-1] == n:
+        starts = starts[:-1]
+    ends = np.concatenate((newlines, [n]))[: len(starts)]
+    next_starts = np.minimum(ends + 1, n)
+
+    # Content of a line excludes a tailing carriage return
+    cr = (ends > starts) & (a[np.maximum(ends - 1, 0)] == 13)
+    if np.count_nonzero(a == 13) != np.count_nonzero(cr):
+        return None
+    content_ends = ends - cr
+
+    is_head = a[starts] == ord(">")
+    head_starts = starts[is_head]
+    head_ends = content_ends[is_head]
+
+    # Strip tailing whitespace of the heads
+    while True:
+        strip = (head_ends > head_starts + 1) & (a[head_ends - 1] <= 32)
+        if not strip.any():
+            break
+        head_ends = head_ends - strip
+
+    def gather(keep_lengths: Any) -> Any:
+        # Long lines are joined as slices, short lines gathered with a byte mask
+        if len(starts) * _slice_join_line_length < n:
+            keep = np.flatnonzero(keep_lengths)
+            parts = zip(starts[keep].tolist(), (starts[keep] + keep_lengths[keep]).tolist())
+            return np.frombuffer(b"".join([region[i:j] for i, j in parts]), dtype=np.uint8)
+        # Each line is split into a kept prefix and a dropped rest
+        lengths = np.stack((keep_lengths, next_starts - starts - keep_lengths), axis=1).ravel()
+        flags = np.tile(np.array([True, False]), len(starts))
+        return a[np.repeat(flags, lengths)]
+
+    body_lengths = np.where(is_head, 0, content_ends - starts)
+    data = gather(body_lengths)
+    if data.size and data.min() <= 32:
+        return None
+
+    head_lengths = np.zeros(len(starts), dtype=np.int64)
+    head_lengths[is_head] = head_ends - head_starts
+    head_data = gather(head_lengths)
+
+    record = np.cumsum(is_head) - 1
+    lengths = np.bincount(record, weights=body_lengths, minlength=len(head_starts))
+    offsets = np.concatenate(([0], np.cumsum(lengths.astype(np.int64))))
+    head_offsets = np.concatenate(([0], np.cumsum(head_ends - head_starts)))
+    return data, offsets, head_data, head_offsets
+
+
+def _python_columns(region: bytes) -> Tuple[Any, Any, Any, Any]:
+    """
+    Per record version of _numpy_columns(), returning NumPy arrays as well.
+    """
+    heads = []
+    bodies = []
+    for head_start, body_start, body_end in _record_spans(region):
+        heads.append(region[head_start:body_start].strip())
+        bodies.append(_clean_body(region[body_start:body_end]))
+    return (
+        np.frombuffer(b"".join(bodies), dtype=np.uint8),
+        np.frombuffer(_offsets(bodies), dtype=np.int64),
+        np.frombuffer(b"".join(heads), dtype=np.uint8),
+        np.frombuffer(_offsets(heads), dtype=np.int64),
+    )
+
+
+def _slice_columns(columns: Tuple[Any, ...], i: int, j: int) -> Tuple[Any, ...]:
+    """
+    Records [i, j) of columns, with offsets starting at 0.
+    """
+    data, offsets, head_data, head_offsets = columns
+    o = offsets[i : j + 1]
+    h = head_offsets[i : j + 1]
+    return data[o[0] : o[-1]], o - o[0], head_data[h[0] : h[-1]], h - h[0]
+
+
+def _join_columns(pieces: List[Tuple[Any, ...]], upper: bool) -> record_batch:
+    """
+    Concatenates column pieces into a record batch.
+    """
+
+    def join_offsets(parts: List[Any]) -> "array[int]":
+        shifted = [parts[0]]
+        total = parts[0][-1]
+        for part in parts[1:]:
+            shifted.append(part[1:] + total)
+            total += part[-1]
+        out = array("q")
+        out.frombytes(np.concatenate(shifted).astype(np.int64).tobytes())
+        return out
+
+    data = b"".join([p[0] for p in pieces])
+    if upper:
+        data = data.translate(_upper_table)
+    return record_batch(
+        data,
+        join_offsets([p[1] for p in pieces]),
+        b"".join([p[2] for p in pieces]),
+        join_offsets([p[3] for p in pieces]),
+    )
+
+
+def _numpy_batches(
+    path_obj: Path, batch_size: int, upper: bool, chunk_size: int
+) -> Iterator[record_batch]:
+    """
+    Reads whole chunks into columns and splits them into batches.
+    """
+    pieces: List[Tuple[Any, ...]] = []
+    pending = 0
+    for source in _sources(path_obj, chunk_size):
+        with _open_source(source) as (buf, start, end):
+            region_start, region_end = _region(buf, start, end)
+            if region_start == region_end:
+                continue
+            # The columns are copies, no view of the (mapped) buffer is kept
+            region = memoryview(buf)[region_start:region_end]
+            columns = _numpy_columns(region) or _python_columns(bytes(region))
+            del region
+        n = len(columns[1]) - 1
+        pos = 0
+        while pos < n:
+            take = min(batch_size - pending, n - pos)
+            pieces.append(_slice_columns(columns, pos, pos + take))
+            pending += take
+            pos += take
+            if pending == batch_size:
+                yield _join_columns(pieces, upper)
+                pieces = []
+                pending = 0
+
+    if pieces:
+        yield _join_columns(pieces, upper)
+
+
+def _python_batches(
+    path_obj: Path, batch_size: int, upper: bool, chunk_size: int
+) -> Iterator[record_batch]:
+    """
+    Builds batches record by record.
+    """
+    heads: List[bytes] = []
+    bodies: List[bytes] = []
+    for source in _sources(path_obj, chunk_size):
+        with _open_source(source) as (buf, start, end):
+            for head_start, body_start, body_end in _record_spans(buf, start, end):
+                heads.append(buf[head_start:body_start].strip())
+                bodies.append(_clean_body(buf[body_start:body_end]))
+                if len(bodies) == batch_size:
+                    yield _build(heads, bodies, upper)
+                    heads = []
+                    bodies = []
+
+    if bodies:
+        yield _build(heads, bodies, upper)
+
+
+def read_batches(
+    file_path: str,
+    batch_size: int = default_batch_size,
+    upper: bool = True,
+    chunk_size: int = default_chunk_size,
+) -> Iterator[record_batch]:
+    """
+    Read a compressed or non-compressed FASTA file as columnar record batches.
+    Whole chunks are split into sequence and head columns with vectorized NumPy
+    operations, no Python object is created per record.
+
+    Parameters
+    ----------
+        file_path: str
+            Path to the FASTA file.
+        batch_size: int, default: 65536
+            Number of records per batch. The last batch may be smaller.
+        upper: bool, default: True
+            Convert sequences to uppercase letters.
+        chunk_size: int, default: 16 MiB
+            Size of the chunks compressed files are decompressed in.
+
+    Returns
+    -------
+        Iterator[record_batch]
+            Iterator of record batches.
+
+    Raises
+    ------
+        FileNotFoundError
+            If the specified file does not exist.
+        ValueError
+            If batch_size is not positive.
+    """
+    path_obj = Path(file_path)
+
+    if not path_obj.is_file():
+        raise FileNotFoundError(f"FASTA file not found: {file_path}")
+    if batch_size < 1:
+        raise ValueError("batch_size must be positive.")
+
+    if _has_numpy:
+        yield from _numpy_batches(path_obj, batch_size, upper, chunk_size)
+    else:
+        yield from _python_batches(path_obj, batch_size, upper, chunk_size)
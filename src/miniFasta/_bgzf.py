@@ -0,0 +1,357 @@
+"""
+miniFASTA: A simple toolbox for fasta files.
+
+This is the BGZF (blocked gzip) part.
+BGZF files are concatenated gzip members of at most 64 KiB each, see the SAM specification.
+
+@author: Jules Kreuer / not_a_feature
+License: GPL-3.0
+"""
+
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import io
+import os
+import struct
+import zlib
+from typing import Any, Deque, IO, List, Optional, Tuple
+
+# Number of threads decompressing BGZF blocks while reading
+default_threads = min(os.cpu_count() or 1, 4)
+
+# Maximal number of uncompressed bytes per block, leaves room for incompressible data
+max_block_size = 0xFF00
+
+# Empty block marking the end of a BGZF file
+bgzf_eof = bytes.fromhex("1f8b08040000000000ff0600424302001b0003000000000000000000")
+
+# gzip header with FEXTRA set, followed by the BC subfield holding BSIZE (total block size - 1)
+_header = struct.Struct("<4BI2BH2BHH")
+
+
+def compress_block(data: bytes, level: int = 6) -> bytes:
+    """
+    Compresses up to max_block_size bytes into a single BGZF block.
+
+    Parameters
+    ----------
+        data: bytes
+            Uncompressed data.
+        level: int, default: 6
+            zlib compression level.
+
+    Returns
+    -------
+        bytes
+            Compressed block.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    cdata = compressor.compress(data) + compressor.flush()
+    bsize = _header.size + len(cdata) + 8 - 1
+    header = _header.pack(31, 139, 8, 4, 0, 0, 255, 6, 66, 67, 2, bsize)
+    return header + cdata + struct.pack("<II", zlib.crc32(data), len(data))
+
+
+def compress_blocks(data: bytes, level: int = 6) -> bytes:
+    """
+    Splits data into BGZF blocks and compresses them.
+
+    Parameters
+    ----------
+        data: bytes
+            Uncompressed data.
+        level: int, default: 6
+            zlib compression level.
+
+    Returns
+    -------
+        bytes
+            Concatenated compressed blocks.
+    """
+    blocks: List[bytes] = [
+        compress_block(data[i : i + max_block_size], level)
+        for i in range(0, len(data), max_block_size)
+    ]
+    return b"".join(blocks)
+
+
+def _block_size(header: bytes) -> int:
+    """
+    Returns the total size (BSIZE + 1) of a BGZF block from its first 18 header bytes.
+    Returns -1 if the header does not belong to a BGZF block.
+    """
+    if len(header) < 18 or header[:4] != b"\x1f\x8b\x08\x04":
+        return -1
+    xlen = struct.unpack_from("<H", header, 10)[0]
+    extra = header[12 : 12 + xlen]
+    pos = 0
+    while pos + 4 <= len(extra):
+        slen = struct.unpack_from("<H", extra, pos + 2)[0]
+        if extra[pos : pos + 2] == b"BC" and slen == 2:
+            return int(struct.unpack_from("<H", extra, pos + 4)[0]) + 1
+        pos += 4 + slen
+    return -1
+
+
+def is_bgzf(file_path: str) -> bool:
+    """
+    Checks if a file is BGZF compressed.
+
+    Parameters
+    ----------
+        file_path: str
+            Path to the file.
+
+    Returns
+    -------
+        bool
+            True if the file starts with a BGZF block.
+    """
+    with open(file_path, "rb") as f:
+        return _block_size(f.read(18)) != -1
+
+
+def decompress_block(block: bytes) -> bytes:
+    """
+    Decompresses a single BGZF block.
+
+    Parameters
+    ----------
+        block: bytes
+            Whole compressed block, including header and footer.
+
+    Returns
+    -------
+        bytes
+            Uncompressed data.
+    """
+    xlen = struct.unpack_from("<H", block, 10)[0]
+    return zlib.decompress(block[12 + xlen : -8], -15)
+
+
+def _read_block(handler: IO[bytes]) -> Optional[bytes]:
+    """
+    Reads the next compressed block of a handler. Returns None at the end of the file.
+    """
+    header = handler.read(18)
+    if not header:
+        return None
+    size = _block_size(header)
+    if size == -1:
+        raise ValueError("Invalid BGZF block.")
+    return header + handler.read(size - 18)
+
+
+def build_gzi(file_path: str, index_path: Optional[str] = None) -> List[Tuple[int, int]]:
+    """
+    Builds a .gzi index of a BGZF file. Only block headers and footers are read,
+    no data is decompressed.
+
+    Parameters
+    ----------
+        file_path: str
+            Path to the BGZF file.
+        index_path: str, optional
+            If set, the index is written to this path.
+
+    Returns
+    -------
+        List[Tuple[int, int]]
+            (compressed offset, uncompressed offset) of every block start, starting with (0, 0).
+    """
+    index = []
+    coffset = 0
+    uoffset = 0
+    with open(file_path, "rb") as f:
+        while True:
+            header = f.read(18)
+            if not header:
+                break
+            size = _block_size(header)
+            if size == -1:
+                raise ValueError(f"Invalid BGZF block at byte {coffset}: {file_path}")
+            f.seek(coffset + size - 4)
+            isize = struct.unpack("<I", f.read(4))[0]
+            if isize:
+                index.append((coffset, uoffset))
+            coffset += size
+            uoffset += isize
+
+    if not index or index[0] != (0, 0):
+        index.insert(0, (0, 0))
+    if index_path is not None:
+        write_gzi(index, index_path)
+    return index
+
+
+def write_gzi(index: List[Tuple[int, int]], index_path: str) -> None:
+    """
+    Writes a .gzi index (as bgzip / samtools do, without the first block).
+
+    Parameters
+    ----------
+        index: List[Tuple[int, int]]
+            Index as returned by build_gzi().
+        index_path: str
+            Path of the index.
+    """
+    entries = [e for e in index if e != (0, 0)]
+    with open(index_path, "wb") as f:
+        f.write(struct.pack("<Q", len(entries)))
+        for coffset, uoffset in entries:
+            f.write(struct.pack("<QQ", coffset, uoffset))
+    return None
+
+
+def read_gzi(index_path: str) -> List[Tuple[int, int]]:
+    """
+    Reads a .gzi index.
+
+    Parameters
+    ----------
+        index_path: str
+            Path of the index.
+
+    Returns
+    -------
+        List[Tuple[int, int]]
+            (compressed offset, uncompressed offset) of every block start, starting with (0, 0).
+    """
+    with open(index_path, "rb") as f:
+        n = struct.unpack("<Q", f.read(8))[0]
+        data = f.read(16 * n)
+    index = [(0, 0)]
+    index.extend(struct.iter_unpack("<QQ", data))
+    return index
+
+
+class bgzf_reader(io.RawIOBase):
+    def __init__(
+        self,
+        file_path: str,
+        threads: int = 1,
+        index: Optional[List[Tuple[int, int]]] = None,
+    ):
+        """
+        Binary, read-only file object over the uncompressed data of a BGZF file.
+        Wrap it in io.BufferedReader for line based reading.
+
+        Parameters
+        ----------
+            file_path: str
+                Path to the BGZF file.
+            threads: int, default: 1
+                Number of threads decompressing upcoming blocks in parallel.
+            index: List[Tuple[int, int]], optional
+                Block index for seek(), see build_gzi(). Built on first seek if missing.
+        """
+        super().__init__()
+        self._path = file_path
+        self._file: IO[bytes] = open(file_path, "rb")
+        self._threads = threads
+        self._pool = ThreadPoolExecutor(max_workers=threads) if threads > 1 else None
+        self._queue: Deque["Future[bytes]"] = deque()
+        self._eof = False
+        self._index = index
+        self._uoffsets: List[int] = []
+
+        self._block = b""
+        self._pos = 0
+        self._block_start = 0
+        self._skip = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def _next_data(self) -> Optional[bytes]:
+        """
+        Returns the uncompressed data of the next block, None at the end of the file.
+        """
+        if self._pool is None:
+            block = _read_block(self._file)
+            return None if block is None else decompress_block(block)
+
+        # Keep the pool busy with upcoming blocks
+        while not self._eof and len(self._queue) < 2 * self._threads:
+            block = _read_block(self._file)
+            if block is None:
+                self._eof = True
+            else:
+                self._queue.append(self._pool.submit(decompress_block, block))
+
+        if not self._queue:
+            return None
+        return self._queue.popleft().result()
+
+    def _load_next(self) -> bool:
+        """
+        Replaces the current block with the next one. Returns False at the end of the file.
+        """
+        self._block_start += len(self._block)
+        data = self._next_data()
+        if data is None:
+            self._block = b""
+            self._pos = 0
+            return False
+
+        self._block = data
+        self._pos = min(self._skip, len(data))
+        self._skip -= self._pos
+        return True
+
+    def readinto(self, b: Any) -> int:
+        while self._pos >= len(self._block):
+            if not self._load_next():
+                return 0
+
+        n = min(len(b), len(self._block) - self._pos)
+        b[:n] = self._block[self._pos : self._pos + n]
+        self._pos += n
+        return n
+
+    def tell(self) -> int:
+        return self._block_start + self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """
+        Seeks to an offset of the uncompressed data, using the block index.
+        """
+        if whence == io.SEEK_CUR:
+            offset += self.tell()
+        elif whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("BGZF files only support SEEK_SET and SEEK_CUR.")
+
+        # Seeking inside of the current block needs no decompression
+        if self._block_start <= offset < self._block_start + len(self._block):
+            self._pos = offset - self._block_start
+            return offset
+
+        if self._index is None:
+            self._index = build_gzi(self._path)
+        if not self._uoffsets:
+            self._uoffsets = [uoffset for _, uoffset in self._index]
+
+        i = bisect_right(self._uoffsets, offset) - 1
+        coffset, uoffset = self._index[max(i, 0)]
+
+        for future in self._queue:
+            future.cancel()
+        self._queue.clear()
+        self._eof = False
+        self._file.seek(coffset)
+        self._block = b""
+        self._pos = 0
+        self._block_start = uoffset
+        self._skip = offset - uoffset
+        return offset
+
+    def close(self) -> None:
+        if not self.closed:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+            self._file.close()
+        super().close()
@@ -0,0 +1,311 @@
+"""
+miniFASTA: A simple toolbox for fasta files.
+
+This is the parse cache part. Parsed files are stored in a binary, memory mappable
+format, keyed by the identity of the source file and the reader options.
+
+Layout of a cache file (native byte order, the cache is local to a machine):
+    magic (8 bytes), n, data length, head length (unsigned 64 bit each)
+    data: concatenated sequences
+    head data: concatenated heads, padded to a multiple of 8 bytes
+    offsets: n + 1 signed 64 bit offsets of the sequences in data
+    head offsets: n + 1 signed 64 bit offsets of the heads in head data
+
+@author: Jules Kreuer / not_a_feature
+License: GPL-3.0
+"""
+
+from ._miniFasta import fasta_object
+from ._batches import read_batches, record_batch
+
+from array import array
+from hashlib import blake2b
+import mmap
+import os
+from pathlib import Path
+import shutil
+import struct
+import tempfile
+import threading
+from typing import Any, IO, Iterator, List, Optional, Tuple, Union
+
+_magic = b"MFCACHE\x01"
+_header = struct.Struct("=8sQQQ")
+_suffix = ".mfc"
+
+# Number of records decoded at once while reading a cache file
+_read_block = 4096
+
+# Default size limit of the cache directory
+default_max_size = 4 * 1024 * 1024 * 1024
+
+
+def default_cache_dir() -> str:
+    """
+    Cache directory used if none is given: $XDG_CACHE_HOME/miniFasta or ~/.cache/miniFasta.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "miniFasta")
+
+
+def _cache_path(path_obj: Path, upper: bool, cache_dir: str) -> str:
+    """
+    Path of the cache entry of a file, keyed by its path, size, mtime and the reader options.
+    """
+    st = path_obj.stat()
+    key = f"{path_obj.resolve()}\0{st.st_size}\0{st.st_mtime_ns}\0{upper}\0{_magic!r}"
+    name = blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(cache_dir, name + _suffix)
+
+
+class _cache_writer:
+    def __init__(self, cache_path: str):
+        """
+        Writes a cache entry to a temporary file, which is moved into place by commit().
+        Heads and offsets are spilled to temporary files until the sequences are written.
+        """
+        self.cache_path = cache_path
+        directory = os.path.dirname(cache_path)
+        self.tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        self._file: IO[bytes] = open(self.tmp_path, "wb")
+        self._file.write(bytes(_header.size))
+        self._heads = tempfile.TemporaryFile(dir=directory)
+        self._offsets = tempfile.TemporaryFile(dir=directory)
+        self._head_offsets = tempfile.TemporaryFile(dir=directory)
+        array("q", [0]).tofile(self._offsets)
+        array("q", [0]).tofile(self._head_offsets)
+        self.n = 0
+        self.data_length = 0
+        self.head_length = 0
+
+    def add(self, batch: record_batch) -> None:
+        self._file.write(batch.data)
+        self._heads.write(batch.head_data)
+        shift = self.data_length
+        array("q", [o + shift for o in batch.offsets[1:]]).tofile(self._offsets)
+        shift = self.head_length
+        array("q", [o + shift for o in batch.head_offsets[1:]]).tofile(self._head_offsets)
+        self.n += len(batch)
+        self.data_length += len(batch.data)
+        self.head_length += len(batch.head_data)
+
+    def commit(self) -> None:
+        """
+        Completes the entry and atomically moves it into place.
+        """
+        self._append(self._heads)
+        # Aligns the offsets
+        self._file.write(bytes(-(_header.size + self.data_length + self.head_length) % 8))
+        self._append(self._offsets)
+        self._append(self._head_offsets)
+        self._file.seek(0)
+        self._file.write(_header.pack(_magic, self.n, self.data_length, self.head_length))
+        self.close()
+        os.replace(self.tmp_path, self.cache_path)
+
+    def _append(self, spill: IO[bytes]) -> None:
+        spill.seek(0)
+        shutil.copyfileobj(spill, self._file)
+
+    def close(self) -> None:
+        for f in (self._file, self._heads, self._offsets, self._head_offsets):
+            f.close()
+
+    def abort(self) -> None:
+        self.close()
+        try:
+            os.remove(self.tmp_path)
+        except OSError:  # pragma: no cover
+            pass
+
+
+def _records(batch: record_batch, seq: bool, headers_only: bool, lengths: bool) -> Iterator[Any]:
+    """
+    Outputs of read() for the records of a batch.
+    """
+    if seq:
+        return (batch.sequence(i) for i in range(len(batch)))
+    if headers_only:
+        return iter(batch.heads)
+    if lengths:
+        return zip(batch.heads, batch.lengths)
+    return iter(batch)
+
+
+def _decode_block(buf: Any, start: int, offsets: memoryview, first: int, last: int) -> List[str]:
+    """
+    Decodes the strings [first, last) stored at start + offsets[i].
+    ASCII blocks are decoded at once and split afterwards.
+    """
+    base = offsets[first]
+    raw = buf[start + base : start + offsets[last]]
+    text = raw.decode("utf-8")
+    if len(text) == len(raw):
+        return [text[offsets[i] - base : offsets[i + 1] - base] for i in range(first, last)]
+    return [
+        raw[offsets[i] - base : offsets[i + 1] - base].decode("utf-8") for i in range(first, last)
+    ]
+
+
+def _block(
+    buf: Any, first: int, last: int, o: memoryview, h: memoryview, head_start: int, mode: str
+) -> Iterator[Any]:
+    """
+    Outputs of the records [first, last) of a cache file.
+    """
+    if mode == "seq":
+        return iter(_decode_block(buf, _header.size, o, first, last))
+
+    heads = _decode_block(buf, head_start, h, first, last)
+    if mode == "headers_only":
+        return iter(heads)
+    if mode == "lengths":
+        return zip(heads, [o[i + 1] - o[i] for i in range(first, last)])
+    return map(fasta_object, heads, _decode_block(buf, _header.size, o, first, last))
+
+
+def _read_cache(cache_path: str, seq: bool, headers_only: bool, lengths: bool) -> Iterator[Any]:
+    """
+    Streams the records of a cache entry from the memory mapped file.
+    """
+    mode = "seq" if seq else "headers_only" if headers_only else "lengths" if lengths else ""
+    with open(cache_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            magic, n, data_length, head_length = _header.unpack_from(buf)
+            if magic != _magic:
+                raise ValueError(f"Not a miniFASTA cache file: {cache_path}")
+            head_start = _header.size + data_length
+            offsets_start = head_start + head_length
+            offsets_start += -offsets_start % 8
+            head_offsets_start = offsets_start + 8 * (n + 1)
+
+            with memoryview(buf) as mv:
+                with mv[offsets_start:head_offsets_start].cast("q") as o:
+                    with mv[head_offsets_start : head_offsets_start + 8 * (n + 1)].cast("q") as h:
+                        for first in range(0, n, _read_block):
+                            last = min(first + _read_block, n)
+                            yield from _block(buf, first, last, o, h, head_start, mode)
+
+
+def _evict(cache_dir: str, max_size: int) -> None:
+    """
+    Removes the least recently used entries until the cache fits into max_size bytes.
+    Entries are touched when they are used, so their mtime is the time of the last use.
+    """
+    entries: List[Tuple[float, int, str]] = []
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith(_suffix):
+            try:
+                st = entry.stat()
+            except OSError:  # pragma: no cover
+                continue
+            entries.append((st.st_mtime, st.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_size:
+            break
+        try:
+            os.remove(path)
+        except OSError:  # pragma: no cover
+            # E.g. still opened on Windows
+            continue
+        total -= size
+
+
+def read_cached(
+    file_path: str,
+    upper: bool = True,
+    seq: bool = False,
+    headers_only: bool = False,
+    lengths: bool = False,
+    cache_dir: Optional[str] = None,
+    max_size: int = default_max_size,
+) -> Union[Iterator[fasta_object], Iterator[str], Iterator[Tuple[str, int]]]:
+    """
+    read() with an on-disk cache of the parsed records.
+    The first call parses the file (see read_batches()) and stores the records in a
+    binary cache file while returning them. Later calls stream the records from the
+    memory mapped cache file, without decompressing or parsing the source.
+    Entries are keyed by path, size and modification time of the file and by upper,
+    a changed file is parsed again. The least recently used entries are removed if the
+    cache grows beyond max_size.
+
+    Parameters
+    ----------
+        file_path: str
+            Path to the (compressed) FASTA file.
+        upper: bool, default: True
+            Convert sequences to uppercase letters.
+        seq: bool, default: False
+            Return only the sequences instead of fasta_object instances.
+        headers_only: bool, default: False
+            Return only the heads.
+        lengths: bool, default: False
+            Return (head, sequence length) tuples.
+        cache_dir: str, optional
+            Directory of the cache. Defaults to $XDG_CACHE_HOME/miniFasta or ~/.cache/miniFasta.
+        max_size: int, default: 4 GiB
+            Size limit of the cache directory in bytes.
+
+    Returns
+    -------
+        Union[Iterator[fasta_object], Iterator[str], Iterator[Tuple[str, int]]]
+            Iterator of fasta_object instances, sequence strings, heads or (head, length) tuples.
+
+    Raises
+    ------
+        FileNotFoundError
+            If the specified file does not exist.
+        ValueError
+            If more than one of seq, headers_only and lengths is set.
+    """
+    path_obj = Path(file_path)
+
+    if not path_obj.is_file():
+        raise FileNotFoundError(f"FASTA file not found: {file_path}")
+
+    if seq + headers_only + lengths > 1:
+        raise ValueError("Only one of seq, headers_only and lengths can be set.")
+
+    cache_dir = cache_dir or default_cache_dir()
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_path = _cache_path(path_obj, upper, cache_dir)
+
+    try:
+        # Marks the entry as recently used
+        os.utime(cache_path)
+    except FileNotFoundError:
+        pass
+    else:
+        yield from _read_cache(cache_path, seq, headers_only, lengths)
+        return
+
+    writer = _cache_writer(cache_path)
+    try:
+        for batch in read_batches(file_path, upper=upper):
+            writer.add(batch)
+            yield from _records(batch, seq, headers_only, lengths)
+    except BaseException:
+        # Also if the iterator is closed early, the entry would be incomplete
+        writer.abort()
+        raise
+    writer.commit()
+    _evict(cache_dir, max_size)
+
+
+def clear_cache(cache_dir: Optional[str] = None) -> None:
+    """
+    Removes all entries of the parse cache, see read_cached().
+
+    Parameters
+    ----------
+        cache_dir: str, optional
+            Directory of the cache. Defaults to $XDG_CACHE_HOME/miniFasta or ~/.cache/miniFasta.
+    """
+    cache_dir = cache_dir or default_cache_dir()
+    if not os.path.isdir(cache_dir):
+        return
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith(_suffix):
+            os.remove(entry.path)
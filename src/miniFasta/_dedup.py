@@ -0,0 +1,112 @@
+"""
+miniFASTA: A simple toolbox for fasta files.
+
+This is the deduplication part.
+
+@author: Jules Kreuer / not_a_feature
+License: GPL-3.0
+"""
+
+from ._miniFasta import fasta_object, reverse_comp, digest_size
+
+from hashlib import blake2b
+import os
+import sqlite3
+import tempfile
+from typing import Iterable, Iterator, Optional, Set
+
+# Default memory budget of the digests held in memory
+default_memory_limit = 256 * 1024 * 1024
+
+# Approximate memory used per digest in a set (bytes object and hash table slot)
+_digest_memory = 80 + digest_size
+
+
+class _digest_store:
+    def __init__(self, memory_limit: int, tmp_dir: Optional[str] = None):
+        """
+        Set of digests, spilled to a temporary SQLite database once
+        the in-memory set exceeds the memory budget.
+        """
+        self._memory: Set[bytes] = set()
+        self._max_memory = max(memory_limit // _digest_memory, 1)
+        self._tmp_dir = tmp_dir
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_path = ""
+
+    def _spill(self) -> None:
+        if self._db is None:
+            fd, self._db_path = tempfile.mkstemp(suffix=".sqlite", dir=self._tmp_dir)
+            os.close(fd)
+            self._db = sqlite3.connect(self._db_path)
+            self._db.execute("PRAGMA journal_mode = OFF")
+            self._db.execute("PRAGMA synchronous = OFF")
+            self._db.execute("CREATE TABLE digests (d BLOB PRIMARY KEY) WITHOUT ROWID")
+        self._db.executemany(
+            "INSERT OR IGNORE INTO digests VALUES (?)", ((d,) for d in self._memory)
+        )
+        self._db.commit()
+        self._memory.clear()
+
+    def add(self, d: bytes) -> bool:
+        """
+        Adds a digest, returns False if it was already part of the store.
+        """
+        if d in self._memory:
+            return False
+        if self._db is not None:
+            if self._db.execute("SELECT 1 FROM digests WHERE d = ?", (d,)).fetchone():
+                return False
+        self._memory.add(d)
+        if len(self._memory) >= self._max_memory:
+            self._spill()
+        return True
+
+    def close(self) -> None:
+        self._memory.clear()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+            os.remove(self._db_path)
+
+
+def dedup(
+    *sources: Iterable[fasta_object],
+    revcomp: bool = False,
+    memory_limit: int = default_memory_limit,
+    tmp_dir: Optional[str] = None,
+) -> Iterator[fasta_object]:
+    """
+    Removes records with duplicate sequences from one or more streams of fasta_objects
+    (e.g. the output of read()). The first occurrence of each sequence is kept.
+    Only 16 byte digests of the sequences are stored, the sequences themselves are not.
+    Digests exceeding the memory budget are moved to a temporary SQLite database.
+
+    Parameters
+    ----------
+        *sources: Iterable[fasta_object]
+            Streams of fasta_objects, processed one after another.
+        revcomp: bool, default: False
+            Treat sequences as duplicates of their reverse complements.
+        memory_limit: int, default: 256 MiB
+            Approximate number of bytes used for digests held in memory.
+        tmp_dir: str, optional
+            Directory of the temporary database. Defaults to the system temporary directory.
+
+    Returns
+    -------
+        Iterator[fasta_object]
+            Iterator of the unique fasta_objects.
+    """
+    store = _digest_store(memory_limit, tmp_dir)
+    try:
+        for source in sources:
+            for fo in source:
+                d = fo.digest()
+                if revcomp:
+                    rev = reverse_comp(fo.getSeq()).encode("utf-8")
+                    d = min(d, blake2b(rev, digest_size=digest_size).digest())
+                if store.add(d):
+                    yield fo
+    finally:
+        store.close()
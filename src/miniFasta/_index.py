@@ -0,0 +1,364 @@
+"""
+miniFASTA: A simple toolbox for fasta files.
+
+This is the index part. Builds samtools compatible .fai indices
+and allows random access to regions of uncompressed or BGZF compressed FASTA files.
+
+@author: Jules Kreuer / not_a_feature
+License: GPL-3.0
+"""
+
+from ._miniFasta import fasta_object
+from ._bgzf import bgzf_reader, is_bgzf, build_gzi, read_gzi, default_threads
+
+from dataclasses import dataclass
+import io
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, IO
+
+
+@dataclass
+class faidx_entry:
+    """
+    Single line of a .fai index.
+
+    Parameters
+    ----------
+        name: str
+            Sequence id (first word of the header, without ">").
+        length: int
+            Number of bases in the sequence.
+        offset: int
+            Byte offset of the first base in the file.
+        linebases: int
+            Number of bases per line.
+        linewidth: int
+            Number of bytes per line, including the line terminator.
+    """
+
+    name: str
+    length: int
+    offset: int
+    linebases: int
+    linewidth: int
+
+
+def _index_name(header: bytes) -> str:
+    """
+    Extract the sequence id (first word after ">") of a header line.
+    """
+    words = header[1:].split(None, 1)
+    return words[0].decode("utf-8") if words else ""
+
+
+def _open_binary(
+    path_obj: Path, threads: int = 1, gzi: Optional[List[Tuple[int, int]]] = None
+) -> IO[bytes]:
+    """
+    Opens an uncompressed or BGZF compressed file for binary reading.
+    Offsets of BGZF files refer to the uncompressed data.
+
+    Raises
+    ------
+        ValueError
+            If the file is gzip, but not BGZF compressed.
+    """
+    if is_bgzf(str(path_obj)):
+        return io.BufferedReader(bgzf_reader(str(path_obj), threads, gzi))
+
+    with open(path_obj, "rb") as f:
+        if f.read(2) == b"\x1f\x8b":
+            raise ValueError(f"gzip files can not be indexed, use BGZF (bgzip): {path_obj}")
+    return open(path_obj, "rb")
+
+
+def build_index(
+    file_path: str, index_path: Optional[str] = None, write: bool = True
+) -> Dict[str, faidx_entry]:
+    """
+    Builds a samtools compatible .fai index of an uncompressed or BGZF compressed FASTA file.
+    Every record needs to have the same number of bases on each line (except the last one).
+
+    Parameters
+    ----------
+        file_path: str
+            Path to the FASTA file.
+        index_path: str, optional
+            Path of the index. Defaults to file_path + ".fai".
+        write: bool, default: True
+            Write the index to index_path.
+
+    Returns
+    -------
+        Dict[str, faidx_entry]
+            Index entries by sequence id, in file order.
+
+    Raises
+    ------
+        FileNotFoundError
+            If the specified file does not exist.
+        ValueError
+            If the file can not be indexed (gzip compressed, inconsistent line length or
+            duplicate ids).
+    """
+    path_obj = Path(file_path)
+    if not path_obj.is_file():
+        raise FileNotFoundError(f"FASTA file not found: {file_path}")
+
+    with _open_binary(path_obj, default_threads) as f:
+        index = _build_index(f)
+
+    if write:
+        write_index(index, index_path or f"{file_path}.fai")
+    return index
+
+
+def _build_index(handler: IO[bytes]) -> Dict[str, faidx_entry]:
+    """
+    Builds the index entries by scanning a binary handler line by line.
+    """
+    index: Dict[str, faidx_entry] = {}
+    entry: Optional[faidx_entry] = None
+    # Set once a line shorter than linebases (or an empty line) was seen in the current record
+    short_line = False
+    pos = 0
+
+    for line in handler:
+        line_start = pos
+        pos += len(line)
+
+        if line[:1] == b">":
+            name = _index_name(line)
+            if name in index:
+                raise ValueError(f"Duplicate sequence id in FASTA file: {name}")
+            entry = faidx_entry(name, 0, pos, 0, 0)
+            index[name] = entry
+            short_line = False
+            continue
+
+        if entry is None:
+            # Ignore anything before the first header
+            continue
+
+        bases = len(line.rstrip(b"\r\n"))
+        if bases == 0:
+            short_line = True
+            continue
+
+        if short_line:
+            raise ValueError(
+                f"Different line length in sequence '{entry.name}' at byte {line_start}."
+            )
+
+        if entry.linebases == 0:
+            entry.linebases = bases
+            entry.linewidth = len(line)
+        elif bases > entry.linebases or (
+            # The last line of the file may end without a line break
+            bases == entry.linebases
+            and len(line) != entry.linewidth
+            and line[-1:] == b"\n"
+        ):
+            raise ValueError(
+                f"Different line length in sequence '{entry.name}' at byte {line_start}."
+            )
+
+        if bases < entry.linebases:
+            short_line = True
+        entry.length += bases
+
+    return index
+
+
+def write_index(index: Dict[str, faidx_entry], index_path: str) -> None:
+    """
+    Writes index entries to a .fai file.
+
+    Parameters
+    ----------
+        index: Dict[str, faidx_entry]
+            Index entries as returned by build_index().
+        index_path: str
+            Path of the index.
+    """
+    with open(index_path, "w") as f:
+        for e in index.values():
+            f.write(f"{e.name}\t{e.length}\t{e.offset}\t{e.linebases}\t{e.linewidth}\n")
+    return None
+
+
+def read_index(index_path: str) -> Dict[str, faidx_entry]:
+    """
+    Reads a .fai file.
+
+    Parameters
+    ----------
+        index_path: str
+            Path of the index.
+
+    Returns
+    -------
+        Dict[str, faidx_entry]
+            Index entries by sequence id, in file order.
+    """
+    index: Dict[str, faidx_entry] = {}
+    with open(index_path, "r") as f:
+        for line in f:
+            fields = line.rstrip("\r\n").split("\t")
+            if len(fields) < 5:
+                continue
+            name = fields[0]
+            index[name] = faidx_entry(name, *(int(v) for v in fields[1:5]))
+    return index
+
+
+class faidx:
+    def __init__(self, file_path: str, index_path: Optional[str] = None, upper: bool = True):
+        """
+        Random access to an indexed FASTA file.
+        Uses an existing .fai index or builds (and writes) it if missing.
+        BGZF compressed files additionally use a .gzi index of their blocks,
+        only the blocks of a requested region are decompressed.
+
+        Parameters
+        ----------
+            file_path: str
+                Path to the uncompressed or BGZF compressed FASTA file.
+            index_path: str, optional
+                Path of the index. Defaults to file_path + ".fai".
+            upper: bool, default: True
+                Convert fetched sequences to uppercase letters.
+        """
+        path_obj = Path(file_path)
+        if not path_obj.is_file():
+            raise FileNotFoundError(f"FASTA file not found: {file_path}")
+
+        index_path = index_path or f"{file_path}.fai"
+        if Path(index_path).is_file():
+            self.index = read_index(index_path)
+        else:
+            self.index = build_index(file_path, index_path)
+
+        gzi = None
+        if is_bgzf(file_path):
+            gzi_path = f"{file_path}.gzi"
+            if Path(gzi_path).is_file():
+                gzi = read_gzi(gzi_path)
+            else:
+                gzi = build_gzi(file_path, gzi_path)
+
+        self.upper = upper
+        self._handler: IO[bytes] = _open_binary(path_obj, gzi=gzi)
+
+    def _read(self, offset: int, size: int) -> bytes:
+        """
+        Reads size raw bytes starting at offset.
+        """
+        self._handler.seek(offset)
+        return self._handler.read(size)
+
+    def fetch(self, name: str, start: int = 0, end: Optional[int] = None) -> str:
+        """
+        Fetches a region of a sequence.
+        Coordinates are 0-based and half-open, like python slices.
+
+        Parameters
+        ----------
+            name: str
+                Sequence id.
+            start: int, default: 0
+                Start of the region.
+            end: int, optional
+                End of the region (exclusive). Defaults to the end of the sequence.
+
+        Returns
+        -------
+            str
+                Sequence of the region.
+
+        Raises
+        ------
+            KeyError
+                If the sequence id is not part of the index.
+            ValueError
+                If the region is invalid.
+        """
+        try:
+            e = self.index[name]
+        except KeyError:
+            raise KeyError(f"Sequence id not found in index: {name}") from None
+
+        if start < 0 or (end is not None and end < start):
+            raise ValueError(f"Invalid region {name}:{start}-{end}.")
+        if end is None or end > e.length:
+            end = e.length
+        if start >= end:
+            return ""
+
+        first = e.offset + (start // e.linebases) * e.linewidth + start % e.linebases
+        last = e.offset + ((end - 1) // e.linebases) * e.linewidth + (end - 1) % e.linebases
+        raw = self._read(first, last - first + 1)
+
+        sequence = raw.translate(None, b"\r\n").decode("utf-8")
+        if self.upper:
+            sequence = sequence.upper()
+        return sequence
+
+    def __getitem__(self, name: str) -> fasta_object:
+        """
+        Magic method to get a whole sequence as fasta_object.
+        """
+        return fasta_object(name, self.fetch(name))
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.index)
+
+    def keys(self) -> Iterator[str]:
+        """
+        Iterates over all sequence ids in file order.
+        """
+        return iter(self.index)
+
+    def close(self) -> None:
+        """
+        Closes the underlying file.
+        """
+        self._handler.close()
+
+    def __enter__(self) -> "faidx":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+
+def fetch(file_path: str, name: str, start: int = 0, end: Optional[int] = None) -> str:
+    """
+    Fetches a region of an indexed FASTA file.
+    Coordinates are 0-based and half-open, like python slices.
+    For many lookups, keep a faidx object open instead.
+
+    Parameters
+    ----------
+        file_path: str
+            Path to the uncompressed or BGZF compressed FASTA file.
+        name: str
+            Sequence id.
+        start: int, default: 0
+            Start of the region.
+        end: int, optional
+            End of the region (exclusive). Defaults to the end of the sequence.
+
+    Returns
+    -------
+        str
+            Sequence of the region.
+    """
+    with faidx(file_path) as fa:
+        return fa.fetch(name, start, end)
@@ -0,0 +1,419 @@
+"""
+miniFASTA: A simple toolbox for fasta files.
+
+This is the k-mer counting part.
+Bases are encoded with 2 bits, k-mers are built with rolling updates and counted
+exactly (k <= 32) or approximately in a count-min sketch (any k).
+
+@author: Jules Kreuer / not_a_feature
+License: GPL-3.0
+"""
+
+from ._miniFasta import fasta_object
+from ._reader import _record_spans, _clean_body
+from ._parallel import _sources, _open_source, _imap, default_chunk_size
+
+from collections import Counter
+import os
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Tuple, Union
+
+try:
+    import numpy as np
+
+    _has_numpy = True
+except ImportError:  # pragma: no cover
+    _has_numpy = False
+
+# Largest k for exact counting, a k-mer is stored in a 64 bit integer
+max_exact_k = 32
+
+# Largest k counted exactly by default, larger k use the count-min sketch
+default_exact_k = 16
+
+_mask64 = (1 << 64) - 1
+
+# Base and multiplier of the 64 bit hashes used by the sketch
+_hash_base = 0x100000001B3
+_hash_base_inv = pow(_hash_base, -1, 1 << 64)
+_hash_mix = 0x9E3779B97F4A7C15
+
+# Number of windows processed at once with NumPy, bounds the intermediate arrays
+_window_block = 1 << 20
+
+# Base codes, everything else (including the separator of sequences) is 4
+_base_codes = {ord(b): i for i, b in enumerate("ACGT")}
+_base_codes.update({ord(b): i for i, b in enumerate("acgt")})
+_decode = "ACGT"
+
+
+def _row_seeds(depth: int) -> List[int]:
+    """
+    Seeds of the hash functions of the sketch rows.
+    """
+    return [((r + 1) * 0xBF58476D1CE4E5B9) & _mask64 for r in range(depth)]
+
+
+def _codes(data: bytes) -> bytes:
+    """
+    Translates bases into codes 0 - 3, everything else into 4.
+    """
+    return data.translate(_code_table)
+
+
+_code_table = bytes(_base_codes.get(i, 4) for i in range(256))
+
+
+def _python_kmers(codes: bytes, k: int, canonical: bool, hashed: bool) -> Iterator[int]:
+    """
+    Rolling k-mer values of a code string. Windows containing invalid bases are skipped.
+    Exact values are 2-bit packed k-mers, hashed values polynomial hashes modulo 2^64.
+    For canonical k-mers, the smaller value of the k-mer and its reverse complement is used.
+    """
+    mask = (1 << (2 * k)) - 1
+    top = 2 * (k - 1)
+    powers = [pow(_hash_base, j, 1 << 64) for j in range(k)]
+    base_k = pow(_hash_base, k, 1 << 64)
+    run = 0
+    fwd = rev = 0
+
+    for i, c in enumerate(codes):
+        if c > 3:
+            run = 0
+            fwd = rev = 0
+            continue
+
+        if not hashed:
+            fwd = ((fwd << 2) | c) & mask
+            rev = (rev >> 2) | ((3 - c) << top)
+            run += 1
+        elif run < k:
+            fwd = (fwd * _hash_base + c) & _mask64
+            rev = (rev + (3 - c) * powers[run]) & _mask64
+            run += 1
+        else:
+            old = codes[i - k]
+            fwd = (fwd * _hash_base + c - old * base_k) & _mask64
+            rev = ((rev - (3 - old)) * _hash_base_inv + (3 - c) * powers[k - 1]) & _mask64
+
+        if run >= k:
+            yield min(fwd, rev) if canonical else fwd
+
+
+def _numpy_kmers(codes: Any, k: int, canonical: bool, hashed: bool) -> Iterator[Any]:
+    """
+    Vectorized version of _python_kmers(), yields arrays of k-mer values.
+    """
+    n_total = len(codes) - k + 1
+    invalid = np.concatenate(([0], np.cumsum(codes > 3, dtype=np.int64)))
+    clean = codes & np.uint8(3)
+
+    for start in range(0, max(n_total, 0), _window_block):
+        n = min(_window_block, n_total - start)
+        valid = invalid[start + k : start + k + n] == invalid[start : start + n]
+        fwd = np.zeros(n, dtype=np.uint64)
+        rev = np.zeros(n, dtype=np.uint64)
+        for j in range(k):
+            c = clean[start + j : start + j + n].astype(np.uint64)
+            if hashed:
+                fwd = fwd * np.uint64(_hash_base) + c
+                rev += (np.uint64(3) - c) * np.uint64(pow(_hash_base, j, 1 << 64))
+            else:
+                fwd = (fwd << np.uint64(2)) | c
+                rev |= (np.uint64(3) - c) << np.uint64(2 * j)
+        values = np.minimum(fwd, rev) if canonical else fwd
+        yield values[valid]
+
+
+def _row_index(values: Any, seed: int, bits: int) -> Any:
+    """
+    Column of the hashed values in a sketch row of width 2^bits.
+    """
+    if _has_numpy and not isinstance(values, int):
+        mixed = (values ^ np.uint64(seed)) * np.uint64(_hash_mix)
+        return (mixed >> np.uint64(64 - bits)).astype(np.intp)
+    return (((values ^ seed) * _hash_mix) & _mask64) >> (64 - bits)
+
+
+def _count_source(
+    source: Tuple[Any, ...], k: int, canonical: bool, exact: bool, bits: int, depth: int
+) -> Any:
+    """
+    Counts the k-mers of a source (see _parallel._sources()) or of a ("seqs", List[bytes]) batch.
+
+    Returns
+    -------
+        Any
+            Exact: tuple of sorted unique k-mers and their counts (NumPy) or Counter.
+            Sketch: counts of each row (NumPy array or list of lists).
+    """
+    if source[0] == "seqs":
+        bodies = source[1]
+    else:
+        with _open_source(source) as (buf, start, end):
+            bodies = [_clean_body(buf[b:e]) for _, b, e in _record_spans(buf, start, end)]
+
+    # Separators invalidate windows spanning two sequences
+    codes = _codes(b"\x00".join(bodies))
+    hashed = not exact
+
+    if _has_numpy:
+        arr = np.frombuffer(codes, dtype=np.uint8)
+        if exact:
+            keys, counts = _merge_exact(
+                [
+                    np.unique(values, return_counts=True)
+                    for values in _numpy_kmers(arr, k, canonical, hashed)
+                ]
+            )
+            return keys, counts
+        table = np.zeros((depth, 1 << bits), dtype=np.int64)
+        for values in _numpy_kmers(arr, k, canonical, hashed):
+            for r, seed in enumerate(_row_seeds(depth)):
+                table[r] += np.bincount(_row_index(values, seed, bits), minlength=1 << bits)
+        return table
+
+    values_iter = _python_kmers(codes, k, canonical, hashed)
+    if exact:
+        return Counter(values_iter)
+    rows = [[0] * (1 << bits) for _ in range(depth)]
+    seeds = _row_seeds(depth)
+    for value in values_iter:
+        for row, seed in zip(rows, seeds):
+            row[_row_index(value, seed, bits)] += 1
+    return rows
+
+
+def _merge_exact(partials: List[Tuple[Any, Any]]) -> Tuple[Any, Any]:
+    """
+    Merges (unique k-mers, counts) array pairs.
+    """
+    if not partials:
+        return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.int64)
+    if len(partials) == 1:
+        return partials[0][0], partials[0][1].astype(np.int64)
+    keys, inverse = np.unique(np.concatenate([p[0] for p in partials]), return_inverse=True)
+    weights = np.concatenate([p[1] for p in partials])
+    counts = np.bincount(inverse.ravel(), weights=weights, minlength=len(keys))
+    return keys, counts.astype(np.int64)
+
+
+class kmer_counts:
+    def __init__(self, k: int, canonical: bool, exact: bool, bits: int, depth: int):
+        """
+        Result of count_kmers(). Exact counts support lookups, iteration and most_common(),
+        sketches only support (over-)estimating the count of a k-mer.
+
+        Parameters
+        ----------
+            k: int
+                Length of the k-mers.
+            canonical: bool
+                K-mers and their reverse complements are counted together.
+            exact: bool
+                Counts are exact, not estimated with a count-min sketch.
+            bits: int
+                Sketch rows have 2^bits columns.
+            depth: int
+                Number of sketch rows.
+        """
+        self.k = k
+        self.canonical = canonical
+        self.exact = exact
+        self.total = 0
+        self._bits = bits
+        self._depth = depth
+        self._data: Any = None
+
+    def _add(self, partial: Any) -> None:
+        """
+        Merges a partial result of _count_source().
+        """
+        if self._data is None:
+            self._data = partial
+        elif not self.exact:
+            if _has_numpy:
+                self._data += partial
+            else:
+                for row, other in zip(self._data, partial):
+                    row[:] = map(sum, zip(row, other))
+        elif _has_numpy:
+            self._data = _merge_exact([self._data, partial])
+        else:
+            self._data.update(partial)
+
+    def _finish(self) -> None:
+        if self._data is None:
+            self._data = _count_source(
+                ("seqs", []), self.k, self.canonical, self.exact, self._bits, self._depth
+            )
+        if not self.exact:
+            self.total = int(sum(self._data[0]))
+        elif _has_numpy:
+            self.total = int(self._data[1].sum())
+        else:
+            self.total = sum(self._data.values())
+
+    def _encode(self, kmer: str) -> int:
+        """
+        Value of a k-mer as stored in the counts.
+        """
+        codes = _codes(kmer.encode("ascii"))
+        if len(codes) != self.k or max(codes, default=0) > 3:
+            raise ValueError(f"Not a {self.k}-mer over ACGT: {kmer}")
+        return next(_python_kmers(codes, self.k, self.canonical, not self.exact))
+
+    def _decode(self, value: int) -> str:
+        return "".join(_decode[(value >> (2 * (self.k - 1 - j))) & 3] for j in range(self.k))
+
+    def __getitem__(self, kmer: str) -> int:
+        """
+        Count of a k-mer (and its reverse complement if canonical).
+        Sketches return an upper bound of the count.
+        """
+        value = self._encode(kmer)
+        if not self.exact:
+            return min(
+                int(row[_row_index(value, seed, self._bits)])
+                for row, seed in zip(self._data, _row_seeds(self._depth))
+            )
+        if not _has_numpy:
+            return int(self._data.get(value, 0))
+        keys, counts = self._data
+        i = int(np.searchsorted(keys, np.uint64(value)))
+        return int(counts[i]) if i < len(keys) and int(keys[i]) == value else 0
+
+    def _require_exact(self) -> None:
+        if not self.exact:
+            raise TypeError("Sketches do not store the k-mers, use exact counting.")
+
+    def __len__(self) -> int:
+        """
+        Number of distinct k-mers.
+        """
+        self._require_exact()
+        return len(self._data[0]) if _has_numpy else len(self._data)
+
+    def items(self) -> Iterator[Tuple[str, int]]:
+        """
+        Iterates over (k-mer, count) pairs. Canonical k-mers are returned as the
+        lexicographically smaller one of both strands.
+        """
+        self._require_exact()
+        if _has_numpy:
+            pairs: Iterable[Tuple[int, int]] = zip(self._data[0].tolist(), self._data[1].tolist())
+        else:
+            pairs = sorted(self._data.items())
+        for value, count in pairs:
+            yield self._decode(value), count
+
+    def most_common(self, n: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Returns the n most common k-mers and their counts.
+        """
+        self._require_exact()
+        if _has_numpy:
+            keys, counts = self._data
+            order = np.argsort(-counts, kind="stable")[:n]
+            return [(self._decode(int(keys[i])), int(counts[i])) for i in order]
+        pairs = sorted(self._data.items(), key=lambda p: (-p[1], p[0]))[:n]
+        return [(self._decode(value), count) for value, count in pairs]
+
+    def __repr__(self) -> str:
+        mode = "exact" if self.exact else f"sketch {self._depth}x{1 << self._bits}"
+        return f"kmer_counts(k={self.k}, {mode}, total={self.total})"
+
+
+def count_kmers(
+    source: Union[str, Iterable[Union[fasta_object, str]]],
+    k: int,
+    canonical: bool = True,
+    exact: Optional[bool] = None,
+    width: int = 1 << 20,
+    depth: int = 4,
+    workers: Optional[int] = None,
+    chunk_size: int = default_chunk_size,
+) -> kmer_counts:
+    """
+    Counts the k-mers of a FASTA file or of an iterable of fasta_objects / sequences.
+    K-mers containing other bases than ACGT (case-insensitive) are skipped.
+    Chunks of the input are counted in a process pool and merged afterwards.
+
+    Parameters
+    ----------
+        source: str or Iterable[fasta_object or str]
+            Path to a (compressed) FASTA file, or e.g. the output of read().
+        k: int
+            Length of the k-mers.
+        canonical: bool, default: True
+            Count k-mers together with their reverse complements.
+        exact: bool, optional
+            Count exactly (k <= 32) or in a count-min sketch with bounded memory.
+            Defaults to exact counting for k <= 16.
+        width: int, default: 2^20
+            Number of counters per sketch row, rounded up to a power of two.
+        depth: int, default: 4
+            Number of sketch rows.
+        workers: int, optional
+            Number of processes. Defaults to the number of cores.
+        chunk_size: int, default: 16 MiB
+            Number of bytes counted by a single task.
+
+    Returns
+    -------
+        kmer_counts
+            Exact counts or sketch.
+
+    Raises
+    ------
+        ValueError
+            If k is not positive or exact counting is requested for k > 32.
+        FileNotFoundError
+            If the specified file does not exist.
+    """
+    if k < 1:
+        raise ValueError("k must be positive.")
+    if exact is None:
+        exact = k <= default_exact_k
+    if exact and k > max_exact_k:
+        raise ValueError(f"Exact counting supports k <= {max_exact_k}, use exact=False.")
+
+    bits = max(width - 1, 1).bit_length()
+    workers = workers or os.cpu_count() or 1
+
+    tasks: Iterable[Tuple[Any, ...]]
+    if isinstance(source, (str, Path)):
+        path_obj = Path(source)
+        if not path_obj.is_file():
+            raise FileNotFoundError(f"FASTA file not found: {source}")
+        tasks = ((s, k, canonical, exact, bits, depth) for s in _sources(path_obj, chunk_size))
+    else:
+        tasks = (
+            (("seqs", batch), k, canonical, exact, bits, depth)
+            for batch in _batches(source, chunk_size)
+        )
+
+    result = kmer_counts(k, canonical, exact, bits, depth)
+    for partial in _imap(_count_source, tasks, workers, False):
+        result._add(partial)
+    result._finish()
+    return result
+
+
+def _batches(records: Iterable[Union[fasta_object, str]], chunk_size: int) -> Iterator[List[bytes]]:
+    """
+    Groups sequences into batches of about chunk_size bytes.
+    """
+    batch: List[bytes] = []
+    size = 0
+    for record in records:
+        body = record.getSeq() if isinstance(record, fasta_object) else record
+        data = body.encode("ascii", "replace")
+        batch.append(data)
+        size += len(data)
+        if size >= chunk_size:
+            yield batch
+            batch = []
+            size = 0
+    if batch:
+        yield batch
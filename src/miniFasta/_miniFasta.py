@@ -8,8 +8,19 @@ Or:  https://pypi.org/project/miniFasta/
 License: GPL-3.0
 """
 
-from typing import Iterator
+from ._translation import get_codon_table, codon_table
+from ._packed import packed_seq
+
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union, TYPE_CHECKING
 from dataclasses import dataclass
+from functools import lru_cache
+from hashlib import blake2b
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ._view import seq_view
+
+# Size of the content digest in bytes
+digest_size = 16
 
 # Usual translation dictionary according to
 # https://www.ncbi.nlm.nih.gov/Taxonomy/Utils/wprintgc.cgi#SG1
@@ -100,10 +111,54 @@ complement_dict = {
 }
 
 
+# Allowed characters of each sequence type, see fasta_object.valid()
+allowed_chars = {
+    "PROT": "ACDEFGHIKLMNPWRSTVWYUOBJZ*X-.",
+    "NA": "ACGRYSWKMBDHVNTU",
+    "DNA": "ACGRYSWKMBDHVNT",
+    "RNA": "ACGRYSWKMBDHVNU",
+}
+
+
+@lru_cache(maxsize=32)
+def _deletion_table(allowedChars: str) -> Dict[int, Optional[int]]:
+    """
+    Returns a (cached) str.translate table deleting all allowed characters.
+    """
+    return str.maketrans("", "", allowedChars)
+
+
+def _find_invalid(seq: str, allowedChars: str) -> Optional[Tuple[int, str]]:
+    """
+    Finds the first character of seq that is not part of allowedChars.
+    All allowed characters are deleted in a single pass, the first remaining one is the offender.
+
+    Returns
+    -------
+        Optional[Tuple[int, str]]
+            (position, character) of the first invalid character or None if seq is valid.
+    """
+    rest = seq.translate(_deletion_table(allowedChars))
+    if not rest:
+        return None
+    return seq.index(rest[0]), rest[0]
+
+
+def _wrap(body: str, width: int) -> str:
+    """
+    Splits a sequence into lines of width characters, without tailing newline.
+    """
+    if len(body) <= width:
+        return body
+    return "\n".join([body[i : i + width] for i in range(0, len(body), width)])
+
+
 @dataclass
 class fasta_object:
+    __slots__ = ("head", "body", "stype", "_digest")
+
     head: str
-    body: str
+    body: Union[str, packed_seq]
     stype: str
 
     def __init__(self, head: str, body: str, stype: str = "any"):
@@ -136,25 +191,35 @@ class fasta_object:
         else:
             raise RuntimeError("fasta object type must be one of 'dna', 'prot' or 'any'.")
 
+        # (body, digest) of the last computed digest
+        self._digest: Optional[Tuple[Union[str, packed_seq], bytes]] = None
+
     def __str__(self) -> str:
         """
         Magic method to allow fasta_object printing.
         """
-        out = f"{self.head}\n"
+        body = self.getSeq()
+        if not body:
+            return self.head
 
         # Print only 70 chars per line
-        for i in range(0, len(self.body), 70):
-            out += f"{self.body[i:i+70]}\n"
-
-        # Remove tailing newline
-        return out[:-1]
+        return f"{self.head}\n{_wrap(body, 70)}"
 
     def __eq__(self, o) -> bool:
         """
         Magic method to allow equality check on fasta_objects.
         Does not check for header equality.
         """
-        return self.body == o.body  # type:ignore
+        if isinstance(self.body, str) and isinstance(o.body, str):
+            return self.body == o.body
+        return str(self.body) == str(o.body)  # type:ignore
+
+    def __hash__(self) -> int:
+        """
+        Magic method to allow fasta_objects in sets and as dictionary keys.
+        As equality, only depends on the body.
+        """
+        return int.from_bytes(self.digest()[:8], "little")
 
     def __len__(self) -> int:
         """
@@ -169,6 +234,13 @@ class fasta_object:
         """
         return iter(self.body)
 
+    def __getitem__(self, key: Union[int, slice]) -> str:
+        """
+        Magic method to allow indexing and slicing of the sequence.
+        Packed sequences only decode the requested part.
+        """
+        return self.body[key]
+
     def getHead(self) -> str:
         """
         Getter method to return the head / sequence id.
@@ -178,8 +250,62 @@ class fasta_object:
     def getSeq(self) -> str:
         """
         Getter method to return the sequence.
+        Packed sequences are decoded.
+        """
+        return str(self.body)
+
+    def view(self) -> "seq_view":
+        """
+        Zero-copy view of the sequence, see seq_view.
+        The sequence is encoded once per call, slices and windows of the view are not copied.
+
+        Raises
+        ------
+            ValueError
+                If the sequence contains non-ASCII characters.
         """
-        return self.body
+        from ._view import seq_view
+
+        return seq_view(self.getSeq().encode("ascii"))
+
+    def digest(self) -> bytes:
+        """
+        Fixed-size (16 bytes) BLAKE2b digest of the sequence.
+        Computed once and cached until the body is replaced.
+        """
+        cached = self._digest
+        if cached is not None and cached[0] is self.body:
+            return cached[1]
+        d = blake2b(self.getSeq().encode("utf-8"), digest_size=digest_size).digest()
+        self._digest = (self.body, d)
+        return d
+
+    def pack(self) -> None:
+        """
+        Stores the sequence packed with 2 bits (ACGT, N runs are stored separately)
+        or 4 bits (IUPAC nucleotide codes) per base.
+        All methods work on packed sequences, decoding happens lazily.
+        Methods that modify the sequence (toAmino, toRevComp) unpack it.
+
+        Raises
+        ------
+            ValueError
+                If the sequence contains characters that can not be packed (e.g. lowercase).
+        """
+        if isinstance(self.body, str):
+            self.body = packed_seq(self.body)
+
+    def unpack(self) -> None:
+        """
+        Stores the sequence as plain string again.
+        """
+        self.body = str(self.body)
+
+    def isPacked(self) -> bool:
+        """
+        Checks if the sequence is stored packed.
+        """
+        return isinstance(self.body, packed_seq)
 
     def valid(self, allowedChars: str = "") -> bool:
         """
@@ -190,26 +316,30 @@ class fasta_object:
             allowedChars: str
                 Optional to overwrite default settings.
         """
-        if 250000 <= len(self.body):
-            return False
+        return self.findInvalid(allowedChars) is None
 
+    def findInvalid(self, allowedChars: str = "") -> Optional[Tuple[int, str]]:
+        """
+        Finds the first illegal character in the body.
+        stype of fasta_object needs to be set in order to check for illegal characters in its body.
+        Parameters
+        ----------
+            allowedChars: str
+                Optional to overwrite default settings.
+
+        Returns
+        -------
+            Optional[Tuple[int, str]]
+                (position, character) of the first illegal character or None if the body is valid.
+        """
         if not allowedChars:
             if self.stype == "ANY":
-                return True
-            elif self.stype == "PROT":
-                allowedChars = "ACDEFGHIKLMNPWRSTVWYUOBJZ*X-."
-            else:
-                allowedChars = "ACGRYSWKMBDHVN"
-                if self.stype == "NA":
-                    allowedChars += "TU"
-                elif self.stype == "DNA":
-                    allowedChars += "T"
-                elif self.stype == "RNA":
-                    allowedChars += "U"
-
-        return all(c in allowedChars for c in self.body)
-
-    def toAmino(self, d=translation_dict) -> None:
+                return None
+            allowedChars = allowed_chars[self.stype]
+
+        return _find_invalid(self.getSeq(), allowedChars)
+
+    def toAmino(self, d=translation_dict, table: int = 1) -> None:
         """
         Translates the dna sequence of a fasta_object to amino-acids.
         Reading frame starts at position 0, tailing bases will be ignored.
@@ -219,8 +349,10 @@ class fasta_object:
         ----------
             d: dict
                 Translation dictionary.
+            table: int, default: 1
+                NCBI genetic code. Only used if no custom translation dictionary is set.
         """
-        self.body = translate_seq(self.body, d)
+        self.body = translate_seq(self.getSeq(), d, table)
 
     def toRevComp(self, d=complement_dict) -> None:
         """
@@ -232,7 +364,7 @@ class fasta_object:
             d: dict
                 Comlement dictionary.
         """
-        self.body = reverse_comp(self.body, d)
+        self.body = self.getSeq().translate(_complement_table(d))[::-1]
 
 
 def print_fasta(fasta) -> None:
@@ -248,31 +380,16 @@ def print_fasta(fasta) -> None:
     return None
 
 
-def __maybeFind(key, d, alt):
+def _codon_table(d, table: int) -> codon_table:
     """
-    Tries to find key in dict but has a fallback.
-
-    Parameters
-    ----------
-        key: hashable
-            Key to find.
-        d: dict
-            Dictionary to search.
-        alt: any
-            Alternative if key not found.
-
-    Returns
-    -------
-        v: any
-            Found value or alt.
+    Returns the compiled table of a custom dictionary or of the NCBI genetic code.
     """
-    try:
-        return d[key]
-    except KeyError:
-        return alt
+    if d is translation_dict:
+        return get_codon_table(table=table)
+    return get_codon_table(d)
 
 
-def translate_seq(seq: str, d=translation_dict) -> str:
+def translate_seq(seq: str, d=translation_dict, table: int = 1) -> str:
     """
     Translates a DNA sequence to a AA sequence.
     Reading frame starts at position 0, tailing bases will be ignored.
@@ -286,25 +403,94 @@ def translate_seq(seq: str, d=translation_dict) -> str:
             Sequence to translate.
         d: dict
             Translation dictionary.
+        table: int, default: 1
+            NCBI genetic code. Only used if no custom translation dictionary is set.
 
     Returns:
         translated: str
             Translated sequence.
     """
+    return _codon_table(d, table).translate(seq)
+
+
+def translate_frames(seq: str, d=translation_dict, table: int = 1) -> List[str]:
+    """
+    Translates a DNA sequence in all six reading frames.
+    Attention: Will replace triplet with ~ if not found.
+
+    Parameters
+    ----------
+        seq: str
+            Sequence to translate.
+        d: dict
+            Translation dictionary.
+        table: int, default: 1
+            NCBI genetic code. Only used if no custom translation dictionary is set.
+
+    Returns:
+        frames: List[str]
+            Translated frames +1, +2, +3, -1, -2, -3.
+    """
+    rev = reverse_comp(seq)
+    return _codon_table(d, table).translate_many([seq, seq[1:], seq[2:], rev, rev[1:], rev[2:]])
+
+
+def translate_batch(
+    fasta_objects: Iterable[fasta_object], d=translation_dict, table: int = 1
+) -> List[fasta_object]:
+    """
+    Translates multiple fasta_objects at once.
+    Reading frame starts at position 0, tailing bases will be ignored.
+    Attention: Will replace triplet with ~ if not found.
+
+    Parameters
+    ----------
+        fasta_objects: Iterable[fasta_object]
+            fasta_objects to translate. They are not modified.
+        d: dict
+            Translation dictionary.
+        table: int, default: 1
+            NCBI genetic code. Only used if no custom translation dictionary is set.
+
+    Returns:
+        translated: List[fasta_object]
+            New fasta_objects (stype PROT) with the translated sequences.
+    """
+    fasta_objects = list(fasta_objects)
+    translated = _codon_table(d, table).translate_many([fo.getSeq() for fo in fasta_objects])
+    return [fasta_object(fo.head, t, "PROT") for fo, t in zip(fasta_objects, translated)]
 
-    translated = ""
-    for i in range(0, len(seq), 3):
-        codon = seq[i : i + 3]
-        if not len(codon) == 3:
-            break
-        translated += __maybeFind(codon, d, "~")
-    return translated
+
+@lru_cache(maxsize=32)
+def _compile_complement(items: Tuple[Tuple[str, str], ...]) -> Dict[int, str]:
+    """
+    Compiles a complement dictionary into a str.translate table.
+    Lowercase (soft-masked) bases are complemented to lowercase, unless set explicitly.
+    """
+    d = dict(items)
+    table = {}
+    for b, c in d.items():
+        if len(b) != 1:
+            # Only single bases can be complemented
+            continue
+        table[ord(b)] = c
+        if b.lower() not in d:
+            table[ord(b.lower())] = c.lower()
+    return table
+
+
+def _complement_table(d=complement_dict) -> Dict[int, str]:
+    """
+    Returns the (cached) translate table of a complement dictionary.
+    """
+    return _compile_complement(tuple(d.items()))
 
 
 def reverse_comp(seq: str, d=complement_dict) -> str:
     """
     Reverses complement of sequence.
     If no complement was found, the nucleotides remains unchanged.
+    The case of the bases is preserved.
 
     Parameters
     ----------
@@ -318,7 +504,29 @@ def reverse_comp(seq: str, d=complement_dict) -> str:
         rev: str
             Translated sequence
     """
-    if seq == "":
-        return ""
-    rev = reversed(seq)
-    return "".join(map(lambda b: __maybeFind(b, complement_dict, b), rev))  # type:ignore
+    return seq.translate(_complement_table(d))[::-1]
+
+
+def reverse_comp_batch(
+    fasta_objects: Iterable[fasta_object], d=complement_dict
+) -> List[fasta_object]:
+    """
+    Reverses complement of multiple fasta_objects.
+    If no complement was found, the nucleotides remains unchanged.
+
+    Parameters
+    ----------
+        fasta_objects: Iterable[fasta_object]
+            fasta_objects to reverse complement. They are not modified.
+        d: dict
+            Complement dictionary.
+
+    Returns
+    -------
+        rev: List[fasta_object]
+            New fasta_objects with the reverse complement sequences.
+    """
+    table = _complement_table(d)
+    return [
+        fasta_object(fo.head, fo.getSeq().translate(table)[::-1], fo.stype) for fo in fasta_objects
+    ]
@@ -0,0 +1,266 @@
+"""
+miniFASTA: A simple toolbox for fasta files.
+
+This is the motif search part. All patterns (and their reverse complements) are
+compiled into a prefix tree, which is matched as a single regular expression.
+
+@author: Jules Kreuer / not_a_feature
+License: GPL-3.0
+"""
+
+from ._miniFasta import fasta_object, reverse_comp
+from ._reader import read, _record_spans, _record_head, _clean_body
+from ._parallel import _sources, _open_source, _imap, _record_chunks, default_chunk_size
+
+import re
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
+
+# Bases matched by the IUPAC nucleotide codes of a pattern, N matches any character
+iupac_bases = {
+    "A": "A",
+    "C": "C",
+    "G": "G",
+    "T": "TU",
+    "U": "TU",
+    "R": "AG",
+    "Y": "CTU",
+    "S": "CG",
+    "W": "ATU",
+    "K": "GTU",
+    "M": "AC",
+    "B": "CGTU",
+    "D": "AGTU",
+    "H": "ACTU",
+    "V": "ACG",
+    "N": "",
+}
+
+# Edge of the prefix tree: the characters it matches, None for any character
+_token = Optional[FrozenSet[str]]
+
+
+class motif_hit(NamedTuple):
+    """
+    Occurrence of a pattern.
+
+    Attributes
+    ----------
+        head: str
+            Head of the record.
+        pattern: str
+            The pattern, as passed to find_motifs().
+        strand: str
+            "+" or "-" if the reverse complement of the pattern was found.
+        start: int
+            0-based start on the forward strand.
+        end: int
+            End on the forward strand (exclusive).
+    """
+
+    head: str
+    pattern: str
+    strand: str
+    start: int
+    end: int
+
+
+class _trie_node:
+    __slots__ = ("children", "ends")
+
+    def __init__(self) -> None:
+        self.children: Dict[_token, "_trie_node"] = {}
+        # (pattern index, strand) of the patterns ending here
+        self.ends: List[Tuple[int, str]] = []
+
+
+def _tokens(pattern: str) -> List[_token]:
+    """
+    Characters matched by each position of a pattern, in both cases.
+
+    Raises
+    ------
+        ValueError
+            If the pattern is empty or contains non IUPAC characters.
+    """
+    if not pattern:
+        raise ValueError("Patterns must not be empty.")
+    tokens: List[_token] = []
+    for c in pattern.upper():
+        try:
+            bases = iupac_bases[c]
+        except KeyError:
+            raise ValueError(f"Illegal character '{c}' in pattern {pattern}.") from None
+        tokens.append(frozenset(bases + bases.lower()) if bases else None)
+    return tokens
+
+
+def _token_regex(token: _token) -> str:
+    if token is None:
+        return "."
+    if len(token) == 1:
+        return re.escape(next(iter(token)))
+    return "[" + "".join(sorted(token)) + "]"
+
+
+def _trie_regex(node: _trie_node) -> str:
+    """
+    Regular expression matching the prefix tree below a node.
+    Shared prefixes are matched once, a pattern ending here ends the match.
+    """
+    if node.ends:
+        return ""
+    alternatives = [_token_regex(t) + _trie_regex(c) for t, c in node.children.items()]
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return "(?:" + "|".join(alternatives) + ")"
+
+
+class _motif_set:
+    def __init__(self, patterns: List[str], both_strands: bool):
+        """
+        Compiled patterns. The regular expression finds the positions at which
+        any pattern starts, the prefix tree is walked there to find which.
+        """
+        self.patterns = patterns
+        self.lengths = [len(p) for p in patterns]
+        self.root = _trie_node()
+
+        for i, pattern in enumerate(patterns):
+            self._insert(_tokens(pattern), (i, "+"))
+            if both_strands:
+                self._insert(_tokens(reverse_comp(pattern.upper())), (i, "-"))
+
+        self.regex = re.compile(f"(?={_trie_regex(self.root)})", re.DOTALL)
+
+    def _insert(self, tokens: List[_token], end: Tuple[int, str]) -> None:
+        node = self.root
+        for token in tokens:
+            node = node.children.setdefault(token, _trie_node())
+        node.ends.append(end)
+
+    def _walk(self, seq: str, pos: int) -> List[Tuple[int, str]]:
+        """
+        (pattern index, strand) of all patterns starting at pos.
+        """
+        found: List[Tuple[int, str]] = []
+        stack = [(self.root, pos)]
+        n = len(seq)
+        while stack:
+            node, p = stack.pop()
+            found.extend(node.ends)
+            if p == n:
+                continue
+            c = seq[p]
+            for token, child in node.children.items():
+                if token is None or c in token:
+                    stack.append((child, p + 1))
+        found.sort()
+        return found
+
+    def find(self, head: str, seq: str) -> Iterator[motif_hit]:
+        """
+        Finds all (overlapping) occurrences in a sequence, ordered by position.
+        """
+        for m in self.regex.finditer(seq):
+            pos = m.start()
+            for i, strand in self._walk(seq, pos):
+                yield motif_hit(head, self.patterns[i], strand, pos, pos + self.lengths[i])
+
+
+def _find_source(source: Tuple[Any, ...], motifs: _motif_set) -> List[motif_hit]:
+    """
+    Finds the motifs in a source (see _parallel._sources()) or in a
+    ("records", List[fasta_object]) chunk.
+    """
+    if source[0] == "records":
+        return [hit for fo in source[1] for hit in motifs.find(fo.head, fo.getSeq())]
+
+    hits: List[motif_hit] = []
+    with _open_source(source) as (buf, start, end):
+        for head_start, body_start, body_end in _record_spans(buf, start, end):
+            head = _record_head(buf, head_start, body_start)
+            seq = _clean_body(buf[body_start:body_end]).decode("utf-8")
+            hits.extend(motifs.find(head, seq))
+    return hits
+
+
+def find_motifs(
+    source: Union[str, Iterable[fasta_object]],
+    patterns: Iterable[str],
+    both_strands: bool = True,
+    workers: int = 1,
+    chunk_size: int = default_chunk_size,
+) -> Iterator[motif_hit]:
+    """
+    Finds all occurrences of many patterns in a FASTA file or in fasta_objects.
+    Patterns may contain IUPAC nucleotide codes (e.g. N, R, Y), matching is
+    case-insensitive and overlapping occurrences are reported.
+    The reverse strand is searched with the reverse complements of the patterns,
+    the sequences themselves are not reverse complemented.
+
+    Parameters
+    ----------
+        source: str or Iterable[fasta_object]
+            Path to a (compressed) FASTA file, or e.g. the output of read().
+        patterns: Iterable[str]
+            Patterns to search for.
+        both_strands: bool, default: True
+            Also search the reverse strand.
+        workers: int, default: 1
+            Number of processes. With more than one, chunks of about chunk_size
+            bytes are searched in a process pool, see read_parallel().
+        chunk_size: int, default: 16 MiB
+            Number of bytes searched by a single task.
+
+    Returns
+    -------
+        Iterator[motif_hit]
+            Iterator of (head, pattern, strand, start, end) tuples, in the order of the records
+            and, within a record, of the start positions.
+
+    Raises
+    ------
+        ValueError
+            If a pattern is empty or contains non IUPAC characters.
+        FileNotFoundError
+            If the specified file does not exist.
+    """
+    motifs = _motif_set(list(patterns), both_strands)
+    if not motifs.patterns:
+        return
+
+    records: Iterable[fasta_object]
+    if isinstance(source, (str, Path)):
+        path_obj = Path(source)
+        if not path_obj.is_file():
+            raise FileNotFoundError(f"FASTA file not found: {source}")
+        if workers > 1:
+            tasks = ((s, motifs) for s in _sources(path_obj, chunk_size))
+            for hits in _imap(_find_source, tasks, workers):
+                yield from hits
+            return
+        records = cast(Iterator[fasta_object], read(str(path_obj), upper=False))
+    else:
+        records = source
+
+    if workers <= 1:
+        for fo in records:
+            yield from motifs.find(fo.head, fo.getSeq())
+        return
+
+    chunks = ((("records", chunk), motifs) for chunk in _record_chunks(records, chunk_size))
+    for hits in _imap(_find_source, chunks, workers):
+        yield from hits
@@ -0,0 +1,182 @@
+"""
+miniFASTA: A simple toolbox for fasta files.
+
+This is the packed sequence part. Nucleotide sequences are stored with
+2 bits (ACGT) or 4 bits (IUPAC) per base and decoded lazily.
+
+@author: Jules Kreuer / not_a_feature
+License: GPL-3.0
+"""
+
+from array import array
+from bisect import bisect_right
+import re
+from typing import Any, Iterator, Union
+
+# 4-bit codes, the position in the string is the code (same as BAM, but with "-" instead of "=")
+iupac_codes = "-ACMGRSVTWYHKDBN"
+
+_hex_digits = "0123456789abcdef"
+
+# Encoding: base -> digit of the packed number
+_two_bit_encode = str.maketrans("ACGTN", "01230")
+_four_bit_encode = str.maketrans(iupac_codes, _hex_digits)
+
+# Decoding: hex digit of a packed byte -> bases
+_two_bit_decode = str.maketrans(
+    {ord(h): "ACGT"[i >> 2] + "ACGT"[i & 3] for i, h in enumerate(_hex_digits)}
+)
+_four_bit_decode = str.maketrans(_hex_digits, iupac_codes)
+
+# Characters allowed by each encoding, used to check if a sequence can be packed
+_two_bit_chars = str.maketrans("", "", "ACGTN")
+_four_bit_chars = str.maketrans("", "", iupac_codes)
+
+_n_runs = re.compile("N+")
+
+# Number of bases decoded at once while iterating
+_iter_block = 65536
+
+
+class packed_seq:
+    __slots__ = ("_data", "_length", "_bits", "_n_starts", "_n_ends")
+
+    def __init__(self, seq: str):
+        """
+        Compact, immutable storage of a nucleotide sequence.
+        Uses 2 bits per base for sequences consisting of ACGT (and N, stored as
+        run-length mask) and 4 bits per base for IUPAC nucleotide codes.
+        Decoding happens lazily, only for the accessed part of the sequence.
+
+        Parameters
+        ----------
+            seq: str
+                Uppercase nucleotide sequence.
+
+        Raises
+        ------
+            ValueError
+                If the sequence contains characters which can not be packed (e.g. lowercase).
+        """
+        self._length = len(seq)
+        self._n_starts = array("Q")
+        self._n_ends = array("Q")
+
+        if not seq.translate(_two_bit_chars):
+            self._bits = 2
+            for m in _n_runs.finditer(seq):
+                self._n_starts.append(m.start())
+                self._n_ends.append(m.end())
+
+            digits = seq.translate(_two_bit_encode)
+            digits += "0" * (-len(digits) % 4)
+            self._data = int(digits, 4).to_bytes(len(digits) // 4, "big") if digits else b""
+
+        elif not seq.translate(_four_bit_chars):
+            self._bits = 4
+            digits = seq.translate(_four_bit_encode)
+            digits += "0" * (len(digits) % 2)
+            self._data = bytes.fromhex(digits)
+
+        else:
+            raise ValueError("Sequence contains characters that can not be packed.")
+
+    def _decode(self, start: int, stop: int) -> str:
+        """
+        Decodes the bases [start, stop), 0 <= start <= stop <= len.
+        """
+        if start >= stop:
+            return ""
+
+        per_byte = 8 // self._bits
+        first = start // per_byte
+        last = (stop - 1) // per_byte + 1
+        table = _two_bit_decode if self._bits == 2 else _four_bit_decode
+        offset = first * per_byte
+        seq = self._data[first:last].hex().translate(table)[start - offset : stop - offset]
+
+        if not self._n_starts:
+            return seq
+
+        # Overlay the N runs intersecting with [start, stop)
+        i = max(bisect_right(self._n_starts, start) - 1, 0)
+        parts = []
+        pos = start
+        while i < len(self._n_starts) and self._n_starts[i] < stop:
+            n_start = max(self._n_starts[i], start)
+            n_end = min(self._n_ends[i], stop)
+            i += 1
+            if n_end <= n_start:
+                continue
+            parts.append(seq[pos - start : n_start - start])
+            parts.append("N" * (n_end - n_start))
+            pos = n_end
+        parts.append(seq[pos - start :])
+        return "".join(parts)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __str__(self) -> str:
+        return self._decode(0, self._length)
+
+    def __repr__(self) -> str:
+        return f"packed_seq({self._bits} bit, {self._length} bases)"
+
+    def __getitem__(self, key: Union[int, slice]) -> str:
+        """
+        Magic method to decode a single base or a slice.
+        """
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._length)
+            if step == 1:
+                return self._decode(start, stop)
+            if step > 0:
+                return self._decode(start, stop)[::step]
+            # Negative steps: decode the covered range and slice it
+            if start <= stop:
+                return ""
+            return self._decode(stop + 1, start + 1)[::step]
+
+        if key < 0:
+            key += self._length
+        if not 0 <= key < self._length:
+            raise IndexError("packed_seq index out of range")
+        return self._decode(key, key + 1)
+
+    def __iter__(self) -> Iterator[str]:
+        for start in range(0, self._length, _iter_block):
+            yield from self._decode(start, min(start + _iter_block, self._length))
+
+    def __eq__(self, o: Any) -> bool:
+        if isinstance(o, packed_seq):
+            if self._bits == o._bits:
+                return (
+                    self._length == o._length
+                    and self._data == o._data
+                    and self._n_starts == o._n_starts
+                    and self._n_ends == o._n_ends
+                )
+            return str(self) == str(o)
+        return bool(str(self) == o)
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    @property
+    def bits(self) -> int:
+        """
+        Number of bits used per base.
+        """
+        return self._bits
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Number of bytes used to store the packed bases and N runs.
+        """
+        return (
+            len(self._data)
+            + self._n_starts.itemsize * len(self._n_starts)
+            + self._n_ends.itemsize * len(self._n_ends)
+        )
@@ -0,0 +1,392 @@
+"""
+miniFASTA: A simple toolbox for fasta files.
+
+This is the parallel reader part.
+
+@author: Jules Kreuer / not_a_feature
+License: GPL-3.0
+"""
+
+from ._miniFasta import fasta_object, translate_batch, reverse_comp_batch
+from ._reader import _parse_buffer, _get_file_handlers, _compressed_suffixes
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+import mmap
+import os
+import tarfile
+from pathlib import Path
+from zipfile import ZipFile
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    IO,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+# Default size of the byte ranges parsed by a single worker
+default_chunk_size = 16 * 1024 * 1024
+
+
+def _chunk_ranges(file_size: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """
+    Split a file into byte ranges of roughly chunk_size bytes.
+    The ranges are not aligned to records. A worker parses every record starting inside its range.
+    """
+    chunk_size = max(chunk_size, 1)
+    return [
+        (start, min(start + chunk_size, file_size)) for start in range(0, file_size, chunk_size)
+    ]
+
+
+def _stream_chunks(handler: IO[bytes], chunk_size: int) -> Iterator[bytes]:
+    """
+    Read a binary stream in chunks of at least chunk_size bytes.
+    Each chunk ends right before the start of a record, so no record is split.
+    Only the new data is searched for a record start, parts of records longer than
+    chunk_size are joined once.
+    """
+    parts: List[bytes] = []
+    while True:
+        data = handler.read(max(chunk_size, 1))
+        if not data:
+            break
+        cut = data.rfind(b"\n>")
+        if cut == -1:
+            if data[:1] == b">" and parts and parts[-1][-1:] == b"\n":
+                # The record starts right at the border of two reads
+                yield b"".join(parts)
+                parts = []
+            parts.append(data)
+            continue
+        parts.append(data[: cut + 1])
+        yield b"".join(parts)
+        parts = [data[cut + 1 :]]
+    if parts:
+        yield b"".join(parts)
+
+
+def _sources(path_obj: Path, chunk_size: int) -> Iterator[Tuple[Any, ...]]:
+    """
+    Lazily split a file into independently parsable sources:
+        ("range", file_path, start, end): records starting in a byte range of an uncompressed file.
+        ("zip", file_path, name): member of a .zip archive, decompressed by the worker.
+        ("tar", file_path, offset, size): member of an uncompressed .tar archive.
+        ("bytes", data): chunk of a gzip stream (.gz, .bgz, .tar.gz members).
+            gzip streams can only be decompressed serially, this happens here.
+    """
+    file_path = str(path_obj)
+    file_suffix = path_obj.suffix.lower()
+
+    if file_suffix == ".zip":
+        with ZipFile(file_path, "r") as zip_handler:
+            names = zip_handler.namelist()
+        for name in names:
+            yield ("zip", file_path, name)
+
+    elif file_suffix == ".tar":
+        with tarfile.open(file_path, "r") as tar_handler:
+            for member in tar_handler:
+                if member.isfile():
+                    yield ("tar", file_path, member.offset_data, member.size)
+
+    elif file_suffix in _compressed_suffixes:
+        # .gz, .bgz or .tar.gz, handlers are binary for all of them
+        for handler in _get_file_handlers(path_obj):
+            with handler:
+                for data in _stream_chunks(handler, chunk_size):
+                    yield ("bytes", data)
+
+    else:
+        for start, end in _chunk_ranges(path_obj.stat().st_size, chunk_size):
+            yield ("range", file_path, start, end)
+
+
+@contextmanager
+def _open_source(source: Tuple[Any, ...]) -> Iterator[Tuple[Any, int, int]]:
+    """
+    Loads the data of a source.
+
+    Returns
+    -------
+        Iterator[Tuple[Any, int, int]]
+            Context manager of (buffer, start, end), see _record_spans().
+    """
+    kind = source[0]
+    if kind == "range":
+        _, file_path, start, end = source
+        with open(file_path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                yield buf, start, end
+        return
+
+    if kind == "zip":
+        with ZipFile(source[1], "r") as zip_handler:
+            data = zip_handler.read(source[2])
+    elif kind == "tar":
+        with open(source[1], "rb") as f:
+            f.seek(source[2])
+            data = f.read(source[3])
+    else:
+        data = source[1]
+    yield data, 0, -1
+
+
+def _parse_source(
+    source: Tuple[Any, ...], upper: bool, seq: bool
+) -> List[Union[Tuple[str, str], str]]:
+    """
+    Parse all records of a source.
+
+    Returns
+    -------
+        List[Union[Tuple[str, str], str]]
+            List of (head, sequence) tuples or sequences if seq is set.
+    """
+    with _open_source(source) as (buf, start, end):
+        if seq:
+            return [sequence for _, sequence in _parse_buffer(buf, start, end, upper)]
+        return list(_parse_buffer(buf, start, end, upper))
+
+
+def _record_chunks(
+    records: Iterable[fasta_object], chunk_size: int
+) -> Iterator[List[fasta_object]]:
+    """
+    Groups fasta_objects into chunks of about chunk_size bases, which are sent to a worker at once.
+    """
+    chunk: List[fasta_object] = []
+    size = 0
+    for fo in records:
+        chunk.append(fo)
+        size += len(fo)
+        if size >= chunk_size:
+            yield chunk
+            chunk = []
+            size = 0
+    if chunk:
+        yield chunk
+
+
+def _imap(
+    func: Callable[..., Any],
+    tasks: Iterable[Tuple[Any, ...]],
+    workers: int,
+    ordered: bool = True,
+) -> Iterator[Any]:
+    """
+    Apply func to each task (tuple of arguments) in a process pool.
+    At most 2 * workers tasks are pending at once, which bounds the memory usage.
+
+    Parameters
+    ----------
+        func: Callable
+            Picklable (module level) function.
+        tasks: Iterable[Tuple]
+            Arguments of each call.
+        workers: int
+            Number of processes. With 1, tasks are run in this process.
+        ordered: bool, default: True
+            Return results in the order of the tasks instead of the order of completion.
+
+    Returns
+    -------
+        Iterator[Any]
+            Iterator of results.
+    """
+    if workers <= 1:
+        for task in tasks:
+            yield func(*task)
+        return
+
+    task_iter = iter(tasks)
+    max_pending = 2 * workers
+    executor = ProcessPoolExecutor(max_workers=workers)
+    queue: Deque["Future[Any]"] = deque()
+    pending: Set["Future[Any]"] = set()
+
+    def submit() -> bool:
+        for task in task_iter:
+            future = executor.submit(func, *task)
+            queue.append(future)
+            pending.add(future)
+            return True
+        return False
+
+    try:
+        while len(pending) < max_pending and submit():
+            pass
+
+        if ordered:
+            while queue:
+                future = queue.popleft()
+                pending.discard(future)
+                submit()
+                yield future.result()
+        else:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.discard(future)
+                    submit()
+                    yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def read_parallel(
+    file_path: str,
+    workers: Optional[int] = None,
+    chunk_size: int = default_chunk_size,
+    ordered: bool = True,
+    upper: bool = True,
+    seq: bool = False,
+) -> Union[Iterator[fasta_object], Iterator[str]]:
+    """
+    Read a FASTA file with multiple processes.
+    Uncompressed files are split into byte ranges, each range is parsed by a worker.
+    Members of .zip and .tar archives are decompressed and parsed by the workers.
+    gzip streams (.gz, .bgz, .tar.gz) can only be decompressed serially, they are
+    decompressed here in chunks which are parsed by the workers.
+    At most 2 * workers chunks or members are held in memory at once.
+
+    Parameters
+    ----------
+        file_path: str
+            Path to the FASTA file.
+        workers: int, optional
+            Number of processes, i.e. the maximum number of concurrently parsed
+            chunks or archive members. Defaults to the number of cores.
+        chunk_size: int, default: 16 MiB
+            Size of the chunks parsed by a single task (not used for .zip and .tar members).
+        ordered: bool, default: True
+            Return the records in file order. If False, records of a chunk or member are
+            returned as soon as it is parsed.
+        upper: bool, default: True
+            Convert sequences to uppercase letters.
+        seq: bool, default: False
+            Return only the sequences instead of fasta_object instances.
+
+    Returns
+    -------
+        Union[Iterator[fasta_object], Iterator[str]]
+            Iterator of fasta_object instances or sequence strings.
+
+    Raises
+    ------
+        FileNotFoundError
+            If the specified file does not exist.
+    """
+    path_obj = Path(file_path)
+
+    if not path_obj.is_file():
+        raise FileNotFoundError(f"FASTA file not found: {file_path}")
+
+    workers = workers or os.cpu_count() or 1
+    tasks = ((source, upper, seq) for source in _sources(path_obj, chunk_size))
+
+    for records in _imap(_parse_source, tasks, workers, ordered):
+        if seq:
+            yield from records
+        else:
+            for head, sequence in records:
+                yield fasta_object(head, sequence)
+
+
+# Built-in operations of map_records(), applied to all records of a chunk at once
+batch_operations: Dict[str, Callable[[List[fasta_object]], List[fasta_object]]] = {
+    "toAmino": translate_batch,
+    "toRevComp": reverse_comp_batch,
+}
+
+
+def _map_source(
+    source: Tuple[Any, ...], func: Union[str, Callable[[fasta_object], Any]], upper: bool
+) -> List[Any]:
+    """
+    Applies func to all records of a source or of a ("records", List[fasta_object]) chunk.
+    """
+    if source[0] == "records":
+        fos = source[1]
+    else:
+        with _open_source(source) as (buf, start, end):
+            fos = [fasta_object(head, seq) for head, seq in _parse_buffer(buf, start, end, upper)]
+
+    if isinstance(func, str):
+        return batch_operations[func](fos)
+    return [func(fo) for fo in fos]
+
+
+def map_records(
+    source: Union[str, Iterable[fasta_object]],
+    func: Union[str, Callable[[fasta_object], Any]],
+    workers: Optional[int] = None,
+    chunk_size: int = default_chunk_size,
+    ordered: bool = True,
+    upper: bool = True,
+) -> Iterator[Any]:
+    """
+    Applies a function to every record of a FASTA file (or of fasta_objects) in a process pool.
+    Files are split as in read_parallel() and each worker parses its own chunks,
+    fasta_objects are sent to the workers in chunks of about chunk_size bases.
+    At most 2 * workers chunks are pending at once, which bounds the memory usage.
+
+    Parameters
+    ----------
+        source: str or Iterable[fasta_object]
+            Path to a (compressed) FASTA file, or e.g. the output of read().
+        func: str or Callable[[fasta_object], Any]
+            Picklable (module level) function applied to each record, or the name of a
+            built-in operation applied to whole chunks at once:
+                "toAmino": translated fasta_objects, see translate_batch().
+                "toRevComp": reverse complemented fasta_objects, see reverse_comp_batch().
+        workers: int, optional
+            Number of processes. Defaults to the number of cores.
+            With 1, func is applied in this process.
+        chunk_size: int, default: 16 MiB
+            Number of bytes (bases for fasta_objects) processed by a single task.
+        ordered: bool, default: True
+            Return the results in the order of the records. If False, the results of a chunk
+            are returned as soon as it is processed.
+        upper: bool, default: True
+            Convert sequences to uppercase letters (only used for files).
+
+    Returns
+    -------
+        Iterator[Any]
+            Iterator of the results.
+
+    Raises
+    ------
+        ValueError
+            If func is the name of an unknown operation.
+        FileNotFoundError
+            If the specified file does not exist.
+    """
+    if isinstance(func, str) and func not in batch_operations:
+        raise ValueError(f"func must be a function or one of {', '.join(batch_operations)}.")
+
+    workers = workers or os.cpu_count() or 1
+
+    tasks: Iterable[Tuple[Any, ...]]
+    if isinstance(source, (str, Path)):
+        path_obj = Path(source)
+        if not path_obj.is_file():
+            raise FileNotFoundError(f"FASTA file not found: {source}")
+        tasks = ((s, func, upper) for s in _sources(path_obj, chunk_size))
+    else:
+        tasks = ((("records", chunk), func, upper) for chunk in _record_chunks(source, chunk_size))
+
+    for results in _imap(_map_source, tasks, workers, ordered):
+        yield from results
@@ -0,0 +1,215 @@
+"""
+miniFASTA: A simple toolbox for fasta files.
+
+This is the instrumentation part. read() and fasta_writer only measure
+their stages while an observer is registered, otherwise nothing is recorded.
+
+@author: Jules Kreuer / not_a_feature
+License: GPL-3.0
+"""
+
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Callable, Dict, IO, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class io_stats:
+    """
+    Measurements of a single read() or fasta_writer run, passed to the observers.
+
+    Attributes
+    ----------
+        kind: str
+            "read" or "write".
+        file_path: str
+            Path of the file.
+        times: Dict[str, float]
+            Seconds spent in each stage, excluding nested stages.
+            read: open, read (plain files), decompress, parse, construct
+            write: open, format, compress, write
+        counts: Dict[str, int]
+            Counters, e.g. records, lines, members, bytes_in, bytes_out.
+    """
+
+    kind: str
+    file_path: str
+    times: Dict[str, float] = field(default_factory=dict)
+    counts: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def seconds(self) -> float:
+        """
+        Total measured time.
+        """
+        return sum(self.times.values())
+
+
+# Registered observers, called with the io_stats of every finished run
+_observers: List[Callable[[io_stats], None]] = []
+
+
+def add_observer(observer: Callable[[io_stats], None]) -> None:
+    """
+    Registers an observer. It is called with an io_stats object after each read() or
+    fasta_writer run. Instrumentation is only active while observers are registered.
+
+    Parameters
+    ----------
+        observer: Callable[[io_stats], None]
+            Callback, e.g. forwarding the numbers to a metrics system.
+    """
+    _observers.append(observer)
+
+
+def remove_observer(observer: Callable[[io_stats], None]) -> None:
+    """
+    Removes a registered observer.
+    """
+    _observers.remove(observer)
+
+
+class _recorder:
+    def __init__(self, kind: str, file_path: str):
+        """
+        Collects the measurements of a single run.
+        Time is attributed to the innermost active stage only.
+        """
+        self.stats = io_stats(kind, str(file_path))
+        self._stack: List[str] = []
+        self._last = perf_counter()
+        self._finished = False
+
+    def _tick(self) -> None:
+        now = perf_counter()
+        if self._stack:
+            stage = self._stack[-1]
+            self.stats.times[stage] = self.stats.times.get(stage, 0.0) + now - self._last
+        self._last = now
+
+    def enter(self, stage: str) -> None:
+        self._tick()
+        self._stack.append(stage)
+
+    def exit(self) -> None:
+        self._tick()
+        self._stack.pop()
+
+    def count(self, counter: str, n: int = 1) -> None:
+        self.stats.counts[counter] = self.stats.counts.get(counter, 0) + n
+
+    def timed(self, iterator: Iterator[T], stage: str, counter: str = "") -> Iterator[T]:
+        """
+        Attributes the time spent in next() of an iterator to a stage.
+        """
+        while True:
+            self.enter(stage)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.exit()
+            if counter:
+                self.count(counter)
+            yield item
+
+    def handlers(self, handlers: Iterator[IO[Any]], stage: str) -> Iterator["_observed_handler"]:
+        """
+        Times the opening of (archive member) handlers and the reading of their lines.
+        """
+        for handler in self.timed(handlers, "open", "members"):
+            yield _observed_handler(handler, self, stage)
+
+    def observe(self, records: Iterator[T]) -> Iterator[T]:
+        """
+        Times the construction of the records and reports the run when done.
+        """
+        try:
+            yield from self.timed(records, "construct", "records")
+        finally:
+            self.finish()
+
+    def finish(self) -> None:
+        if self._finished:
+            return
+        self._finished = True
+        for observer in list(_observers):
+            observer(self.stats)
+
+
+def recorder(kind: str, file_path: str) -> Optional[_recorder]:
+    """
+    Returns a recorder if an observer is registered, None otherwise.
+    """
+    return _recorder(kind, file_path) if _observers else None
+
+
+class _observed_handler:
+    def __init__(self, handler: IO[Any], rec: _recorder, stage: str):
+        """
+        Line iterator over a handler, counting lines and bytes.
+        """
+        self._handler = handler
+        self._rec = rec
+        self._stage = stage
+
+    def __iter__(self) -> Iterator[Any]:
+        rec = self._rec
+        for line in rec.timed(iter(self._handler), self._stage):
+            rec.count("lines")
+            rec.count("bytes_in", len(line))
+            yield line
+
+    def __enter__(self) -> "_observed_handler":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self._handler.close()
+
+
+class profiler:
+    def __init__(self) -> None:
+        """
+        Context manager collecting the measurements of all read() and fasta_writer
+        runs inside of it, summed up per kind ("read", "write").
+
+        Example
+        -------
+            with mf.profiler() as p:
+                mf.write(mf.read("in.fasta.gz"), "out.fasta")
+            print(p.summary())
+        """
+        self.runs = 0
+        self.totals: Dict[str, io_stats] = {}
+
+    def __call__(self, stats: io_stats) -> None:
+        self.runs += 1
+        total = self.totals.setdefault(stats.kind, io_stats(stats.kind, ""))
+        for stage, seconds in stats.times.items():
+            total.times[stage] = total.times.get(stage, 0.0) + seconds
+        for counter, n in stats.counts.items():
+            total.counts[counter] = total.counts.get(counter, 0) + n
+
+    def __enter__(self) -> "profiler":
+        add_observer(self)
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        remove_observer(self)
+
+    def summary(self) -> str:
+        """
+        Human readable table of the stage times and counters.
+        """
+        lines = [f"{self.runs} runs"]
+        for kind, total in sorted(self.totals.items()):
+            lines.append(f"{kind}: {total.seconds:.4f} s")
+            for stage, seconds in sorted(total.times.items(), key=lambda x: -x[1]):
+                share = seconds / total.seconds if total.seconds else 0.0
+                lines.append(f"  {stage:<12} {seconds:>10.4f} s {share:>7.1%}")
+            for counter, n in sorted(total.counts.items()):
+                lines.append(f"  {counter:<12} {n:>12}")
+        return "\n".join(lines)
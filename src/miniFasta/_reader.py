@@ -7,13 +7,28 @@ This is the reader part.
 License: GPL-3.0
 """
 
-from ._miniFasta import fasta_object
+from ._miniFasta import fasta_object, allowed_chars, _find_invalid
+from ._bgzf import bgzf_reader, is_bgzf, default_threads
+from . import _profile
 
 from zipfile import ZipFile
 import gzip
+import io
+import mmap
+import re
 import tarfile
 from pathlib import Path
-from typing import Iterator, Union, List, IO, Any, cast
+from typing import Iterator, Optional, Union, List, Tuple, IO, Any, Iterable, Pattern, Set, cast
+
+# Suffixes handled by _get_file_handlers as compressed / archived files
+_compressed_suffixes = (".zip", ".tar", ".gz", ".bgz")
+
+# Whitespace removed by str.strip() (besides line breaks) that may occur inside a body
+_inner_whitespace = b" \t\x0b\x0c"
+_inner_whitespace_chars = (b" ", b"\t", b"\x0b", b"\x0c")
+
+# Bodies of at least this size are searched for inner whitespace without being copied
+_search_length = 2048
 
 
 def _maybe_byte_to_str(maybe_byte: Union[bytes, str]) -> str:
@@ -35,9 +50,444 @@ def _maybe_byte_to_str(maybe_byte: Union[bytes, str]) -> str:
     return str(maybe_byte).rstrip()
 
 
-def _get_file_handlers(file_path: Path) -> List[IO[Any]]:
+def _record_spans(buf: Any, start: int = 0, end: int = -1) -> Iterator[Tuple[int, int, int]]:
+    """
+    Find the records of a bytes-like buffer using bulk find operations.
+    A record starts with a ">" at the beginning of a line.
+
+    Parameters
+    ----------
+        buf: bytes-like
+            Buffer (bytes or mmap) containing FASTA formatted data.
+        start: int, default: 0
+            Only records starting at or after this position are returned.
+        end: int, default: -1
+            Only records starting before this position are returned. -1 for the whole buffer.
+
+    Returns
+    -------
+        Iterator[Tuple[int, int, int]]
+            Iterator of (head_start, body_start, body_end) positions.
+            The head includes its line break, if any (see _record_head()).
+            The body includes line breaks and ends before the next record.
+    """
+    size = len(buf)
+    if end < 0 or end > size:
+        end = size
+
+    if start == 0 and buf[:1] == b">":
+        pos = 0
+    else:
+        pos = buf.find(b"\n>", max(start - 1, 0))
+        pos = pos + 1 if pos != -1 else size
+
+    while pos < end:
+        head_end = buf.find(b"\n", pos)
+        if head_end == -1:
+            yield pos, size, size
+            return
+
+        next_pos = buf.find(b"\n>", head_end)
+        next_pos = next_pos + 1 if next_pos != -1 else size
+        yield pos, head_end + 1, next_pos
+        pos = next_pos
+
+
+def _record_head(buf: Any, head_start: int, body_start: int) -> str:
+    """
+    Decoded head of a record found by _record_spans(), without its line break.
+    The last head of a buffer may not end with a line break.
+    """
+    return str(buf[head_start:body_start].decode("utf-8").strip())
+
+
+def _has_inner_whitespace(raw: bytes) -> bool:
+    """
+    Checks if a raw body contains whitespace other than line breaks.
+    """
+    if len(raw) < _search_length:
+        # A single pass, the four searches below cost more for short bodies
+        return len(raw.translate(None, _inner_whitespace)) != len(raw)
+    return any(c in raw for c in _inner_whitespace_chars)
+
+
+def _clean_body(raw: bytes) -> bytes:
+    """
+    Remove line breaks and surrounding whitespace of each line from a raw body.
+    Whitespace inside of a line is kept, as in the line based reader.
+
+    Parameters
+    ----------
+        raw: bytes
+            Raw body including line breaks.
+
+    Returns
+    -------
+        bytes
+            Joined sequence.
+    """
+    if not _has_inner_whitespace(raw):
+        return raw.translate(None, b"\r\n")
+    # Slow path, only if a line contains spaces or tabs
+    return b"".join(line.strip() for line in raw.split(b"\n"))
+
+
+def _body_length(raw: bytes) -> int:
+    """
+    Number of bases in a raw body, without building the joined sequence.
+
+    Parameters
+    ----------
+        raw: bytes
+            Raw body including line breaks.
+
+    Returns
+    -------
+        int
+            Length of the sequence _clean_body() would return.
+    """
+    if _has_inner_whitespace(raw):
+        return len(_clean_body(raw))
+    length = len(raw) - raw.count(b"\n")
+    if b"\r" in raw:
+        length -= raw.count(b"\r")
+    return length
+
+
+def _record_id(head: str) -> str:
+    """
+    ID of a record, the first word of its head without the leading ">".
+    """
+    words = head[1:].split(None, 1) if head[:1] == ">" else head.split(None, 1)
+    return words[0] if words else ""
+
+
+class _record_filter:
+    def __init__(
+        self,
+        min_length: int = 0,
+        max_length: Optional[int] = None,
+        header: Optional[Pattern[str]] = None,
+        ids: Optional[Set[str]] = None,
+    ):
+        """
+        Predicates of read(). Heads are checked before the body of a record is read,
+        lengths before the sequence is built.
+        """
+        self.min_length = min_length
+        self.max_length = max_length
+        self.header = header
+        self.ids = ids
+        self.needs_length = min_length > 0 or max_length is not None
+        self.checks_head = header is not None or ids is not None
+
+    def keep_head(self, head: str) -> bool:
+        if self.ids is not None and _record_id(head) not in self.ids:
+            return False
+        return self.header is None or self.header.search(head) is not None
+
+    def keep_length(self, length: int) -> bool:
+        if length < self.min_length:
+            return False
+        return self.max_length is None or length <= self.max_length
+
+
+def _read_ids(id_file: str) -> Set[str]:
+    """
+    Reads an ID file with one ID per line. Lines may be heads, only the first word is used.
+    """
+    with open(id_file, "r") as f:
+        return {i for i in map(_record_id, (line.strip() for line in f)) if i}
+
+
+def _make_filter(
+    min_length: int,
+    max_length: Optional[int],
+    header: Optional[Union[str, Pattern[str]]],
+    ids: Optional[Iterable[str]],
+    id_file: Optional[str],
+) -> Optional[_record_filter]:
+    """
+    Builds the record filter of read(), None if no predicate is set.
+    See read() for the parameters.
+    """
+    if min_length < 0:
+        raise ValueError("min_length must not be negative.")
+    if max_length is not None and max_length < min_length:
+        raise ValueError("max_length must not be smaller than min_length.")
+
+    id_set: Optional[Set[str]] = None
+    if ids is not None:
+        # A single ID is not split into characters
+        id_set = {_record_id(ids)} if isinstance(ids, str) else set(map(_record_id, ids))
+    if id_file is not None:
+        id_set = _read_ids(id_file) | (id_set or set())
+
+    pattern = re.compile(header) if isinstance(header, str) else header
+
+    if not min_length and max_length is None and pattern is None and id_set is None:
+        return None
+    return _record_filter(min_length, max_length, pattern, id_set)
+
+
+def _parse_buffer(
+    buf: Any,
+    start: int = 0,
+    end: int = -1,
+    upper: bool = True,
+    flt: Optional[_record_filter] = None,
+) -> Iterator[Tuple[str, str]]:
+    """
+    Parse the records of a bytes-like buffer starting in [start, end).
+    See _record_spans() for the parameters.
+    Bodies of records rejected by flt are not touched.
+
+    Returns
+    -------
+        Iterator[Tuple[str, str]]
+            Iterator of (head, sequence) tuples.
+    """
+    for head_start, body_start, body_end in _record_spans(buf, start, end):
+        head = _record_head(buf, head_start, body_start)
+        if flt is not None and not flt.keep_head(head):
+            continue
+        raw = buf[body_start:body_end]
+        if flt is not None and flt.needs_length and not flt.keep_length(_body_length(raw)):
+            continue
+        sequence = _clean_body(raw).decode("utf-8")
+        if upper:
+            sequence = sequence.upper()
+        yield head, sequence
+
+
+def _read_mmap(
+    path_obj: Path, upper: bool, flt: Optional[_record_filter] = None
+) -> Iterator[Tuple[str, str]]:
+    """
+    Read an uncompressed FASTA file by memory mapping it.
+    Records and line breaks are found with bulk operations on the mapped buffer.
+    See read() for the parameters.
+
+    Returns
+    -------
+        Iterator[Tuple[str, str]]
+            Iterator of (head, sequence) tuples.
+    """
+    with open(path_obj, "rb") as f:
+        # Empty files can not be mapped
+        if path_obj.stat().st_size == 0:
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            yield from _parse_buffer(buf, upper=upper, flt=flt)
+
+
+def _parse_handler(handler: IO[Any], upper: bool) -> Iterator[Tuple[str, str]]:
+    """
+    Parse a file handler line by line.
+    See read() for the parameters.
+
+    Returns
+    -------
+        Iterator[Tuple[str, str]]
+            Iterator of (head, sequence) tuples.
+    """
+    head = ""
+    body: List[str] = []
+    new_object = True
+
+    # Cache method references to avoid repeated lookups
+    body_append = body.append
+
+    for maybe_byte_line in handler:
+        # Convert byte string to string if needed
+        line = _maybe_byte_to_str(maybe_byte_line)
+
+        # Skip empty lines
+        if not line:
+            continue
+
+        # Handle header lines (starting with '>')
+        if line[0] == ">":  # Faster than startswith for single char
+            # If this is not the first object, yield the previous one
+            if not new_object:
+                # Apply transformations once on final sequence
+                sequence = "".join(body)
+                if upper:
+                    sequence = sequence.upper()
+                yield head, sequence
+
+            # Start new object
+            head = line.strip()
+            body = []
+            body_append = body.append
+            new_object = False
+
+        # Handle sequence lines
+        else:
+            # Strip whitespace but defer uppercasing until final join
+            body_append(line.strip())
+
+    # Yield the last element if any data was processed
+    if not new_object and (head or body):
+        # Apply transformations once on final sequence
+        sequence = "".join(body)
+        if upper:
+            sequence = sequence.upper()
+        yield head, sequence
+
+
+def _filtered_record(
+    head: str, body: List[Any], upper: bool, flt: _record_filter
+) -> Optional[Tuple[str, str]]:
+    """
+    Joins and decodes the stripped body lines of a record, None if its length is rejected.
+    """
+    if flt.needs_length and not flt.keep_length(sum(map(len, body))):
+        return None
+    data = body[0][:0].join(body) if body else ""
+    sequence = data.decode("utf-8") if isinstance(data, bytes) else data
+    return head, sequence.upper() if upper else sequence
+
+
+def _filter_handler(
+    handler: IO[Any], upper: bool, flt: _record_filter
+) -> Iterator[Tuple[str, str]]:
+    """
+    Parse a file handler line by line, keeping only the records accepted by flt.
+    Body lines are only stripped, rejected records are never joined or decoded.
+    See read() for the parameters.
+
+    Returns
+    -------
+        Iterator[Tuple[str, str]]
+            Iterator of (head, sequence) tuples.
+    """
+    head = ""
+    body: List[Any] = []
+    keep = False
+
+    for raw_line in handler:
+        if raw_line[:1] in (">", b">"):
+            if keep:
+                record = _filtered_record(head, body, upper, flt)
+                if record is not None:
+                    yield record
+
+            head = _maybe_byte_to_str(raw_line).strip()
+            body = []
+            keep = flt.keep_head(head)
+
+        elif keep:
+            body.append(raw_line.strip())
+
+    if keep:
+        record = _filtered_record(head, body, upper, flt)
+        if record is not None:
+            yield record
+
+
+def _parse_file(
+    path_obj: Path,
+    upper: bool,
+    use_mmap: bool,
+    rec: "Optional[_profile._recorder]" = None,
+    flt: Optional[_record_filter] = None,
+) -> Iterator[Tuple[str, str]]:
+    """
+    Parse all records of a (compressed) file.
+    See read() for the parameters, rec records the stages if set.
+    With a head filter, uncompressed files are always memory mapped, which skips the
+    bodies of rejected records as a whole. Length filters alone are faster line by line.
+
+    Returns
+    -------
+        Iterator[Tuple[str, str]]
+            Iterator of (head, sequence) tuples.
+    """
+    mapped = use_mmap or (flt is not None and flt.checks_head)
+    if mapped and path_obj.suffix.lower() not in _compressed_suffixes:
+        if rec is None:
+            yield from _read_mmap(path_obj, upper, flt)
+        else:
+            rec.count("bytes_in", path_obj.stat().st_size)
+            yield from rec.timed(_read_mmap(path_obj, upper, flt), "parse")
+        return
+
+    for handler in _handlers(path_obj, rec):
+        with handler:
+            if flt is None:
+                parse = _parse_handler(handler, upper)
+            else:
+                parse = _filter_handler(handler, upper, flt)
+            yield from parse if rec is None else rec.timed(parse, "parse")
+
+
+def _scan_mmap(
+    path_obj: Path, headers_only: bool, flt: Optional[_record_filter] = None
+) -> Union[Iterator[str], Iterator[Tuple[str, int]]]:
+    """
+    Scan an uncompressed FASTA file for headers (and sequence lengths)
+    without building the sequences. See read() for the parameters.
+    """
+    count = not headers_only or (flt is not None and flt.needs_length)
+
+    with open(path_obj, "rb") as f:
+        # Empty files can not be mapped
+        if path_obj.stat().st_size == 0:
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            for head_start, body_start, body_end in _record_spans(buf):
+                head = _record_head(buf, head_start, body_start)
+                if flt is not None and not flt.keep_head(head):
+                    continue
+                if not count:
+                    yield head
+                    continue
+                length = _body_length(buf[body_start:body_end])
+                if flt is not None and not flt.keep_length(length):
+                    continue
+                if headers_only:
+                    yield head
+                else:
+                    yield head, length
+
+
+def _scan_handler(
+    handler: IO[Any], headers_only: bool, flt: Optional[_record_filter] = None
+) -> Union[Iterator[str], Iterator[Tuple[str, int]]]:
+    """
+    Scan a (compressed) file handler for headers (and sequence lengths)
+    without building the sequences. Only header lines are decoded.
+    See read() for the parameters.
+    """
+    # Lengths are only counted if returned or filtered on
+    count = not headers_only or (flt is not None and flt.needs_length)
+    head = ""
+    length = 0
+    keep = False
+
+    for line in handler:
+        if line[:1] in (">", b">"):
+            if keep and count and (flt is None or flt.keep_length(length)):
+                yield head if headers_only else (head, length)
+            head = _maybe_byte_to_str(line).strip()
+            length = 0
+            keep = flt is None or flt.keep_head(head)
+            if keep and not count:
+                yield head
+        elif keep and count:
+            length += len(line.strip())
+
+    if keep and count and (flt is None or flt.keep_length(length)):
+        yield head if headers_only else (head, length)
+
+
+def _get_file_handlers(file_path: Path) -> Iterator[IO[Any]]:
     """
     Get appropriate file handlers for compressed or uncompressed files.
+    Archive members are opened lazily, one at a time, when the next handler is requested.
 
     Parameters
     ----------
@@ -46,52 +496,68 @@ def _get_file_handlers(file_path: Path) -> List[IO[Any]]:
 
     Returns
     -------
-        List[IO[Any]]
-            List of file handlers.
+        Iterator[IO[Any]]
+            Iterator of file handlers.
     """
-    handlers: List[IO[Any]] = []
     file_suffix = file_path.suffix.lower()
 
     # .zip file
     if file_suffix == ".zip":
-        zip_handler = ZipFile(file_path, "r")
-        for inner_file in zip_handler.namelist():
-            handlers.append(zip_handler.open(inner_file, "r"))
-
-    # .tar file
-    elif file_suffix == ".tar":
-        tar_handler = tarfile.open(file_path, "r")
-        for member in tar_handler.getmembers():
-            extracted = tar_handler.extractfile(member)
-            if extracted is not None:
-                handlers.append(extracted)
-
-    # .gz file (including .tar.gz)
-    elif file_suffix == ".gz":
-        # Check if it's a .tar.gz file
-        if file_path.stem.endswith(".tar"):
-            tar_handler = tarfile.open(file_path, "r:gz")
-            for member in tar_handler.getmembers():
+        with ZipFile(file_path, "r") as zip_handler:
+            for inner_file in zip_handler.namelist():
+                yield zip_handler.open(inner_file, "r")
+
+    # .tar file or .tar.gz file
+    elif file_suffix == ".tar" or (file_suffix == ".gz" and file_path.stem.endswith(".tar")):
+        with tarfile.open(file_path, "r:gz" if file_suffix == ".gz" else "r") as tar_handler:
+            # Iterating the TarFile reads member headers on demand
+            for member in tar_handler:
                 extracted = tar_handler.extractfile(member)
                 if extracted is not None:
-                    handlers.append(extracted)
+                    yield extracted
+
+    # .gz or .bgz file
+    elif file_suffix in (".gz", ".bgz"):
+        if is_bgzf(str(file_path)):
+            # Blocks are decompressed in parallel
+            yield io.BufferedReader(bgzf_reader(str(file_path), default_threads))
         else:
-            handlers.append(cast(IO[Any], gzip.open(file_path, "rb")))
+            yield cast(IO[Any], gzip.open(file_path, "rb"))
 
     # Regular uncompressed file
     else:
-        handlers.append(open(file_path, "r"))
+        yield open(file_path, "r")
 
-    return handlers
+
+def _handlers(path_obj: Path, rec: "Optional[_profile._recorder]") -> Iterator[IO[Any]]:
+    """
+    File handlers of _get_file_handlers(), observed by rec if set.
+    """
+    if rec is None:
+        return _get_file_handlers(path_obj)
+    stage = "decompress" if path_obj.suffix.lower() in _compressed_suffixes else "read"
+    return cast(Iterator[IO[Any]], rec.handlers(_get_file_handlers(path_obj), stage))
 
 
 def read(
-    file_path: str, upper: bool = True, seq: bool = False
-) -> Union[Iterator[fasta_object], Iterator[str]]:
+    file_path: str,
+    upper: bool = True,
+    seq: bool = False,
+    use_mmap: bool = False,
+    headers_only: bool = False,
+    lengths: bool = False,
+    validate: Optional[str] = None,
+    min_length: int = 0,
+    max_length: Optional[int] = None,
+    header: Optional[Union[str, Pattern[str]]] = None,
+    ids: Optional[Iterable[str]] = None,
+    id_file: Optional[str] = None,
+) -> Union[Iterator[fasta_object], Iterator[str], Iterator[Tuple[str, int]]]:
     """
     Read a compressed or non-compressed FASTA file and return an Iterator of fasta_objects.
 
     Supports: .fasta, .fa, .zip, .tar, .gz, .tar.gz file formats.
+    BGZF compressed files (.gz, .bgz) are decompressed with multiple threads.
 
     Parameters
     ----------
@@ -101,74 +567,114 @@ def read(
             Convert sequences to uppercase letters.
         seq: bool, default: False
             Return only the sequences instead of fasta_object instances.
+        use_mmap: bool, default: False
+            Memory map uncompressed files and parse them with bulk operations
+            instead of line by line. Faster for long sequences spanning many lines,
+            slower for short single line records (e.g. reads), as the cost per record
+            is higher. Ignored for compressed files.
+        headers_only: bool, default: False
+            Return only the heads. Sequences are skipped without being built.
+        lengths: bool, default: False
+            Return (head, sequence length) tuples. Bases are counted without building the sequences.
+        validate: str, optional
+            Sequence type (NA, DNA, RNA, PROT or ANY) to validate each sequence against while
+            parsing, see fasta_object.valid(). Returned fasta_objects get this stype.
+            Not supported with headers_only or lengths.
+        min_length: int, default: 0
+            Skip records with shorter sequences.
+        max_length: int, optional
+            Skip records with longer sequences.
+        header: Union[str, Pattern[str]], optional
+            Regular expression, records are kept if it matches anywhere in the head.
+        ids: Iterable[str], optional
+            Keep only records with one of these IDs. The ID is the first word of the head.
+        id_file: str, optional
+            Path to a file with one ID per line, combined with ids.
+
+        Filters are applied while parsing: bodies of records with rejected heads are
+        skipped without being read, lengths are checked before the sequence is built.
 
     Returns
     -------
-        Union[Iterator[fasta_object], Iterator[str]]
-            Iterator of fasta_object instances or sequence strings.
+        Union[Iterator[fasta_object], Iterator[str], Iterator[Tuple[str, int]]]
+            Iterator of fasta_object instances, sequence strings, heads or (head, length) tuples.
 
     Raises
     ------
         FileNotFoundError
             If the specified file does not exist.
+        ValueError
+            If more than one of seq, headers_only and lengths is set, if validate is combined
+            with headers_only or lengths, if the length bounds are invalid or if a sequence
+            contains an illegal character (with validate).
     """
     path_obj = Path(file_path)
 
     if not path_obj.is_file():
         raise FileNotFoundError(f"FASTA file not found: {file_path}")
 
-    handlers = _get_file_handlers(path_obj)
-
-    for handler in handlers:
-        with handler:
-            head = ""
-            body: List[str] = []
-            new_object = True
+    if seq + headers_only + lengths > 1:
+        raise ValueError("Only one of seq, headers_only and lengths can be set.")
+    if validate is not None and (headers_only or lengths):
+        # Scan modes do not build the sequences
+        raise ValueError("validate can not be combined with headers_only or lengths.")
 
-            # Cache method references to avoid repeated lookups
-            body_append = body.append
+    stype = "ANY"
+    if validate is not None:
+        stype = validate.upper()
+        if stype not in ["NA", "DNA", "RNA", "PROT", "ANY"]:
+            raise ValueError("validate must be one of 'na', 'dna', 'rna', 'prot' or 'any'.")
 
-            for maybe_byte_line in handler:
-                # Convert byte string to string if needed
-                line = _maybe_byte_to_str(maybe_byte_line)
+    flt = _make_filter(min_length, max_length, header, ids, id_file)
 
-                # Skip empty lines
-                if not line:
-                    continue
-
-                # Handle header lines (starting with '>')
-                if line[0] == ">":  # Faster than startswith for single char
-                    # If this is not the first object, yield the previous one
-                    if not new_object:
-                        # Apply transformations once on final sequence
-                        sequence = "".join(body)
-                        if upper:
-                            sequence = sequence.upper()
-
-                        if seq:
-                            yield sequence
-                        else:
-                            yield fasta_object(head, sequence)
-
-                    # Start new object
-                    head = line.strip()
-                    body = []
-                    body_append = body.append
-                    new_object = False
-
-                # Handle sequence lines
-                else:
-                    # Strip whitespace but defer uppercasing until final join
-                    body_append(line.strip())
-
-            # Yield the last element if any data was processed
-            if not new_object and (head or body):
-                # Apply transformations once on final sequence
-                sequence = "".join(body)
-                if upper:
-                    sequence = sequence.upper()
-
-                if seq:
-                    yield sequence
-                else:
-                    yield fasta_object(head, sequence)
+    rec = _profile.recorder("read", file_path)
+    records = _read(path_obj, upper, seq, use_mmap, headers_only, lengths, stype, rec, flt)
+    if rec is None:
+        yield from records
+    else:
+        yield from rec.observe(records)
+
+
+def _read(
+    path_obj: Path,
+    upper: bool,
+    seq: bool,
+    use_mmap: bool,
+    headers_only: bool,
+    lengths: bool,
+    stype: str,
+    rec: "Optional[_profile._recorder]",
+    flt: Optional[_record_filter] = None,
+) -> Iterator[Any]:
+    """
+    Implementation of read(), see there for the parameters.
+    """
+    uncompressed = path_obj.suffix.lower() not in _compressed_suffixes
+
+    if headers_only or lengths:
+        if uncompressed:
+            if rec is not None:
+                rec.count("bytes_in", path_obj.stat().st_size)
+            scan = _scan_mmap(path_obj, headers_only, flt)
+            yield from scan if rec is None else rec.timed(scan, "parse")
+        else:
+            for handler in _handlers(path_obj, rec):
+                with handler:
+                    scan = _scan_handler(handler, headers_only, flt)
+                    yield from scan if rec is None else rec.timed(scan, "parse")
+        return
+
+    allowed = allowed_chars.get(stype, "")
+
+    for head, sequence in _parse_file(path_obj, upper, use_mmap, rec, flt):
+        if allowed:
+            invalid = _find_invalid(sequence, allowed)
+            if invalid is not None:
+                raise ValueError(
+                    f"Illegal character '{invalid[1]}' at position {invalid[0]} of {head}."
+                )
+
+        if seq:
+            yield sequence
+        else:
+            yield fasta_object(head, sequence, stype)
@@ -0,0 +1,159 @@
+"""
+miniFASTA: A simple toolbox for fasta files.
+
+This is the external sort part. Records are sorted in runs that fit into memory,
+the runs are stored in temporary FASTA files and merged afterwards.
+
+@author: Jules Kreuer / not_a_feature
+License: GPL-3.0
+"""
+
+from ._miniFasta import fasta_object
+from ._reader import read
+from ._writer import fasta_writer
+
+from contextlib import ExitStack, closing
+import heapq
+from operator import attrgetter, methodcaller
+import os
+from pathlib import Path
+import sys
+import tempfile
+from typing import Any, Callable, Dict, Generator, Iterable, Iterator, List, Optional, Union, cast
+
+# Default memory budget of a run
+default_memory_limit = 256 * 1024 * 1024
+
+# Approximate memory used per record besides its head and sequence (objects, list slot)
+_record_memory = 200
+
+# Maximal number of runs merged at once, more runs are merged in multiple passes
+_max_merge = 64
+
+# Sort keys by name
+sort_keys: Dict[str, Callable[[fasta_object], Any]] = {
+    "length": len,
+    "header": attrgetter("head"),
+    "digest": methodcaller("digest"),
+}
+
+
+def _write_run(records: List[fasta_object], file_path: str) -> str:
+    """
+    Writes a run with one line per sequence, which is the fastest to write and read.
+    """
+    with fasta_writer(file_path, line_width=sys.maxsize) as w:
+        w.write_all(records)
+    return file_path
+
+
+def _read_run(file_path: str) -> Generator[fasta_object, None, None]:
+    return cast(Generator[fasta_object, None, None], read(file_path, upper=False, use_mmap=True))
+
+
+def _merge(
+    runs: List[str], key: Callable[[fasta_object], Any], reverse: bool
+) -> Iterator[fasta_object]:
+    """
+    k-way merge of sorted runs. Equal records keep the order of the runs.
+    """
+    with ExitStack() as stack:
+        iterators = [stack.enter_context(closing(_read_run(run))) for run in runs]
+        yield from heapq.merge(*iterators, key=key, reverse=reverse)
+
+
+def sort(
+    source: Union[str, Iterable[fasta_object]],
+    output: str,
+    key: Union[str, Callable[[fasta_object], Any]] = "length",
+    reverse: bool = False,
+    memory_limit: int = default_memory_limit,
+    tmp_dir: Optional[str] = None,
+    line_width: int = 70,
+    compression: Optional[str] = None,
+) -> None:
+    """
+    Sorts a FASTA file (or fasta_objects) of any size into a new file.
+    Records are sorted in runs of about memory_limit bytes, which are stored in
+    temporary files and merged into the output. If all records fit into the budget,
+    no temporary files are used. The sort is stable and keeps the case of the sequences.
+
+    Parameters
+    ----------
+        source: str or Iterable[fasta_object]
+            Path to a (compressed) FASTA file, or e.g. the output of read().
+        output: str
+            Path of the sorted file, may be the path of the source.
+        key: str or Callable[[fasta_object], Any], default: "length"
+            "length" (sequence length), "header" (head), "digest" (fasta_object.digest(),
+            groups equal sequences) or a function computing the key of a record.
+        reverse: bool, default: False
+            Sort descending, e.g. longest sequences first.
+        memory_limit: int, default: 256 MiB
+            Approximate number of bytes held in memory per run.
+        tmp_dir: str, optional
+            Directory of the temporary runs. Defaults to the system temporary directory.
+        line_width: int, default: 70
+            Number of characters per sequence line of the output.
+        compression: str, optional
+            Compression of the output, see fasta_writer.
+
+    Raises
+    ------
+        ValueError
+            If the key is unknown.
+        FileNotFoundError
+            If the specified file does not exist.
+    """
+    if isinstance(key, str):
+        try:
+            key = sort_keys[key]
+        except KeyError:
+            raise ValueError(f"key must be one of {', '.join(sort_keys)} or a function.") from None
+
+    records: Iterable[fasta_object]
+    if isinstance(source, (str, Path)):
+        records = cast(Iterator[fasta_object], read(str(source), upper=False))
+    else:
+        records = source
+
+    with tempfile.TemporaryDirectory(prefix="miniFasta-sort-", dir=tmp_dir) as tmp:
+        runs: List[str] = []
+        run: List[fasta_object] = []
+        size = 0
+
+        for fo in records:
+            run.append(fo)
+            size += len(fo.head) + len(fo) + _record_memory
+            if size >= memory_limit:
+                run.sort(key=key, reverse=reverse)
+                runs.append(_write_run(run, os.path.join(tmp, f"{len(runs)}.fasta")))
+                run = []
+                size = 0
+
+        run.sort(key=key, reverse=reverse)
+        if not runs:
+            with fasta_writer(output, line_width=line_width, compression=compression) as w:
+                w.write_all(run)
+            return
+        if run:
+            runs.append(_write_run(run, os.path.join(tmp, f"{len(runs)}.fasta")))
+        del run
+
+        # Merge in passes until the remaining runs can be opened at once
+        n_files = len(runs)
+        while len(runs) > _max_merge:
+            merged = []
+            for i in range(0, len(runs), _max_merge):
+                group = runs[i : i + _max_merge]
+                merged_path = os.path.join(tmp, f"{n_files}.fasta")
+                n_files += 1
+                with fasta_writer(merged_path, line_width=sys.maxsize) as w:
+                    w.write_all(_merge(group, key, reverse))
+                for run_path in group:
+                    os.remove(run_path)
+                merged.append(merged_path)
+            runs = merged
+
+        with fasta_writer(output, line_width=line_width, compression=compression) as w:
+            w.write_all(_merge(runs, key, reverse))
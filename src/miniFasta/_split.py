@@ -0,0 +1,156 @@
+"""
+miniFASTA: A simple toolbox for fasta files.
+
+This is the sharding part. Records are distributed over N files such that
+all files contain about the same number of bases.
+
+@author: Jules Kreuer / not_a_feature
+License: GPL-3.0
+"""
+
+from ._miniFasta import fasta_object
+from ._reader import read, _compressed_suffixes
+from ._index import read_index
+from ._writer import fasta_writer
+
+from contextlib import ExitStack
+import heapq
+import os
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, cast
+
+
+def _plan(lengths: List[int], n: int) -> List[int]:
+    """
+    Longest processing time first: the longest records are assigned first,
+    each to the shard with the fewest bases so far.
+
+    Returns
+    -------
+        List[int]
+            Shard of each record.
+    """
+    shards = [(0, i) for i in range(n)]
+    plan = [0] * len(lengths)
+    for record in sorted(range(len(lengths)), key=lengths.__getitem__, reverse=True):
+        bases, shard = shards[0]
+        plan[record] = shard
+        heapq.heapreplace(shards, (bases + lengths[record], shard))
+    return plan
+
+
+def _known_lengths(path_obj: Path, index_path: Optional[str]) -> Optional[List[int]]:
+    """
+    Sequence lengths in file order, from an existing .fai index or by scanning
+    an uncompressed file. None for compressed files without index.
+    """
+    index_path = index_path or f"{path_obj}.fai"
+    if os.path.isfile(index_path):
+        return [e.length for e in read_index(index_path).values()]
+    if path_obj.suffix.lower() not in _compressed_suffixes:
+        return [
+            length
+            for _, length in cast(Iterator[Tuple[str, int]], read(str(path_obj), lengths=True))
+        ]
+    return None
+
+
+def _shard_name(path_obj: Path) -> str:
+    """
+    Name of the input without FASTA and compression suffixes.
+    """
+    name = path_obj.name
+    for suffix in (".gz", ".bgz", ".fasta", ".fa", ".fna", ".faa"):
+        if name.lower().endswith(suffix):
+            name = name[: -len(suffix)]
+    return name
+
+
+def split(
+    file_path: str,
+    n: int,
+    output_dir: Optional[str] = None,
+    compression: Optional[str] = None,
+    index_path: Optional[str] = None,
+    line_width: int = 70,
+) -> List[Tuple[str, int]]:
+    """
+    Splits a FASTA file into n shards with about the same number of bases.
+    The records are read once and written to all shards at the same time.
+
+    The shards are planned with the longest records first (each record is assigned to
+    the shard with the fewest bases so far) if the lengths are known beforehand: from
+    an existing .fai index or, for uncompressed files, from a scan of the headers and
+    line lengths (see read(lengths=True)). Compressed files without index are assigned
+    greedily while reading, in file order.
+
+    Parameters
+    ----------
+        file_path: str
+            Path to the (compressed) FASTA file.
+        n: int
+            Number of shards.
+        output_dir: str, optional
+            Directory of the shards. Defaults to the directory of the input.
+            Shards are named <name>.part_<i>.fasta (.gz if compressed).
+        compression: str, optional
+            "gzip" or "bgzf" to compress the shards, see fasta_writer.
+        index_path: str, optional
+            Path of the .fai index. Defaults to file_path + ".fai".
+        line_width: int, default: 70
+            Number of characters per sequence line.
+
+    Returns
+    -------
+        List[Tuple[str, int]]
+            Path and number of bases of each shard.
+
+    Raises
+    ------
+        ValueError
+            If n is not positive.
+        FileNotFoundError
+            If the specified file does not exist.
+    """
+    if n < 1:
+        raise ValueError("n must be positive.")
+
+    path_obj = Path(file_path)
+    if not path_obj.is_file():
+        raise FileNotFoundError(f"FASTA file not found: {file_path}")
+
+    directory = Path(output_dir) if output_dir is not None else path_obj.parent
+    suffix = ".fasta.gz" if compression is not None else ".fasta"
+    name = _shard_name(path_obj)
+    width = len(str(n))
+    paths = [str(directory / f"{name}.part_{i + 1:0{width}d}{suffix}") for i in range(n)]
+
+    lengths = _known_lengths(path_obj, index_path)
+    plan = _plan(lengths, n) if lengths is not None else []
+    totals = [0] * n
+    # Heap of (bases, shard) of the online assignment
+    shards: List[Tuple[int, int]] = []
+
+    records = cast(
+        Iterator[fasta_object],
+        read(file_path, upper=False, use_mmap=path_obj.suffix.lower() not in _compressed_suffixes),
+    )
+    with ExitStack() as stack:
+        writers = [
+            stack.enter_context(fasta_writer(p, line_width=line_width, compression=compression))
+            for p in paths
+        ]
+        for i, fo in enumerate(records):
+            length = len(fo)
+            if i < len(plan):
+                shard = plan[i]
+            else:
+                # No (or an outdated) plan, assign to the lightest shard
+                if i == len(plan):
+                    shards = sorted((bases, s) for s, bases in enumerate(totals))
+                bases, shard = shards[0]
+                heapq.heapreplace(shards, (bases + length, shard))
+            writers[shard].write(fo)
+            totals[shard] += length
+
+    return list(zip(paths, totals))
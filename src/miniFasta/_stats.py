@@ -0,0 +1,251 @@
+"""
+miniFASTA: A simple toolbox for fasta files.
+
+This is the statistics part.
+
+@author: Jules Kreuer / not_a_feature
+License: GPL-3.0
+"""
+
+from ._reader import _record_spans, _body_length
+from ._parallel import _sources, _open_source, _imap, default_chunk_size
+
+from collections import Counter
+from dataclasses import dataclass, field
+import os
+from pathlib import Path
+from typing import Any, Counter as CounterT, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+
+    _has_numpy = True
+except ImportError:  # pragma: no cover
+    _has_numpy = False
+
+# Bytes which are not part of a sequence
+_whitespace = b"\n\r \t\x0b\x0c"
+
+# Symbols counted with bytes.count if NumPy is not available
+_common_symbols = b"ACGTNacgtn"
+
+# Number of bytes passed to np.bincount at once, limits the size of its intermediate array
+_bincount_block = 1024 * 1024
+
+
+@dataclass
+class fasta_stats:
+    """
+    Summary statistics of a FASTA file, see stats().
+
+    Attributes
+    ----------
+        count: int
+            Number of records.
+        total: int
+            Total number of bases.
+        min_length: int
+            Length of the shortest sequence.
+        max_length: int
+            Length of the longest sequence.
+        n50: int
+            Length of the shortest sequence among the longest ones covering half of all bases.
+        l50: int
+            Number of the longest sequences covering half of all bases.
+        gc: float
+            Fraction of G and C among all A, C, G and T.
+        n_fraction: float
+            Fraction of N among all bases.
+        composition: Dict[str, int]
+            Number of occurrences of each symbol.
+        histogram: List[Tuple[int, int, int]]
+            Length histogram as (start, end, count) with start <= length < end.
+    """
+
+    count: int = 0
+    total: int = 0
+    min_length: int = 0
+    max_length: int = 0
+    n50: int = 0
+    l50: int = 0
+    gc: float = 0.0
+    n_fraction: float = 0.0
+    composition: Dict[str, int] = field(default_factory=dict)
+    histogram: List[Tuple[int, int, int]] = field(default_factory=list)
+
+    @property
+    def mean_length(self) -> float:
+        """
+        Mean sequence length.
+        """
+        return self.total / self.count if self.count else 0.0
+
+
+def _byte_counts(data: bytes) -> CounterT[int]:
+    """
+    Number of occurrences of each byte value.
+    """
+    if _has_numpy:
+        counts = np.zeros(256, dtype=np.int64)
+        view = memoryview(data)
+        for i in range(0, len(data), _bincount_block):
+            block = np.frombuffer(view[i : i + _bincount_block], dtype=np.uint8)
+            counts += np.bincount(block, minlength=256)
+        return Counter({i: int(n) for i, n in enumerate(counts) if n})
+
+    result: CounterT[int] = Counter()
+    for i in _common_symbols:
+        n = data.count(i)
+        if n:
+            result[i] = n
+    # Per byte loop only over the rare symbols
+    result.update(data.translate(None, _common_symbols + _whitespace))
+    return result
+
+
+def _chunk_stats(source: Tuple[Any, ...]) -> Tuple[CounterT[int], CounterT[int]]:
+    """
+    Collects the byte composition and sequence lengths of all records of a source.
+
+    Returns
+    -------
+        Tuple[Counter[int], Counter[int]]
+            Counts of the sequence bytes and counts of the sequence lengths.
+    """
+    lengths: CounterT[int] = Counter()
+    heads = []
+    region_start = -1
+    region_end = 0
+
+    with _open_source(source) as (buf, start, end):
+        for head_start, body_start, body_end in _record_spans(buf, start, end):
+            if region_start == -1:
+                region_start = head_start
+            region_end = body_end
+            heads.append(buf[head_start:body_start])
+            lengths[_body_length(buf[body_start:body_end])] += 1
+
+        if region_start == -1:
+            return Counter(), lengths
+
+        # Count the whole region at once and remove the headers afterwards
+        counts = _byte_counts(buf[region_start:region_end])
+
+    counts.subtract(_byte_counts(b"".join(heads)))
+    for i in _whitespace:
+        counts.pop(i, None)
+    return counts, lengths
+
+
+def _histogram(lengths: CounterT[int], bins: int) -> List[Tuple[int, int, int]]:
+    """
+    Splits the range of lengths into at most bins bins of equal integer width.
+    """
+    if not lengths:
+        return []
+    low = min(lengths)
+    high = max(lengths)
+    width = -(-(high - low + 1) // max(bins, 1))
+    counts = [0] * (-(-(high - low + 1) // width))
+    for length, n in lengths.items():
+        counts[(length - low) // width] += n
+    return [(low + i * width, low + (i + 1) * width, n) for i, n in enumerate(counts)]
+
+
+def _summarize(
+    counts: CounterT[int], lengths: CounterT[int], upper: bool, bins: int
+) -> fasta_stats:
+    """
+    Computes the statistics from the merged counts.
+    """
+    result = fasta_stats()
+    result.count = sum(lengths.values())
+    result.total = sum(length * n for length, n in lengths.items())
+    if not result.count:
+        return result
+
+    result.min_length = min(lengths)
+    result.max_length = max(lengths)
+
+    covered = 0
+    for length in sorted(lengths, reverse=True):
+        n = lengths[length]
+        if 2 * (covered + length * n) >= result.total:
+            # Number of sequences of this length needed to reach half of the bases
+            needed = -(-(result.total - 2 * covered) // (2 * length)) if length else 1
+            result.n50 = length
+            result.l50 += max(needed, 1)
+            break
+        covered += length * n
+        result.l50 += n
+
+    composition: CounterT[str] = Counter()
+    for i, n in counts.items():
+        if n > 0:
+            symbol = chr(i)
+            composition[symbol.upper() if upper else symbol] += n
+    result.composition = dict(sorted(composition.items()))
+
+    def count(symbols: str) -> int:
+        return sum(composition[s] + (0 if upper else composition[s.lower()]) for s in symbols)
+
+    acgt = count("ACGT")
+    result.gc = count("GC") / acgt if acgt else 0.0
+    result.n_fraction = count("N") / result.total if result.total else 0.0
+    result.histogram = _histogram(lengths, bins)
+    return result
+
+
+def stats(
+    file_path: str,
+    upper: bool = True,
+    bins: int = 10,
+    workers: Optional[int] = None,
+    chunk_size: int = default_chunk_size,
+) -> fasta_stats:
+    """
+    Computes summary statistics of a FASTA file in a single pass.
+    Sequences are never joined or decoded, the composition is counted on the raw bytes
+    of large chunks. Chunks are processed in parallel, as in read_parallel().
+    Memory is bounded by the chunk size and the number of distinct sequence lengths.
+    Whitespace inside of lines counts towards the length but not to the composition.
+
+    Parameters
+    ----------
+        file_path: str
+            Path to the FASTA file, compressed or uncompressed.
+        upper: bool, default: True
+            Count lowercase (e.g. soft-masked) bases as uppercase bases.
+        bins: int, default: 10
+            Maximal number of bins of the length histogram.
+        workers: int, optional
+            Number of processes. Defaults to the number of cores.
+        chunk_size: int, default: 16 MiB
+            Size of the chunks processed by a single task.
+
+    Returns
+    -------
+        fasta_stats
+            Record count, total bases, N50/L50, GC and N fraction, composition and
+            length histogram.
+
+    Raises
+    ------
+        FileNotFoundError
+            If the specified file does not exist.
+    """
+    path_obj = Path(file_path)
+
+    if not path_obj.is_file():
+        raise FileNotFoundError(f"FASTA file not found: {file_path}")
+
+    workers = workers or os.cpu_count() or 1
+    tasks = ((source,) for source in _sources(path_obj, chunk_size))
+
+    counts: CounterT[int] = Counter()
+    lengths: CounterT[int] = Counter()
+    for chunk_counts, chunk_lengths in _imap(_chunk_stats, tasks, workers, False):
+        counts.update(chunk_counts)
+        lengths.update(chunk_lengths)
+
+    return _summarize(counts, lengths, upper, bins)
@@ -0,0 +1,233 @@
+"""
+miniFASTA: A simple toolbox for fasta files.
+
+This is the translation engine. Translation dictionaries are compiled once
+into lookup tables and applied with NumPy if available.
+
+@author: Jules Kreuer / not_a_feature
+License: GPL-3.0
+"""
+
+from functools import lru_cache
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+
+    _has_numpy = True
+except ImportError:  # pragma: no cover
+    _has_numpy = False
+
+# NCBI genetic codes, see https://www.ncbi.nlm.nih.gov/Taxonomy/Utils/wprintgc.cgi
+# Amino acids of all 64 codons, ordered by the bases TCAG (TTT, TTC, TTA, TTG, TCT, ...)
+genetic_codes = {
+    1: "FFLLSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG",
+    2: "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNKKSS**VVVVAAAADDEEGGGG",
+    3: "FFLLSSSSYY**CCWWTTTTPPPPHHQQRRRRIIMMTTTTNNKKSSRRVVVVAAAADDEEGGGG",
+    4: "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG",
+    5: "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNKKSSSSVVVVAAAADDEEGGGG",
+    6: "FFLLSSSSYYQQCC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG",
+    9: "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNNKSSSSVVVVAAAADDEEGGGG",
+    10: "FFLLSSSSYY**CCCWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG",
+    11: "FFLLSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG",
+    12: "FFLLSSSSYY**CC*WLLLSPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG",
+    13: "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNKKSSGGVVVVAAAADDEEGGGG",
+    14: "FFLLSSSSYYY*CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNNKSSSSVVVVAAAADDEEGGGG",
+    16: "FFLLSSSSYY*LCC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG",
+    21: "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNNKSSSSVVVVAAAADDEEGGGG",
+    22: "FFLLSS*SYY*LCC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG",
+    23: "FF*LSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG",
+    24: "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSSKVVVVAAAADDEEGGGG",
+    25: "FFLLSSSSYY**CCGWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG",
+    26: "FFLLSSSSYY**CC*WLLLAPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG",
+}
+
+# Replacement for codons which are not part of the translation dictionary
+missing_codon = "~"
+
+# Sequences shorter than this are translated without NumPy, as the setup costs dominate
+_numpy_min_length = 1024
+
+_codon_pattern = re.compile("...", re.DOTALL)
+
+# Integer encoding of the bases for the lookup table
+_base_codes = {"A": 0, "C": 1, "G": 2, "T": 3}
+
+
+def genetic_code(table: int = 1) -> Dict[str, str]:
+    """
+    Returns the translation dictionary of a NCBI genetic code.
+
+    Parameters
+    ----------
+        table: int, default: 1
+            Number of the NCBI genetic code (e.g. 1: Standard, 2: Vertebrate Mitochondrial,
+            11: Bacterial, Archaeal and Plant Plastid).
+
+    Returns
+    -------
+        Dict[str, str]
+            Translation dictionary from codon to amino acid.
+
+    Raises
+    ------
+        ValueError
+            If the table is unknown.
+    """
+    try:
+        amino_acids = genetic_codes[table]
+    except KeyError:
+        raise ValueError(f"Unknown genetic code table: {table}") from None
+
+    codons = (a + b + c for a in "TCAG" for b in "TCAG" for c in "TCAG")
+    return dict(zip(codons, amino_acids))
+
+
+class _missing_dict(Dict[str, str]):
+    """
+    Dictionary which returns missing_codon for unknown keys.
+    """
+
+    def __missing__(self, key: str) -> str:
+        return missing_codon
+
+
+class codon_table:
+    def __init__(self, d: Dict[str, str]):
+        """
+        Translation dictionary compiled for fast lookups.
+        If all keys are ACGT triplets and all values single ASCII characters, a lookup
+        table over the integer encoded codons (base-5 digits, 125 entries) is created.
+        Use get_codon_table() to obtain cached instances.
+
+        Parameters
+        ----------
+            d: dict
+                Translation dictionary.
+        """
+        self.dict = _missing_dict(d)
+        self.lut: Optional[Any] = None
+
+        if not _has_numpy:
+            return
+
+        lut = np.full(125, ord(missing_codon), dtype=np.uint8)
+        for codon, aa in d.items():
+            if len(codon) != 3 or len(aa) != 1 or not aa.isascii():
+                return
+            try:
+                a, b, c = (_base_codes[base] for base in codon)
+            except KeyError:
+                return
+            i = (a * 5 + b) * 5 + c
+            lut[i] = ord(aa)
+        self.lut = lut
+
+    def translate(self, seq: str) -> str:
+        """
+        Translates a sequence starting at position 0. Tailing bases are ignored.
+        """
+        if self.lut is not None and len(seq) >= _numpy_min_length:
+            try:
+                return self._translate_numpy(seq.encode("ascii"))
+            except UnicodeEncodeError:
+                pass
+        return "".join(map(self.dict.__getitem__, _codon_pattern.findall(seq)))
+
+    def translate_many(self, seqs: List[str]) -> List[str]:
+        """
+        Translates multiple sequences, each starting at position 0.
+        With NumPy, all sequences are translated in a single lookup.
+        """
+        if self.lut is None or sum(map(len, seqs)) < _numpy_min_length:
+            return [self.translate(s) for s in seqs]
+
+        try:
+            joined = b"".join(s[: len(s) - len(s) % 3].encode("ascii") for s in seqs)
+        except UnicodeEncodeError:
+            return [self.translate(s) for s in seqs]
+
+        translated = self._translate_numpy(joined)
+        out = []
+        pos = 0
+        for s in seqs:
+            n = len(s) // 3
+            out.append(translated[pos : pos + n])
+            pos += n
+        return out
+
+    def translate_buffer(self, buf: Any, bases: Optional[bytes] = None) -> str:
+        """
+        Translates a bytes-like buffer (e.g. a strided memoryview) starting at position 0.
+        With NumPy, the buffer is read in place instead of being copied.
+
+        Parameters
+        ----------
+            buf: bytes-like
+                One-dimensional buffer of ASCII bases.
+            bases: bytes, optional
+                bytes.translate table applied to the bases before the translation.
+        """
+        n = len(buf) - len(buf) % 3
+        if self.lut is None or n < _numpy_min_length:
+            seq = bytes(buf[:n])
+            if bases is not None:
+                seq = seq.translate(bases)
+            return self.translate(seq.decode("ascii"))
+
+        lut = _base_lut if bases is None else _base_lut[np.frombuffer(bases, dtype=np.uint8)]
+        return self._translate_codes(lut[np.asarray(memoryview(buf))[:n]])
+
+    def _translate_numpy(self, seq: bytes) -> str:
+        """
+        Translates ASCII bytes with a single lookup table access.
+        """
+        n = len(seq) - len(seq) % 3
+        return self._translate_codes(_base_lut[np.frombuffer(seq, dtype=np.uint8, count=n)])
+
+    def _translate_codes(self, codes: Any) -> str:
+        """
+        Translates base codes (see _base_lut), the length is a multiple of 3.
+        """
+        codes = codes.reshape(-1, 3)
+        index = (codes[:, 0] * 5 + codes[:, 1]) * 5 + codes[:, 2]
+        return self.lut[index].tobytes().decode("ascii")  # type: ignore
+
+
+if _has_numpy:
+    # Maps ASCII codes to A: 0, C: 1, G: 2, T: 3 and everything else to 4
+    _base_lut = np.full(256, 4, dtype=np.uint8)
+    for _b, _i in _base_codes.items():
+        _base_lut[ord(_b)] = _i
+
+
+@lru_cache(maxsize=32)
+def _compile(items: Tuple[Tuple[str, str], ...]) -> codon_table:
+    return codon_table(dict(items))
+
+
+@lru_cache(maxsize=None)
+def _compile_code(table: int) -> codon_table:
+    return codon_table(genetic_code(table))
+
+
+def get_codon_table(d: Optional[Dict[str, str]] = None, table: int = 1) -> codon_table:
+    """
+    Returns a (cached) compiled codon_table.
+
+    Parameters
+    ----------
+        d: dict, optional
+            Translation dictionary. Takes precedence over table.
+        table: int, default: 1
+            Number of the NCBI genetic code.
+
+    Returns
+    -------
+        codon_table
+            Compiled translation table.
+    """
+    if d is None:
+        return _compile_code(table)
+    return _compile(tuple(d.items()))
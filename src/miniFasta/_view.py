@@ -0,0 +1,175 @@
+"""
+miniFASTA: A simple toolbox for fasta files.
+
+This is the sequence view part. Slices, reverse complements and windows of a
+sequence are views of the same buffer, bases are only copied on request.
+
+@author: Jules Kreuer / not_a_feature
+License: GPL-3.0
+"""
+
+from ._miniFasta import complement_dict, translation_dict, _complement_table, _codon_table
+
+from functools import lru_cache
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+# Number of bases copied at once while iterating
+_iter_block = 65536
+
+_identity = bytes(range(256))
+
+
+@lru_cache(maxsize=32)
+def _compile_complement_bytes(items: Tuple[Tuple[str, str], ...]) -> bytes:
+    """
+    Compiles a complement dictionary into a bytes.translate table.
+    Complements which are not a single byte are ignored.
+    """
+    table = bytearray(_identity)
+    for b, c in _complement_table(dict(items)).items():
+        if b < 256 and len(c) == 1 and ord(c) < 256:
+            table[b] = ord(c)
+    return bytes(table)
+
+
+def _complement_bytes(d: Dict[str, str] = complement_dict) -> bytes:
+    """
+    Returns the (cached) bytes.translate table of a complement dictionary.
+    """
+    return _compile_complement_bytes(tuple(d.items()))
+
+
+@lru_cache(maxsize=32)
+def _compose(first: Optional[bytes], second: bytes) -> bytes:
+    """
+    Translate table applying first and then second.
+    """
+    if first is None:
+        return second
+    return _identity.translate(first).translate(second)
+
+
+class seq_view:
+    __slots__ = ("_mv", "_table")
+
+    def __init__(self, data: Any):
+        """
+        Zero-copy view of a sequence stored in a bytes-like object (bytes, bytearray, mmap).
+        Slicing, reverse complementing and windowing return new views of the same buffer,
+        the bases are only copied by str(), tobytes() or while iterating (blockwise).
+        The buffer must not be modified while views of it are used.
+
+        Parameters
+        ----------
+            data: bytes-like
+                Buffer of ASCII bases.
+        """
+        mv = memoryview(data)
+        if mv.format != "B" or mv.ndim != 1:
+            mv = mv.cast("B")
+        self._mv = mv
+        # bytes.translate table of the bases, None for the identity
+        self._table: Optional[bytes] = None
+
+    @classmethod
+    def _new(cls, mv: memoryview, table: Optional[bytes]) -> "seq_view":
+        view = cls.__new__(cls)
+        view._mv = mv
+        view._table = table
+        return view
+
+    def __len__(self) -> int:
+        return len(self._mv)
+
+    def __getitem__(self, key: Union[int, slice]) -> Any:
+        """
+        Magic method returning a single base (str) or a view of a slice.
+        Slices may have any step, negative steps reverse the view.
+        """
+        if isinstance(key, slice):
+            return seq_view._new(self._mv[key], self._table)
+
+        try:
+            base = self._mv[key]
+        except IndexError:
+            raise IndexError("seq_view index out of range") from None
+        return chr(base if self._table is None else self._table[base])
+
+    def __iter__(self) -> Iterator[str]:
+        for start in range(0, len(self._mv), _iter_block):
+            yield from str(self[start : start + _iter_block])
+
+    def __str__(self) -> str:
+        return self.tobytes().decode("ascii")
+
+    def __repr__(self) -> str:
+        return f"seq_view({len(self._mv)} bases)"
+
+    def __eq__(self, o: Any) -> bool:
+        if isinstance(o, seq_view):
+            return len(self) == len(o) and self.tobytes() == o.tobytes()
+        return bool(str(self) == o)
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    def tobytes(self) -> bytes:
+        """
+        Copies the bases into a new bytes object.
+        """
+        data = self._mv.tobytes()
+        if self._table is not None:
+            data = data.translate(self._table)
+        return data
+
+    def revcomp(self, d: Dict[str, str] = complement_dict) -> "seq_view":
+        """
+        Reverse complement view. Bases without complement remain unchanged,
+        the case of the bases is preserved, see reverse_comp().
+
+        Parameters
+        ----------
+            d: dict
+                Complement dictionary.
+        """
+        return seq_view._new(self._mv[::-1], _compose(self._table, _complement_bytes(d)))
+
+    def translate(self, d: Dict[str, str] = translation_dict, table: int = 1) -> str:
+        """
+        Translates the viewed bases to amino-acids, see translate_seq().
+        Reading frame starts at position 0, tailing bases will be ignored.
+        With NumPy, the bases are read from the buffer in place.
+
+        Parameters
+        ----------
+            d: dict
+                Translation dictionary.
+            table: int, default: 1
+                NCBI genetic code. Only used if no custom translation dictionary is set.
+
+        Returns
+        -------
+            str
+                Translated sequence.
+        """
+        return _codon_table(d, table).translate_buffer(self._mv, self._table)
+
+    def windows(self, size: int, step: int = 1) -> Iterator["seq_view"]:
+        """
+        Views of all windows of size bases, starting every step bases.
+        Windows exceeding the sequence are omitted.
+
+        Parameters
+        ----------
+            size: int
+                Length of the windows.
+            step: int, default: 1
+                Distance between the window starts.
+        """
+        if size < 1 or step < 1:
+            raise ValueError("size and step must be positive.")
+        mv = self._mv
+        table = self._table
+        new = seq_view._new
+        for start in range(0, len(mv) - size + 1, step):
+            yield new(mv[start : start + size], table)
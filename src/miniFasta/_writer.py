@@ -7,10 +7,23 @@ This is the writer part.
 License: GPL-3.0
 """
 
-from ._miniFasta import fasta_object as superFO
+from ._miniFasta import fasta_object as superFO, _wrap
+from ._bgzf import compress_blocks, bgzf_eof
+from . import _profile
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Deque, IO, Iterable, List, Optional, Union
+import zlib
+
+# Number of characters collected before they are written (and compressed) at once
+default_buffer_size = 1024 * 1024
 
 
 class fasta_object(superFO):
+    __slots__ = ()
+
     def write(self, file_path: str, mode="w"):
         """
         Writes this fasta_object to a file.
@@ -18,27 +31,218 @@ class fasta_object(superFO):
         write(self, file_path, mode)
 
 
-def write(fasta_pairs, file_path: str, mode="w") -> None:
+class fasta_writer:
+    def __init__(
+        self,
+        file_path: str,
+        mode: str = "w",
+        line_width: int = 70,
+        compression: Optional[str] = None,
+        threads: int = 1,
+        compresslevel: int = 6,
+        buffer_size: int = default_buffer_size,
+    ):
+        """
+        Buffered, streaming FASTA writer.
+        Records are formatted into large blocks which are written (and compressed) at once.
+        Use it as context manager or call close() when done.
+        Files are written in binary mode, lines end with "\n" on all platforms
+        (also on Windows, where text mode would write "\r\n").
+
+        Parameters
+        ----------
+            file_path: str
+                String or FilePath to file.
+            mode: str, default: "w"
+                "w" to overwrite, "a" to append. Other modes of open() are rejected.
+            line_width: int, default: 70
+                Number of characters per sequence line.
+            compression: str, optional
+                One of "gzip", "bgzf" or None. Defaults to gzip for .gz files,
+                bgzf for .bgz files and no compression otherwise.
+            threads: int, default: 1
+                Number of threads compressing blocks in parallel. With the default,
+                blocks are compressed in the calling thread.
+                With gzip and more than one thread, each block is stored as separate gzip member.
+            compresslevel: int, default: 6
+                zlib compression level.
+            buffer_size: int, default: 1 MiB
+                Number of characters collected before a block is written.
+        """
+        if mode not in ("w", "a"):
+            raise ValueError("mode must be one of 'w' or 'a'.")
+        if line_width < 1:
+            raise ValueError("line_width must be positive.")
+
+        if compression is None:
+            suffix = Path(file_path).suffix.lower()
+            compression = {".gz": "gzip", ".bgz": "bgzf"}.get(suffix)
+        if compression not in (None, "gzip", "bgzf"):
+            raise ValueError("compression must be one of 'gzip', 'bgzf' or None.")
+
+        self.line_width = line_width
+        self.compression = compression
+        self.compresslevel = compresslevel
+        self.buffer_size = buffer_size
+
+        self._rec = _profile.recorder("write", file_path)
+        if self._rec is not None:
+            self._rec.enter("open")
+        self._file: IO[bytes] = open(file_path, f"{mode}b")
+        if self._rec is not None:
+            self._rec.exit()
+        self._buffer: List[str] = []
+        self._buffered = 0
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pending: Deque["Future[bytes]"] = deque()
+        self._threads = threads
+        self._stream: Optional["zlib._Compress"] = None
+
+        if compression is not None and threads > 1:
+            self._pool = ThreadPoolExecutor(max_workers=threads)
+        elif compression == "gzip":
+            # Single gzip member for the whole file
+            self._stream = zlib.compressobj(compresslevel, zlib.DEFLATED, 31)
+
+    def _compress(self, data: bytes) -> bytes:
+        """
+        Compresses a block independently of all other blocks.
+        """
+        if self.compression == "bgzf":
+            return compress_blocks(data, self.compresslevel)
+        compressor = zlib.compressobj(self.compresslevel, zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+
+    def _write_file(self, data: bytes) -> None:
+        """
+        Writes (compressed) data to the file.
+        """
+        if self._rec is None:
+            self._file.write(data)
+            return
+        self._rec.enter("write")
+        self._file.write(data)
+        self._rec.exit()
+        self._rec.count("bytes_out", len(data))
+
+    def _emit(self, data: bytes) -> None:
+        """
+        Compresses (if needed) and writes a block of formatted records.
+        """
+        if self._rec is not None:
+            self._rec.enter("compress")
+        if self._pool is not None:
+            self._pending.append(self._pool.submit(self._compress, data))
+            # Limit the number of blocks held in memory
+            while len(self._pending) > 2 * self._threads:
+                self._write_file(self._pending.popleft().result())
+        elif self._stream is not None:
+            self._write_file(self._stream.compress(data))
+        elif self.compression == "bgzf":
+            self._write_file(self._compress(data))
+        else:
+            self._write_file(data)
+        if self._rec is not None:
+            self._rec.exit()
+
+    def flush(self) -> None:
+        """
+        Writes all buffered records.
+        """
+        if self._buffer:
+            self._emit("".join(self._buffer).encode("utf-8"))
+            self._buffer = []
+            self._buffered = 0
+
+    def write(self, fo: superFO) -> None:
+        """
+        Writes a single fasta_object.
+        """
+        if self._rec is not None:
+            self._rec.enter("format")
+            self._rec.count("records")
+        body = fo.getSeq()
+        if body:
+            record = f"{fo.head}\n{_wrap(body, self.line_width)}\n"
+        else:
+            record = f"{fo.head}\n"
+        if self._rec is not None:
+            self._rec.exit()
+        self._buffer.append(record)
+        self._buffered += len(record)
+        if self._buffered >= self.buffer_size:
+            self.flush()
+
+    def write_all(self, fasta_objects: Iterable[superFO]) -> None:
+        """
+        Writes all fasta_objects of an iterable, consuming it lazily.
+        """
+        for fo in fasta_objects:
+            self.write(fo)
+
+    def close(self) -> None:
+        """
+        Writes all remaining records and closes the file.
+        """
+        if self._file.closed:
+            return
+        try:
+            self.flush()
+            while self._pending:
+                self._write_file(self._pending.popleft().result())
+            if self._stream is not None:
+                self._write_file(self._stream.flush())
+            if self.compression == "bgzf":
+                self._write_file(bgzf_eof)
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+            self._file.close()
+            if self._rec is not None:
+                self._rec.finish()
+
+    def __enter__(self) -> "fasta_writer":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+
+def write(
+    fasta_pairs: Union[superFO, Iterable[superFO]],
+    file_path: str,
+    mode="w",
+    line_width: int = 70,
+    compression: Optional[str] = None,
+    threads: int = 1,
+) -> None:
     """
-    Writes a list of fasta_objects or a single one to a file.
-    Takes fasta_objects as input.
+    Writes a single fasta_object or any iterable of fasta_objects to a file.
+    Iterables (e.g. the output of read()) are consumed lazily.
 
     Parameters
     ----------
-        fasta_pairs: List[fasta_object] or fasta_object
-            List or single fasta_object to write.
+        fasta_pairs: Iterable[fasta_object] or fasta_object
+            Iterable or single fasta_object to write.
         file_path: str
             String or FilePath to file.
+        mode: str, default: "w"
+            "w" to overwrite, "a" to append. Other modes of open() are rejected.
+        line_width: int, default: 70
+            Number of characters per sequence line.
+        compression: str, optional
+            One of "gzip", "bgzf" or None. Defaults to gzip for .gz files,
+            bgzf for .bgz files and no compression otherwise.
+        threads: int, default: 1
+            Number of threads used for compression, 1 compresses in the calling thread.
+
+        The file is written in binary mode with "\n" line endings on all platforms,
+        see fasta_writer.
     """
 
-    if not isinstance(fasta_pairs, list):
+    if isinstance(fasta_pairs, superFO):
         fasta_pairs = [fasta_pairs]
 
-    with open(file_path, mode) as f:
-        for fo in fasta_pairs:
-            f.write(f"{fo.head}\n")
-            body_len = len(fo.body)
-            # Write only 70 chars per line
-            for i in range(0, body_len, 70):
-                f.write(f"{fo.body[i:i+70]}\n")
+    with fasta_writer(file_path, mode, line_width, compression, threads) as w:
+        w.write_all(fasta_pairs)
     return None
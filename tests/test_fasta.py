@@ -1,6 +1,9 @@
 import miniFasta as mf
+from miniFasta import _translation
+from miniFasta._bgzf import bgzf_eof
 
 from os import path, remove
+import gzip
 import pytest
 
 
@@ -138,3 +141,200 @@ def test_valid():
 def test_invalid_type_exception():
     fo = mf.fasta_object(">valid", "ACGTAGGT", stype="AA")
     assert fo.valid()
+
+
+def test_translate_seq_long():
+    seq = "CGGCCTTCTATCTTCTTC" * 200 + "CGAT"
+    assert mf.translate_seq(seq) == "RPSIFF" * 200 + "R"
+    assert mf.translate_seq(seq.lower()) == "~" * 1201
+    assert mf.translate_seq("CGNCCTTCT" * 200) == "~PS" * 200
+
+
+def test_translate_seq_table():
+    assert mf.translate_seq("ATATGA") == "I*"
+    assert mf.translate_seq("ATATGA", table=2) == "MW"
+    assert mf.translate_seq("ATATGA", d={"ATA": "Z"}, table=2) == "Z~"
+    assert mf.genetic_code(11) == mf.genetic_code(1)
+    with pytest.raises(ValueError):
+        mf.translate_seq("ATA", table=7)
+
+
+def test_translate_frames():
+    frames = mf.translate_frames("ATGGCCTAA")
+    assert frames == ["MA*", "WP", "GL", "LGH", "*A", "RP"]
+
+
+def test_translate_batch():
+    fos = [mf.fasta_object(">a", "CGGCCTTCT"), mf.fasta_object(">b", "ATGGCCTA" * 200)]
+    translated = mf.translate_batch(fos)
+    assert [fo.body for fo in translated] == [mf.translate_seq(fo.body) for fo in fos]
+    assert translated[1].head == ">b"
+    assert fos[0].body == "CGGCCTTCT"
+
+
+def test_translate_without_numpy(monkeypatch):
+    monkeypatch.setattr(_translation, "_has_numpy", False)
+    table = _translation.codon_table(mf.genetic_code())
+    assert table.lut is None
+    assert table.translate("CGGCCTTCTATCTTCTTC" * 200) == "RPSIFF" * 200
+    assert table.translate_many(["CGGCC", "HELLO"]) == ["R", "~"]
+
+
+def test_reverse_comp_case_and_dict():
+    assert mf.reverse_comp("") == ""
+    assert mf.reverse_comp("ACGTNacgtn") == "nacgtNACGT"
+    assert mf.reverse_comp("TC", {"C": "Z", "T": "Y"}) == "ZY"
+
+
+def test_reverse_comp_batch():
+    fos = [mf.fasta_object(">a", "CGGCCT", "DNA"), mf.fasta_object(">b", "aaTT")]
+    rev = mf.reverse_comp_batch(fos)
+    assert [fo.body for fo in rev] == ["AGGCCG", "AAtt"]
+    assert rev[0].head == ">a" and rev[0].stype == "DNA"
+    assert fos[0].body == "CGGCCT"
+
+
+def test_seq_view():
+    seq = "CGGCCTTCTANNNNatcTTCTTCU"
+    view = mf.fasta_object(">a", seq).view()
+
+    assert len(view) == len(seq) and str(view) == seq and list(view) == list(seq)
+    assert view[3] == seq[3] and view[-1] == seq[-1]
+    assert view[2:9] == seq[2:9] and view[::-3] == seq[::-3]
+    assert view[2:9][1:-1].tobytes() == seq[3:8].encode()
+    assert view.revcomp() == mf.reverse_comp(seq)
+    assert view.revcomp()[2:7].revcomp() == mf.reverse_comp(mf.reverse_comp(seq)[2:7])
+    assert view.revcomp({"C": "Z", "T": "Y"})[:3] == "UZY"
+    assert view.translate() == mf.translate_seq(seq)
+    assert view[1:].revcomp().translate(table=2) == mf.translate_seq(
+        mf.reverse_comp(seq[1:]), table=2
+    )
+    assert [str(w) for w in view.windows(10, 7)] == [seq[i : i + 10] for i in range(0, 15, 7)]
+    assert {view[:4], "CGGC"} == {"CGGC"}
+
+    with pytest.raises(IndexError):
+        view[len(seq)]
+    with pytest.raises(ValueError):
+        list(view.windows(0))
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_seq_view_long(monkeypatch, numpy):
+    seq = "CGGCCTTCTATCTTCTTCAN" * 500
+    view = mf.seq_view(bytearray(seq.encode()))
+    assert view.translate() == mf.translate_seq(seq)
+    assert "".join(view.revcomp()) == mf.reverse_comp(seq)
+
+    if not numpy:
+        monkeypatch.setattr(_translation, "_has_numpy", False)
+    table = _translation.codon_table(mf.genetic_code())
+    complement = bytes.maketrans(b"ACGT", b"TGCA")
+    rev = mf.reverse_comp(seq)
+    assert table.translate_buffer(memoryview(seq.encode())[::-1], complement) == table.translate(
+        rev
+    )
+    assert table.translate_buffer(seq.encode()[5:]) == table.translate(seq[5:])
+
+
+@pytest.mark.parametrize(
+    "body, bits",
+    [("CGGCCTTCTANNNNATCTTCTTCNN", 2), ("ACGTRYKMSWBDHVN-", 4), ("", 2)],
+)
+def test_pack(body, bits):
+    fo = mf.fasta_object(">packed", body)
+    fo.pack()
+    assert fo.isPacked()
+    assert fo.body.bits == bits
+    assert fo.getSeq() == body
+    assert len(fo) == len(body)
+    assert list(fo) == list(body)
+    assert fo[3:11] == body[3:11]
+    assert fo[::-2] == body[::-2]
+    assert fo == mf.fasta_object(">plain", body)
+    assert str(fo) == str(mf.fasta_object(">packed", body))
+
+    fo.toRevComp()
+    assert not fo.isPacked()
+    assert fo.body == mf.reverse_comp(body)
+
+
+def test_pack_invalid():
+    fo = mf.fasta_object(">packed", "ACGTacgt")
+    with pytest.raises(ValueError):
+        fo.pack()
+    assert fo.body == "ACGTacgt"
+
+
+@pytest.mark.parametrize(
+    "file_name, threads", [("w.fasta", 1), ("w.fasta.gz", 1), ("w.fasta.gz", 3)]
+)
+def test_write_stream(tmp_path, file_name, threads):
+    file_path = str(tmp_path / file_name)
+    fos = [mf.fasta_object(f">seq{i}", "ACGT" * i) for i in range(50)]
+
+    writer = mf.fasta_writer(file_path, threads=threads, buffer_size=256)
+    with writer:
+        writer.write_all(iter(fos))
+    assert list(mf.read(file_path)) == fos
+    assert [fo.head for fo in mf.read(file_path)] == [fo.head for fo in fos]
+
+
+def test_write_line_width_append(tmp_path):
+    file_path = str(tmp_path / "w.fasta")
+    mf.write(mf.fasta_object(">a", "ACGTACGTAC"), file_path, line_width=4)
+    mf.write((fo for fo in [mf.fasta_object(">b", "")]), file_path, mode="a")
+
+    with open(file_path) as f:
+        assert f.read() == ">a\nACGT\nACGT\nAC\n>b\n"
+
+
+@pytest.mark.parametrize("threads", [1, 2])
+def test_write_bgzf(tmp_path, threads):
+    file_path = str(tmp_path / "w.fasta.bgz")
+    body = "ACGTTGCA" * 20000
+    mf.write(mf.fasta_object(">long", body), file_path, threads=threads)
+
+    with open(file_path, "rb") as f:
+        data = f.read()
+    assert data[12:16] == b"BC\x02\x00"
+    assert data.endswith(bgzf_eof)
+    with gzip.open(file_path, "rt") as f:
+        assert f.read().replace("\n", "") == ">long" + body
+
+
+def test_valid_long_and_find_invalid():
+    fo = mf.fasta_object(">long", "ACGT" * 100000, stype="DNA")
+    assert fo.valid()
+    assert fo.findInvalid() is None
+
+    fo = mf.fasta_object(">invalid", "ACGTACUGTZ", stype="DNA")
+    assert fo.findInvalid() == (6, "U")
+    assert fo.findInvalid(allowedChars="ACGTU") == (9, "Z")
+    assert mf.fasta_object(">any", "Ä'_").findInvalid() is None
+
+
+def test_digest_and_hash():
+    fo = mf.fasta_object(">a", "ACGTTT")
+    d = fo.digest()
+    assert len(d) == 16 and fo.digest() is d
+    assert hash(fo) == hash(mf.fasta_object(">b", "ACGTTT"))
+    assert len({fo, mf.fasta_object(">b", "ACGTTT"), mf.fasta_object(">c", "AAA")}) == 2
+
+    fo.pack()
+    assert fo.digest() == d
+    fo.toRevComp()
+    assert fo.digest() != d
+    assert fo.digest() == mf.fasta_object(">", "AAACGT").digest()
+
+
+@pytest.mark.parametrize("memory_limit", [1 << 20, 1])
+def test_dedup(tmp_path, memory_limit):
+    a = [mf.fasta_object(f">a{i}", s) for i, s in enumerate(["ACGT", "AAAC", "ACGT", "GGGG"])]
+    b = [mf.fasta_object(f">b{i}", s) for i, s in enumerate(["GTTT", "CCCC", "AAAC", "TTTA"])]
+
+    unique = mf.dedup(iter(a), iter(b), memory_limit=memory_limit, tmp_dir=str(tmp_path))
+    assert [fo.head for fo in unique] == [">a0", ">a1", ">a3", ">b0", ">b1", ">b3"]
+
+    unique = mf.dedup(a, b, revcomp=True, memory_limit=memory_limit, tmp_dir=str(tmp_path))
+    assert [fo.head for fo in unique] == [">a0", ">a1", ">a3", ">b3"]
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,104 @@
+import miniFasta as mf
+
+from os import path
+import shutil
+import pytest
+
+data_dir = path.join(path.dirname(__file__), "test_data")
+
+
+@pytest.fixture
+def indexed(tmp_path):
+    file_path = str(tmp_path / "test1.fasta")
+    shutil.copy(path.join(data_dir, "test1.fasta"), file_path)
+    return file_path
+
+
+def test_build_index(indexed):
+    index = mf.build_index(indexed)
+    assert list(index) == ["FirstTestFASTA", "", "Third"]
+    assert index["FirstTestFASTA"] == mf.faidx_entry("FirstTestFASTA", 200, 39, 79, 80)
+    assert path.isfile(indexed + ".fai")
+    assert mf.read_index(indexed + ".fai") == index
+
+
+def test_fetch_matches_read(indexed):
+    records = list(mf.read(indexed))
+    with mf.faidx(indexed) as fa:
+        assert len(fa) == 3
+        assert "Third" in fa
+        for name, fo in zip(fa, records):
+            assert fa.fetch(name) == fo.body
+            assert fa[name] == fo
+            for start, end in [(0, 1), (5, 79), (78, 80), (79, 158), (3, 500)]:
+                assert fa.fetch(name, start, end) == fo.body[start:end]
+
+
+def test_fetch_function(indexed):
+    assert mf.fetch(indexed, "FirstTestFASTA", 10, 20) == "ATTGTTAAAT"
+
+
+def test_fetch_errors(indexed):
+    with mf.faidx(indexed) as fa:
+        with pytest.raises(KeyError):
+            fa.fetch("missing")
+        with pytest.raises(ValueError):
+            fa.fetch("Third", 5, 2)
+
+
+def test_index_inconsistent_lines():
+    with pytest.raises(ValueError):
+        mf.build_index(path.join(data_dir, "test2.fasta"), write=False)
+
+
+def test_index_unterminated_last_line(tmp_path):
+    # A full last line without line break, as accepted by samtools faidx
+    file_path = str(tmp_path / "unterminated.fasta")
+    with open(file_path, "wb") as f:
+        f.write(b">a\nACGT\nACGT\n>b\nGGCC\nGGCC")
+
+    index = mf.build_index(file_path, write=False)
+    assert index["a"] == mf.faidx_entry("a", 8, 3, 4, 5)
+    assert index["b"] == mf.faidx_entry("b", 8, 16, 4, 5)
+    assert mf.fetch(file_path, "b", 2, 7) == "CCGGC"
+
+
+@pytest.fixture
+def bgzipped(tmp_path):
+    file_path = str(tmp_path / "long.fasta.bgz")
+    fos = [mf.fasta_object(f">seq{i} desc", "ACGTTGCAAC" * (3000 * i + 7)) for i in range(6)]
+    mf.write(fos, file_path, line_width=60)
+    return file_path, fos
+
+
+def test_read_bgzf(bgzipped):
+    file_path, fos = bgzipped
+    assert list(mf.read(file_path)) == fos
+
+    with mf.bgzf_reader(file_path, threads=2) as reader:
+        data = reader.read()
+    assert data.count(b">") == len(fos)
+
+
+def test_gzi(bgzipped):
+    file_path, _ = bgzipped
+    index = mf.build_gzi(file_path, file_path + ".gzi")
+    assert len(index) > 2
+    assert mf.read_gzi(file_path + ".gzi") == index
+
+
+def test_fetch_bgzf(bgzipped):
+    file_path, fos = bgzipped
+    with mf.faidx(file_path) as fa:
+        assert list(fa) == [f"seq{i}" for i in range(6)]
+        for fo in fos:
+            name = fo.head[1:].split()[0]
+            assert fa.fetch(name) == fo.body
+            for start, end in [(0, 5), (59, 61), (65270, 65300), (100000, 140000)]:
+                assert fa.fetch(name, start, end) == fo.body[start:end]
+    assert path.isfile(file_path + ".gzi")
+
+
+def test_index_gzip():
+    with pytest.raises(ValueError):
+        mf.build_index(path.join(data_dir, "test.fasta.gz"), write=False)
@@ -0,0 +1,87 @@
+import miniFasta as mf
+import miniFasta._kmers as _kmers
+
+from collections import Counter
+from os import path
+import random
+import pytest
+
+
+def naive_counts(seqs, k, canonical):
+    counts = Counter()
+    for s in seqs:
+        s = s.upper()
+        for i in range(len(s) - k + 1):
+            kmer = s[i : i + k]
+            if set(kmer) <= set("ACGT"):
+                if canonical:
+                    kmer = min(kmer, mf.reverse_comp(kmer))
+                counts[kmer] += 1
+    return counts
+
+
+random.seed(13)
+seqs = ["".join(random.choice("ACGTN") for _ in range(random.randint(0, 300))) for _ in range(30)]
+seqs.append("acgtACGTacgt")
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+@pytest.mark.parametrize("k, canonical", [(1, True), (5, True), (5, False), (21, True)])
+def test_count_kmers_exact(monkeypatch, numpy, k, canonical):
+    if not numpy:
+        monkeypatch.setattr(_kmers, "_has_numpy", False)
+    counts = mf.count_kmers(seqs, k, canonical=canonical, exact=True, workers=1, chunk_size=500)
+    expected = naive_counts(seqs, k, canonical)
+    assert dict(counts.items()) == expected
+    assert len(counts) == len(expected)
+    assert counts.total == sum(expected.values())
+    assert counts.most_common(3) == sorted(expected.items(), key=lambda p: (-p[1], p[0]))[:3]
+    for kmer, n in expected.items():
+        assert counts[kmer] == n
+        assert counts[mf.reverse_comp(kmer)] == (
+            n if canonical else expected[mf.reverse_comp(kmer)]
+        )
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_count_kmers_sketch(monkeypatch, numpy):
+    if not numpy:
+        monkeypatch.setattr(_kmers, "_has_numpy", False)
+    k = 33
+    counts = mf.count_kmers(seqs, k, workers=1, width=256, depth=3)
+    expected = naive_counts(seqs, k, True)
+    assert not counts.exact
+    assert counts.total == sum(expected.values())
+    for kmer, n in expected.items():
+        assert counts[kmer] >= n
+        assert counts[mf.reverse_comp(kmer)] == counts[kmer]
+    with pytest.raises(TypeError):
+        len(counts)
+
+
+def test_count_kmers_sketch_matches_numpy(monkeypatch):
+    with_numpy = mf.count_kmers(seqs, 7, exact=False, workers=1, width=64)
+    monkeypatch.setattr(_kmers, "_has_numpy", False)
+    without_numpy = mf.count_kmers(seqs, 7, exact=False, workers=1, width=64)
+    assert with_numpy._data.tolist() == without_numpy._data
+
+
+@pytest.mark.parametrize("workers, chunk_size", [(1, 1 << 20), (2, 40)])
+def test_count_kmers_file(workers, chunk_size):
+    file_path = path.join(path.dirname(__file__), "test_data/test2.fasta")
+    records = [fo.getSeq() for fo in mf.read(file_path)]
+    counts = mf.count_kmers(file_path, 4, workers=workers, chunk_size=chunk_size)
+    assert dict(counts.items()) == naive_counts(records, 4, True)
+    assert dict(mf.count_kmers(mf.read(file_path), 4, workers=1).items()) == dict(counts.items())
+
+
+def test_count_kmers_errors():
+    with pytest.raises(ValueError):
+        mf.count_kmers(seqs, 0)
+    with pytest.raises(ValueError):
+        mf.count_kmers(seqs, 33, exact=True)
+    with pytest.raises(ValueError):
+        mf.count_kmers(seqs, 3, workers=1)["ACN"]
+    with pytest.raises(FileNotFoundError):
+        mf.count_kmers("missing.fasta", 3)
+    assert len(mf.count_kmers([], 3)) == 0
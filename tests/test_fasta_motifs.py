@@ -0,0 +1,75 @@
+import miniFasta as mf
+from miniFasta._motifs import iupac_bases
+
+import random
+import re
+import pytest
+
+
+def naive_hits(fos, patterns, both_strands):
+    hits = []
+    for fo in fos:
+        for pattern in patterns:
+            strands = [("+", pattern)]
+            if both_strands:
+                strands.append(("-", mf.reverse_comp(pattern.upper())))
+            for strand, p in strands:
+                classes = ["." if c == "N" else f"[{iupac_bases[c]}]" for c in p.upper()]
+                regex = re.compile(f"(?=({''.join(classes)}))", re.IGNORECASE)
+                for m in regex.finditer(fo.getSeq()):
+                    hits.append((fo.head, m.start(), pattern, strand))
+    return sorted(hits)
+
+
+random.seed(21)
+fos = [
+    mf.fasta_object(
+        f">r{i}", "".join(random.choice("ACGTN") for _ in range(random.randint(0, 400)))
+    )
+    for i in range(40)
+]
+fos.append(mf.fasta_object(">soft", "aaGAATTCaaggatccTTT"))
+patterns = ["GAATTC", "GGATCC", "RGATCY", "ACGNN", "AC", "ACGT", "TTTT", "AC"]
+
+
+@pytest.mark.parametrize("both_strands", [True, False])
+def test_find_motifs(both_strands):
+    hits = list(mf.find_motifs(fos, patterns, both_strands=both_strands))
+    order = {fo.head: i for i, fo in enumerate(fos)}
+    assert hits == sorted(hits, key=lambda h: (order[h.head], h.start))
+    assert all(h.end - h.start == len(h.pattern) for h in hits)
+
+    # Duplicate patterns are reported once per occurrence in the list
+    found = sorted((h.head, h.start, h.pattern, h.strand) for h in hits)
+    assert found == naive_hits(fos, patterns, both_strands)
+
+
+def test_find_motifs_strands():
+    fo = mf.fasta_object(">a", "TTGAATTCAGGTCAG")
+    hits = list(mf.find_motifs([fo], ["CCTGA", "GAATTC"]))
+    assert hits == [
+        mf.motif_hit(">a", "GAATTC", "+", 2, 8),
+        mf.motif_hit(">a", "GAATTC", "-", 2, 8),
+        mf.motif_hit(">a", "CCTGA", "-", 6, 11),
+    ]
+
+
+@pytest.mark.parametrize("workers, chunk_size", [(1, 1 << 20), (2, 300)])
+def test_find_motifs_file(tmp_path, workers, chunk_size):
+    file_path = str(tmp_path / "motifs.fasta.gz")
+    mf.write(fos, file_path)
+    expected = list(mf.find_motifs(fos, patterns))
+
+    hits = mf.find_motifs(file_path, patterns, workers=workers, chunk_size=chunk_size)
+    assert list(hits) == expected
+    assert list(mf.find_motifs(fos, patterns, workers=workers, chunk_size=chunk_size)) == expected
+
+
+def test_find_motifs_errors():
+    assert list(mf.find_motifs(fos, [])) == []
+    with pytest.raises(ValueError, match="Illegal character"):
+        list(mf.find_motifs(fos, ["ACGZ"]))
+    with pytest.raises(ValueError):
+        list(mf.find_motifs(fos, [""]))
+    with pytest.raises(FileNotFoundError):
+        list(mf.find_motifs("missing.fasta", ["ACGT"]))
@@ -1,5 +1,10 @@
 import miniFasta as mf
+import miniFasta._batches
+import miniFasta._cache
+import miniFasta._parallel
 
+import asyncio
+import io
 from os import path
 import pytest
 
@@ -70,3 +75,374 @@ def test_read_empty_lines():
 
     assert fos[0].body == b0
     assert fos[1].body == b1
+
+
+@pytest.mark.parametrize("file_name", ["test0.fasta", "test1.fasta", "test2.fasta", "test3.fasta"])
+def test_read_mmap(file_name):
+    file_path = path.join(path.dirname(__file__), "test_data", file_name)
+    expected = list(mf.read(file_path))
+    fos = list(mf.read(file_path, use_mmap=True))
+
+    assert fos == expected
+    assert [fo.head for fo in fos] == [fo.head for fo in expected]
+    assert list(mf.read(file_path, seq=True, use_mmap=True)) == [fo.body for fo in expected]
+
+
+def test_read_mmap_empty(tmp_path):
+    file_path = tmp_path / "empty.fasta"
+    file_path.write_text("")
+    assert list(mf.read(str(file_path), use_mmap=True)) == []
+
+
+@pytest.mark.parametrize("tail, head", [(">chr2", ">chr2"), (">", ">"), (">chr2 x\r", ">chr2 x")])
+def test_read_mmap_trailing_head(tmp_path, tail, head):
+    # The file ends with a header line without a line break
+    file_path = str(tmp_path / "tail.fasta")
+    with open(file_path, "wb") as f:
+        f.write(b">a\nACGT\n" + tail.encode())
+
+    expected = [(">a", "ACGT"), (head, "")]
+    assert [(fo.head, fo.body) for fo in mf.read(file_path, use_mmap=True)] == expected
+    assert list(mf.read(file_path, headers_only=True)) == [">a", head]
+    assert list(mf.read(file_path, lengths=True)) == [(">a", 4), (head, 0)]
+    assert [fo.head for fo in mf.read(file_path, ids=[head])] == [head]
+    assert [fo.head for fo in mf.read_parallel(file_path, chunk_size=3)] == [">a", head]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 100, 1 << 20])
+def test_read_parallel(chunk_size):
+    file_path = path.join(path.dirname(__file__), "test_data/test1.fasta")
+    expected = list(mf.read(file_path))
+    fos = list(mf.read_parallel(file_path, workers=1, chunk_size=chunk_size))
+
+    assert fos == expected
+    assert [fo.head for fo in fos] == [fo.head for fo in expected]
+
+
+def test_read_parallel_pool():
+    file_path = path.join(path.dirname(__file__), "test_data/test3.fasta")
+    expected = [fo.body for fo in mf.read(file_path)]
+
+    assert list(mf.read_parallel(file_path, workers=2, chunk_size=16, seq=True)) == expected
+    unordered = mf.read_parallel(file_path, workers=2, chunk_size=16, ordered=False, seq=True)
+    assert sorted(unordered) == sorted(expected)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 1 << 20])
+def test_read_parallel_gzip(chunk_size):
+    file_path = path.join(path.dirname(__file__), "test_data/test.fasta.gz")
+    assert list(mf.read_parallel(file_path, workers=1, chunk_size=chunk_size)) == dolphin
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 8, 1000])
+def test_stream_chunks(chunk_size):
+    data = b">a\nACGT\nAC\n>b\n\n>c x\nA" + b"C" * 20 + b"\n>d\nG\n"
+    chunks = list(miniFasta._parallel._stream_chunks(io.BytesIO(data), chunk_size))
+
+    assert b"".join(chunks) == data
+    # Each chunk holds whole records
+    assert all(c[:1] == b">" and c[-1:] == b"\n" for c in chunks)
+    if chunk_size == 1:
+        assert len(chunks) == 4
+
+
+@pytest.mark.parametrize("file_name", ["test.multi.zip", "test.multi.tar", "test.multi.tar.gz"])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_read_parallel_archive(file_name, workers):
+    file_path = path.join(path.dirname(__file__), "test_data", file_name)
+    assert list(mf.read_parallel(file_path, workers=workers)) == multi
+
+
+@pytest.mark.parametrize("file_name", ["test3.fasta", "test.multi.tar.gz", "test.fasta.gz"])
+@pytest.mark.parametrize("workers, chunk_size", [(1, 1 << 20), (2, 16)])
+def test_map_records(file_name, workers, chunk_size):
+    file_path = path.join(path.dirname(__file__), "test_data", file_name)
+    fos = list(mf.read(file_path))
+
+    assert list(mf.map_records(file_path, len, workers, chunk_size)) == list(map(len, fos))
+    assert list(mf.map_records(fos, len, workers, chunk_size)) == list(map(len, fos))
+    unordered = mf.map_records(file_path, len, workers, chunk_size, ordered=False)
+    assert sorted(unordered) == sorted(map(len, fos))
+
+    translated = list(mf.map_records(file_path, "toAmino", workers, chunk_size))
+    assert [(fo.head, fo.body) for fo in translated] == [
+        (fo.head, mf.translate_seq(fo.body)) for fo in fos
+    ]
+    reversed_fos = mf.map_records(fos, "toRevComp", workers, chunk_size)
+    assert [fo.body for fo in reversed_fos] == [mf.reverse_comp(fo.body) for fo in fos]
+
+
+def test_map_records_errors():
+    with pytest.raises(ValueError):
+        list(mf.map_records([], "toUpper"))
+    with pytest.raises(FileNotFoundError):
+        list(mf.map_records("missing.fasta", len))
+
+
+@pytest.mark.parametrize(
+    "file_name",
+    ["test0.fasta", "test1.fasta", "test3.fasta", "test.fasta.gz", "test.multi.tar.gz"],
+)
+def test_read_headers_lengths(file_name):
+    file_path = path.join(path.dirname(__file__), "test_data", file_name)
+    fos = list(mf.read(file_path))
+
+    assert list(mf.read(file_path, headers_only=True)) == [fo.head for fo in fos]
+    assert list(mf.read(file_path, lengths=True)) == [(fo.head, len(fo)) for fo in fos]
+
+
+def test_read_exclusive_modes():
+    file_path = path.join(path.dirname(__file__), "test_data/test0.fasta")
+    with pytest.raises(ValueError):
+        list(mf.read(file_path, seq=True, lengths=True))
+    with pytest.raises(ValueError):
+        list(mf.read(file_path, headers_only=True, validate="dna"))
+    with pytest.raises(ValueError):
+        list(mf.read(file_path, lengths=True, validate="dna"))
+
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_read_validate(use_mmap):
+    file_path = path.join(path.dirname(__file__), "test_data/test0.fasta")
+    fos = list(mf.read(file_path, validate="dna", use_mmap=use_mmap))
+    assert fos == dolphin
+    assert fos[0].stype == "DNA"
+
+    with pytest.raises(ValueError, match="position 5 of >Atlantic dolphin"):
+        list(mf.read(file_path, validate="rna", use_mmap=use_mmap))
+
+
+@pytest.mark.parametrize("file_name", ["test.multi.tar.gz", "multi.fasta"])
+@pytest.mark.parametrize(
+    "kwargs, expected",
+    [
+        ({"min_length": 15}, [0, 1]),
+        ({"max_length": 14}, [2, 3]),
+        ({"min_length": 14, "max_length": 18}, [0, 2]),
+        ({"header": "dolphin$"}, [0, 1]),
+        ({"ids": ["Pacific", "R2", "missing"]}, [1, 3]),
+        ({"ids": "RANDOM"}, [2]),
+        ({"ids": ["Atlantic", "R2"], "max_length": 10}, [3]),
+    ],
+)
+def test_read_filter(tmp_path, file_name, kwargs, expected):
+    file_path = path.join(path.dirname(__file__), "test_data", file_name)
+    if file_name == "multi.fasta":
+        file_path = tmp_path / file_name
+        mf.write(multi, str(file_path))
+
+    kept = [multi[i] for i in expected]
+    assert list(mf.read(file_path, **kwargs)) == kept
+    assert list(mf.read(file_path, seq=True, **kwargs)) == [fo.body for fo in kept]
+    assert list(mf.read(file_path, headers_only=True, **kwargs)) == [fo.head for fo in kept]
+    assert list(mf.read(file_path, lengths=True, **kwargs)) == [(fo.head, len(fo)) for fo in kept]
+
+
+def test_read_filter_id_file(tmp_path):
+    file_path = path.join(path.dirname(__file__), "test_data/test.multi.tar.gz")
+    id_file = tmp_path / "ids.txt"
+    id_file.write_text(">Atlantic dolphin\n\nR2\n")
+
+    assert list(mf.read(file_path, id_file=str(id_file))) == [multi[0], multi[3]]
+    assert list(mf.read(file_path, id_file=str(id_file), ids=["RANDOM"])) == [
+        multi[0],
+        multi[2],
+        multi[3],
+    ]
+
+    with pytest.raises(ValueError):
+        list(mf.read(file_path, min_length=10, max_length=5))
+
+
+@pytest.mark.parametrize("read_ahead", [1, 2, 100])
+def test_aread(read_ahead):
+    file_path = path.join(path.dirname(__file__), "test_data/test.multi.tar.gz")
+
+    async def collect():
+        return [fo async for fo in mf.aread(file_path, read_ahead=read_ahead)]
+
+    assert asyncio.run(collect()) == multi
+
+
+def test_aread_kwargs_and_break():
+    file_path = path.join(path.dirname(__file__), "test_data/test0.fasta")
+
+    async def first():
+        async for s in mf.aread(file_path, read_ahead=1, seq=True):
+            return s
+
+    assert asyncio.run(first()) == dolphin[0].body
+
+
+def test_aread_many():
+    data = path.join(path.dirname(__file__), "test_data")
+    file_paths = [path.join(data, f) for f in ("test0.fasta", "test.multi.zip", "test.fasta.gz")]
+
+    async def collect():
+        return [r async for r in mf.aread_many(file_paths, max_open=2, read_ahead=1)]
+
+    records = asyncio.run(collect())
+    assert len(records) == 8
+    for file_path, expected in zip(file_paths, [dolphin, multi, dolphin]):
+        assert [fo for p, fo in records if p == file_path] == expected
+
+
+def test_aread_many_error():
+    data = path.join(path.dirname(__file__), "test_data")
+
+    async def collect():
+        return [r async for r in mf.aread_many([path.join(data, "test0.fasta"), "missing.fasta"])]
+
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(collect())
+
+
+def test_profiler(tmp_path):
+    file_path = path.join(path.dirname(__file__), "test_data/test.multi.tar.gz")
+    out_path = str(tmp_path / "out.fasta.gz")
+    runs = []
+
+    with mf.profiler() as p:
+        mf.add_observer(runs.append)
+        try:
+            mf.write(mf.read(file_path), out_path)
+            assert list(mf.read(out_path, headers_only=True)) == [fo.head for fo in multi]
+        finally:
+            mf.remove_observer(runs.append)
+
+    assert [r.kind for r in runs] == ["read", "write", "read"]
+    read_stats, write_stats = runs[0], runs[1]
+    assert read_stats.counts["members"] == 2
+    assert read_stats.counts["records"] == 4
+    assert read_stats.counts["lines"] == 8
+    assert set(read_stats.times) == {"open", "decompress", "parse", "construct"}
+    assert write_stats.counts["records"] == 4
+    assert write_stats.counts["bytes_out"] == path.getsize(out_path)
+    assert set(write_stats.times) == {"open", "format", "compress", "write"}
+
+    assert p.runs == 3
+    assert p.totals["read"].counts["records"] == 8
+    assert "decompress" in p.summary()
+
+    # Nothing is recorded without observers
+    assert list(mf.read(file_path)) == multi
+    assert p.runs == 3
+
+
+@pytest.mark.parametrize(
+    "file_name", ["test1.fasta", "test2.fasta", "test.multi.zip", "test.multi.tar.gz"]
+)
+@pytest.mark.parametrize("batch_size", [1, 2, 1000])
+def test_read_batches(file_name, batch_size):
+    file_path = path.join(path.dirname(__file__), "test_data", file_name)
+    expected = list(mf.read(file_path))
+    batches = list(mf.read_batches(file_path, batch_size=batch_size))
+
+    assert all(len(b) == batch_size for b in batches[:-1])
+    assert [fo for b in batches for fo in b] == expected
+    assert [h for b in batches for h in b.heads] == [fo.head for fo in expected]
+    assert [n for b in batches for n in b.lengths] == [len(fo) for fo in expected]
+    assert batches[-1].sequence(-1) == expected[-1].body
+    assert batches[-1].view(-1) == expected[-1].body
+
+
+def test_read_batches_numpy():
+    np = pytest.importorskip("numpy")
+    file_path = path.join(path.dirname(__file__), "test_data/test0.fasta")
+    (batch,) = mf.read_batches(file_path, upper=False)
+    arrays = batch.to_numpy()
+    assert arrays["offsets"].tolist() == [0, 18, 37]
+    assert arrays["lengths"].tolist() == [18, 19]
+    assert arrays["data"].tobytes().decode() == "".join(fo.body for fo in dolphin)
+    assert np.shares_memory(arrays["data"], np.frombuffer(batch.data, dtype=np.uint8))
+    with pytest.raises(ValueError):
+        next(mf.read_batches(file_path, batch_size=0))
+
+
+def test_read_batches_arrow():
+    pytest.importorskip("pyarrow")
+    file_path = path.join(path.dirname(__file__), "test_data/test0.fasta")
+    (batch,) = mf.read_batches(file_path)
+    table = batch.to_arrow()
+    assert table.column("sequence").to_pylist() == [fo.body for fo in dolphin]
+    assert table.column("head").to_pylist() == [fo.head for fo in dolphin]
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_read_batches_line_endings(tmp_path, monkeypatch, numpy):
+    if not numpy:
+        monkeypatch.setattr(mf._batches, "_has_numpy", False)
+    file_path = str(tmp_path / "mixed.fasta")
+    with open(file_path, "w", newline="") as f:
+        f.write(">a x \r\nacg\r\nTT\r\n>b\n>c\nAC GT\n  T\n>d  \n" + "A" * 700 + "\n")
+    expected = list(mf.read(file_path))
+    for chunk_size in (1, 1 << 20):
+        batches = mf.read_batches(file_path, batch_size=3, chunk_size=chunk_size)
+        assert [(fo.head, fo.body) for b in batches for fo in b] == [
+            (fo.head, fo.body) for fo in expected
+        ]
+
+
+@pytest.mark.parametrize("file_name", ["test.multi.tar.gz", "test3.fasta", "test.fasta.gz"])
+def test_read_cached(tmp_path, monkeypatch, file_name):
+    file_path = path.join(path.dirname(__file__), "test_data", file_name)
+    cache_dir = str(tmp_path / "cache")
+    expected = list(mf.read(file_path))
+
+    def modes():
+        return [
+            list(mf.read_cached(file_path, cache_dir=cache_dir)),
+            list(mf.read_cached(file_path, seq=True, cache_dir=cache_dir)),
+            list(mf.read_cached(file_path, headers_only=True, cache_dir=cache_dir)),
+            list(mf.read_cached(file_path, lengths=True, cache_dir=cache_dir)),
+        ]
+
+    results = [
+        expected,
+        [fo.body for fo in expected],
+        [fo.head for fo in expected],
+        [(fo.head, len(fo)) for fo in expected],
+    ]
+    assert modes() == results
+    assert [fo.head for fo in mf.read_cached(file_path, cache_dir=cache_dir)] == results[2]
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+
+    # Warm reads do not parse the source
+    monkeypatch.setattr(miniFasta._cache, "read_batches", None)
+    assert modes() == results
+
+    with pytest.raises(ValueError):
+        list(mf.read_cached(file_path, seq=True, lengths=True, cache_dir=cache_dir))
+
+
+def test_read_cached_invalidation(tmp_path):
+    file_path = tmp_path / "in.fasta"
+    cache_dir = tmp_path / "cache"
+    fos = [mf.fasta_object(">ä b", "ACGT"), mf.fasta_object(">c", "")]
+    mf.write(fos, str(file_path))
+    assert list(mf.read_cached(str(file_path), cache_dir=str(cache_dir))) == fos
+
+    # Closing early does not leave an incomplete entry
+    mf.clear_cache(str(cache_dir))
+    records = mf.read_cached(str(file_path), upper=False, cache_dir=str(cache_dir))
+    next(records)
+    records.close()
+    assert list(cache_dir.iterdir()) == []
+
+    # A changed file is parsed again
+    list(mf.read_cached(str(file_path), cache_dir=str(cache_dir)))
+    mf.write(fos[:1], str(file_path))
+    cached = list(mf.read_cached(str(file_path), cache_dir=str(cache_dir)))
+    assert [fo.head for fo in cached] == [">ä b"]
+    assert len(list(cache_dir.iterdir())) == 2
+
+    # The least recently used entries are evicted
+    other = tmp_path / "other.fasta"
+    mf.write(fos, str(other))
+    size = max(p.stat().st_size for p in cache_dir.iterdir())
+    list(mf.read_cached(str(other), cache_dir=str(cache_dir), max_size=2 * size))
+    assert len(list(cache_dir.iterdir())) == 2
+    list(mf.read_cached(str(other), cache_dir=str(cache_dir), max_size=0))
+    assert len(list(cache_dir.iterdir())) == 2
+    list(mf.read_cached(str(file_path), upper=False, cache_dir=str(cache_dir), max_size=0))
+    assert list(cache_dir.iterdir()) == []
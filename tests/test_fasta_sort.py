@@ -0,0 +1,46 @@
+import miniFasta as mf
+import miniFasta._sort as _sort
+
+import random
+import pytest
+
+random.seed(22)
+fos = [
+    mf.fasta_object(
+        f">r{i:03d}", "".join(random.choice("ACGTacgt") for _ in range(random.randint(0, 90)))
+    )
+    for i in range(200)
+]
+
+
+def sorted_records(file_path):
+    return [(fo.head, fo.body) for fo in mf.read(file_path, upper=False)]
+
+
+@pytest.mark.parametrize("memory_limit", [1 << 30, 2000])
+@pytest.mark.parametrize(
+    "key, reverse",
+    [("length", False), ("length", True), ("header", True), ("digest", False)],
+)
+def test_sort(tmp_path, monkeypatch, memory_limit, key, reverse):
+    # Forces multiple merge passes with the small memory limit
+    monkeypatch.setattr(_sort, "_max_merge", 3)
+    output = str(tmp_path / "sorted.fasta")
+    mf.sort(fos, output, key=key, reverse=reverse, memory_limit=memory_limit, tmp_dir=tmp_path)
+
+    # Stable, as sorted()
+    expected = sorted(fos, key=_sort.sort_keys[key], reverse=reverse)
+    assert sorted_records(output) == [(fo.head, fo.body) for fo in expected]
+    assert [p.name for p in tmp_path.iterdir()] == ["sorted.fasta"]
+
+
+def test_sort_file(tmp_path):
+    file_path = str(tmp_path / "in.fasta.gz")
+    mf.write(fos, file_path)
+
+    mf.sort(file_path, file_path, key=lambda fo: fo.body.upper(), memory_limit=5000)
+    expected = sorted(fos, key=lambda fo: fo.body.upper())
+    assert sorted_records(file_path) == [(fo.head, fo.body) for fo in expected]
+
+    with pytest.raises(ValueError):
+        mf.sort(fos, str(tmp_path / "out.fasta"), key="gc")
@@ -0,0 +1,49 @@
+import miniFasta as mf
+
+import random
+import pytest
+
+random.seed(23)
+fos = [
+    mf.fasta_object(f">r{i}", "".join(random.choice("ACGT") for _ in range(random.randint(1, 500))))
+    for i in range(300)
+]
+
+
+@pytest.mark.parametrize(
+    "file_name, index", [("in.fasta", False), ("in.fasta", True), ("in.fa.gz", False)]
+)
+@pytest.mark.parametrize("n", [1, 4, 7])
+def test_split(tmp_path, file_name, index, n):
+    file_path = str(tmp_path / file_name)
+    mf.write(fos, file_path)
+    if index:
+        mf.build_index(file_path)
+
+    shards = mf.split(file_path, n)
+    assert [p for p, _ in shards] == [str(tmp_path / f"in.part_{i + 1}.fasta") for i in range(n)]
+
+    records = [list(mf.read(p)) for p, _ in shards]
+    assert [sum(map(len, r)) for r in records] == [bases for _, bases in shards]
+
+    # All records, in file order within each shard
+    order = {fo.head: i for i, fo in enumerate(fos)}
+    assert sorted((fo.head for r in records for fo in r), key=order.get) == [fo.head for fo in fos]
+    assert all([order[fo.head] for fo in r] == sorted(order[fo.head] for fo in r) for r in records)
+
+    # Shards differ by at most the longest record
+    bases = [b for _, b in shards]
+    assert max(bases) - min(bases) <= max(map(len, fos))
+
+
+def test_split_options(tmp_path):
+    file_path = str(tmp_path / "in.fasta")
+    mf.write(fos[:3], file_path)
+
+    shards = mf.split(file_path, 10, output_dir=str(tmp_path), compression="gzip")
+    assert shards[0][0] == str(tmp_path / "in.part_01.fasta.gz")
+    assert sum(len(list(mf.read(p))) for p, _ in shards) == 3
+    assert sum(b == 0 for _, b in shards) == 7
+
+    with pytest.raises(ValueError):
+        mf.split(file_path, 0)
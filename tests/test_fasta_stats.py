@@ -0,0 +1,64 @@
+import miniFasta as mf
+import miniFasta._stats as _stats
+
+from os import path
+import pytest
+
+
+@pytest.fixture
+def assembly(tmp_path):
+    file_path = str(tmp_path / "assembly.fasta")
+    with open(file_path, "w") as f:
+        f.write(
+            ">c1 GGCC header\nACGTACGTAC\nGTNN\n>c2\nggcc\n>c3\r\nAAAA\r\nAAAA\r\n>empty\n>c5\nACGT RY\n"
+        )
+    return file_path
+
+
+@pytest.mark.parametrize("workers, chunk_size", [(1, 1 << 20), (1, 3), (2, 5)])
+def test_stats(assembly, workers, chunk_size):
+    s = mf.stats(assembly, workers=workers, chunk_size=chunk_size)
+    assert s.count == 5
+    assert s.total == 14 + 4 + 8 + 0 + 7
+    assert (s.min_length, s.max_length) == (0, 14)
+    assert (s.n50, s.l50) == (8, 2)
+    assert s.composition == {"A": 12, "C": 6, "G": 6, "N": 2, "R": 1, "T": 4, "Y": 1}
+    assert s.gc == pytest.approx(12 / 28)
+    assert s.n_fraction == pytest.approx(2 / 33)
+    assert s.mean_length == pytest.approx(33 / 5)
+
+
+def test_stats_lowercase(assembly):
+    s = mf.stats(assembly, upper=False, workers=1)
+    assert s.composition["g"] == 2 and s.composition["G"] == 4
+    assert s.gc == pytest.approx(12 / 28)
+
+
+def test_stats_histogram(assembly):
+    s = mf.stats(assembly, bins=3, workers=1)
+    assert s.histogram == [(0, 5, 2), (5, 10, 2), (10, 15, 1)]
+    assert sum(n for _, _, n in s.histogram) == s.count
+
+
+@pytest.mark.parametrize("file_name", ["test.fasta.gz", "test.multi.zip", "test.multi.tar.gz"])
+def test_stats_compressed(file_name):
+    file_path = path.join(path.dirname(__file__), "test_data", file_name)
+    records = list(mf.read(file_path))
+    s = mf.stats(file_path, workers=1)
+    assert s.count == len(records)
+    assert s.total == sum(len(fo) for fo in records)
+    assert sum(s.composition.values()) == s.total
+
+
+def test_stats_no_numpy(assembly, monkeypatch):
+    expected = mf.stats(assembly, workers=1)
+    monkeypatch.setattr(_stats, "_has_numpy", False)
+    assert mf.stats(assembly, workers=1) == expected
+
+
+def test_stats_empty(tmp_path):
+    file_path = str(tmp_path / "empty.fasta")
+    open(file_path, "w").close()
+    assert mf.stats(file_path) == mf.fasta_stats()
+    with pytest.raises(FileNotFoundError):
+        mf.stats(str(tmp_path / "missing.fasta"))